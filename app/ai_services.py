@@ -1,14 +1,74 @@
 import os
-import openai
 import re
 import json
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
 from config import settings
 from logger import logger
-from models import EvaluationResult
+from models import CriterionEvidence, CriterionScore, EvaluationDetails, EvaluationResult
+import cache
+import coalescing
+import routing
+import scoring
+import skills
+import tracing
 
-client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Return the shared OpenAI client, creating it on first use.
+
+    The SDK is imported here rather than at module level so that importing
+    this module does not pay for it; `init_client` is called from the
+    application lifespan hook to build it before the first request.
+    """
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                import openai
+                import http_pool
+                
+                client = openai.OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    http_client=http_pool.build_http_client(),
+                    timeout=http_pool.build_timeout(),
+                    max_retries=settings.OPENAI_MAX_RETRIES
+                )
+                logger.info("OpenAI client initialized")
+    return client
+
+def init_client() -> None:
+    get_client()
+    prewarm_connections(settings.OPENAI_PREWARM_CONNECTIONS)
+
+def prewarm_connections(count: int) -> None:
+    """Open `count` pooled connections up front so the first requests skip TCP/TLS setup"""
+    if count <= 0:
+        return
+    
+    def warm(_):
+        try:
+            get_client().models.list()
+            return True
+        except Exception as e:
+            logger.warning(f"Connection pre-warm request failed: {str(e)}")
+            return False
+    
+    start = datetime.now()
+    with ThreadPoolExecutor(max_workers=count, thread_name_prefix="openai-prewarm") as executor:
+        warmed = sum(executor.map(warm, range(count)))
+    elapsed = (datetime.now() - start).total_seconds()
+    logger.info(f"Pre-warmed {warmed}/{count} OpenAI connections in {elapsed:.2f}s")
+
+def http_pool_metrics() -> Dict[str, Any]:
+    """Utilization of the OpenAI HTTP connection pool"""
+    import http_pool
+    
+    return http_pool.pool_metrics()
 
 class PromptTemplates:
     """Centralized prompt templates for consistent terminology and formatting"""
@@ -240,6 +300,46 @@ class PromptTemplates:
         IMPORTANT: Use the exact same criterion names as listed in the evaluation criteria above.
         """
 
+    @staticmethod
+    def get_lean_evaluation_prompt(jd_analysis: Dict[str, Any], jd_text: str, resume_text: str) -> str:
+        """Scores-only evaluation prompt; reasons and evidence are left to the full prompt"""
+        criteria = "\n".join(
+            f"- {name} ({category.replace('_', ' ')}, importance: {importance})"
+            for name, (category, importance) in scoring.criteria_importance(jd_analysis).items()
+        )
+
+        return f"""
+        TASK: Score a resume against each job criterion
+        ROLE: Senior Technical Recruiter
+        
+        JOB DESCRIPTION CONTEXT:
+        {jd_text[:2000]}... [truncated if too long]
+        
+        ROLE TYPE: {jd_analysis.get('role_type', 'Not specified')}
+        
+        CRITERIA:
+        {criteria if criteria else "No specific criteria extracted from JD."}
+        
+        SCORING SCALE (0-10 for each criterion):
+        - 0: No evidence or completely irrelevant
+        - 1-3: Minimal exposure, below requirements
+        - 4-6: Some relevant experience, meets basic requirements
+        - 7-8: Good match, meets most requirements well
+        - 9-10: Excellent match, exceeds requirements with strong evidence
+        
+        CANDIDATE RESUME:
+        {resume_text[:3000]}... [truncated if too long]
+        
+        Be brutally honest - underestimate rather than overestimate qualifications.
+        Do not explain individual scores.
+        
+        OUTPUT FORMAT: Strict JSON, nothing else
+        {{
+          "scores": {{"<exact_criterion_name>": <number>}},
+          "summary": "<one sentence overall assessment>"
+        }}
+        """
+
     @staticmethod
     def get_interview_email_prompt(candidate_name: str, position: str, evaluation: EvaluationResult) -> str:
         """Generate interview invitation email prompt"""
@@ -318,27 +418,68 @@ class PromptTemplates:
         - No specific criticism of candidate
         """
 
+_in_flight = coalescing.SingleFlight()
+
+def _chat_completion(span: tracing.Span, coalesce: bool = True, **params) -> Any:
+    """Make one chat completion call and record its token usage on `span`.
+
+    Concurrent calls with identical parameters (model, messages, sampling
+    settings) share a single upstream request; only the caller that made it
+    records the tokens.
+    """
+    if not (coalesce and settings.LLM_COALESCING_ENABLED):
+        response = get_client().chat.completions.create(**params)
+        tracing.record_usage(span, response)
+        return response
+    
+    key = cache.make_key("chat_completion", params)
+    response, made_request = _in_flight.do(key, lambda: get_client().chat.completions.create(**params))
+    if made_request:
+        tracing.record_usage(span, response)
+    else:
+        logger.info(f"Shared an in-flight {params.get('model')} request with an identical call")
+    return response
+
+def coalescing_metrics() -> Dict[str, Any]:
+    return _in_flight.metrics()
+
+def _shared_cache(namespace: str) -> cache.Cache:
+    return cache.get_cache(
+        namespace,
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        default_ttl=settings.CACHE_TTL_SECONDS
+    )
+
 def analyze_job_description(jd_text: str) -> Dict[str, Any]:
     """Analyze job description to extract evaluation criteria"""
     logger.info("Analyzing job description to extract evaluation criteria")
     
+    key = cache.make_key("jd_analysis", routing.model_for("jd_analysis"), jd_text)
+    cached = _shared_cache("jd_analysis").get(key)
+    if cached is not None:
+        logger.info("Using cached job description analysis")
+        return cached
+    
     try:
         prompt = PromptTemplates.get_jd_analysis_prompt(jd_text)
         
-        response = client.chat.completions.create(
-            model=settings.MODEL_NAME,
-            messages=[
-                {"role": "system", "content": PromptTemplates.HR_PROFESSIONAL},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=2000,
-            temperature=0.1,
-            top_p=0.95,
-            response_format={"type": "json_object"}
-        )
+        with routing.route("jd_analysis") as model, tracing.span("jd_analysis") as span:
+            response = _chat_completion(
+                span,
+                model=model,
+                messages=[
+                    {"role": "system", "content": PromptTemplates.HR_PROFESSIONAL},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=2000,
+                temperature=0.1,
+                top_p=0.95,
+                response_format={"type": "json_object"}
+            )
         
         result_text = response.choices[0].message.content.strip()
         jd_analysis = json.loads(result_text)
+        _shared_cache("jd_analysis").set(key, jd_analysis)
         
         logger.info("Job description analysis completed successfully")
         return jd_analysis
@@ -346,9 +487,18 @@ def analyze_job_description(jd_text: str) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Error analyzing job description: {str(e)}")
 
+        # Without the model, fall back to the skills the taxonomy finds in the text
         return {
             "role_type": "general",
-            "hard_skills": [],
+            "hard_skills": [
+                {
+                    "skill": skill,
+                    "importance": "medium",
+                    "description": f"{skill} mentioned in the job description",
+                    "validation_approach": f"Look for hands-on {skill} experience"
+                }
+                for skill in skills.extract_skills(jd_text)
+            ],
             "soft_skills": [],
             "experience_requirements": [],
             "industry_context": "Unknown"
@@ -363,15 +513,7 @@ def calculate_weighted_score(evaluation_data: Dict[str, Any]) -> float:
     for category in ['hard_skills', 'soft_skills', 'experience_requirements']:
         for criterion_name, evaluation in evaluation_data.get(category, {}).items():
             score = evaluation.get('score', 0)
-            importance = evaluation.get('importance', 'medium').lower()
-            
-
-            if importance == 'high':
-                weight = 1.5
-            elif importance == 'medium':
-                weight = 1.0
-            else:  # low
-                weight = 0.5
+            weight = scoring.importance_weight(evaluation.get('importance', 'medium'))
                 
             total_score += score * weight
             total_weight += weight
@@ -385,17 +527,39 @@ def calculate_weighted_score(evaluation_data: Dict[str, Any]) -> float:
     
     return final_score
 
-def generate_job_description(jd_input: Dict[str, Any]) -> str:
-    """Generate a job description using AI"""
-    logger.info(f"Generating job description with input: {jd_input}")
+def _jd_cache() -> cache.Cache:
+    return cache.get_cache(
+        "job_description",
+        max_entries=settings.JD_CACHE_MAX_ENTRIES,
+        default_ttl=settings.JD_CACHE_TTL_SECONDS
+    )
+
+_pool_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="jd-variant-pool")
+_refilling = set()
+_refilling_lock = threading.Lock()
+
+def job_description_cache_key(jd_input: Dict[str, Any]) -> str:
+    """Cache key from normalized request fields (case, whitespace and skill order ignored)"""
+    normalized = {}
+    for field, value in jd_input.items():
+        if value is None or value == "":
+            continue
+        if field.endswith("_skills"):
+            items = value if isinstance(value, list) else str(value).split(",")
+            normalized[field] = sorted({item.strip().lower() for item in items if item.strip()})
+        else:
+            normalized[field] = " ".join(str(value).split()).lower()
+    return cache.make_key("job_description", routing.model_for("jd_generation"), normalized)
+
+def _request_job_description(jd_input: Dict[str, Any], coalesce: bool = True) -> str:
+    """Make one job description generation call to the model"""
+    prompt = PromptTemplates.get_job_description_prompt(jd_input)
     
-    try:
-        logger.info("Calling OpenAI API for job description generation")
-        
-        prompt = PromptTemplates.get_job_description_prompt(jd_input)
-        
-        response = client.chat.completions.create(
-            model=settings.MODEL_NAME,
+    with routing.route("jd_generation") as model, tracing.span("jd_generation") as span:
+        response = _chat_completion(
+            span,
+            coalesce=coalesce,
+            model=model,
             messages=[
                 {"role": "system", "content": PromptTemplates.HR_PROFESSIONAL},
                 {"role": "user", "content": prompt}
@@ -404,8 +568,73 @@ def generate_job_description(jd_input: Dict[str, Any]) -> str:
             temperature=0.8,
             top_p=0.9
         )
+    
+    return response.choices[0].message.content.strip()
+
+def _refill_variant_pool(key: str, jd_input: Dict[str, Any]) -> None:
+    """Top up the variant pool for a request key; runs on the background executor"""
+    try:
+        while _jd_cache().pool_size(key) < settings.JD_VARIANT_POOL_SIZE:
+            # Not coalesced: each variant must be a separate generation
+            _jd_cache().push(key, _request_job_description(jd_input, coalesce=False))
+            logger.info(f"Added job description variant to pool ({_jd_cache().pool_size(key)}/{settings.JD_VARIANT_POOL_SIZE})")
+    except Exception as e:
+        logger.error(f"Error refilling job description variant pool: {str(e)}")
+    finally:
+        with _refilling_lock:
+            _refilling.discard(key)
+
+def _schedule_variant_refill(key: str, jd_input: Dict[str, Any]) -> None:
+    if settings.JD_VARIANT_POOL_SIZE <= 0:
+        return
+    with _refilling_lock:
+        if key in _refilling:
+            return
+        _refilling.add(key)
+    _pool_executor.submit(_refill_variant_pool, key, dict(jd_input))
+
+def _cached_job_description(key: str, jd_input: Dict[str, Any], regenerate: bool) -> Optional[str]:
+    """Serve from the cache, or from the variant pool when regenerating"""
+    if not settings.JD_CACHE_ENABLED:
+        return None
+    
+    if not regenerate:
+        cached = _jd_cache().get(key)
+        if cached is not None:
+            logger.info("Serving job description from cache")
+        return cached
+    
+    variant = _jd_cache().pop(key)
+    if variant is not None:
+        logger.info("Serving regenerated job description from variant pool")
+        _jd_cache().set(key, variant)
+        _schedule_variant_refill(key, jd_input)
+    return variant
+
+def _store_job_description(key: str, jd_input: Dict[str, Any], job_description: str) -> None:
+    if not settings.JD_CACHE_ENABLED:
+        return
+    _jd_cache().set(key, job_description)
+    _schedule_variant_refill(key, jd_input)
+
+def generate_job_description(jd_input: Dict[str, Any], regenerate: bool = False) -> str:
+    """Generate a job description using AI.
+
+    Identical requests are served from the cache; `regenerate` asks for a new
+    variant, taken from the pre-generated pool when one is available.
+    """
+    logger.info(f"Generating job description for '{jd_input.get('job_title', 'Not specified')}'")
+    
+    try:
+        key = job_description_cache_key(jd_input)
+        cached = _cached_job_description(key, jd_input, regenerate)
+        if cached is not None:
+            return cached
         
-        job_description = response.choices[0].message.content.strip()
+        logger.info("Calling OpenAI API for job description generation")
+        
+        job_description = _request_job_description(jd_input)
+        _store_job_description(key, jd_input, job_description)
         logger.info("Job description generated successfully")
         return job_description
     
@@ -413,32 +642,127 @@ def generate_job_description(jd_input: Dict[str, Any]) -> str:
         logger.error(f"Error generating job description: {str(e)}")
         raise Exception(f"Job description generation failed: {str(e)}")
 
-def evaluate_resume(resume_text: str, jd_text: str) -> EvaluationResult:
-    """Evaluate a resume against a job description using AI with dynamic scoring"""
-    logger.info("Evaluating resume against job description with dynamic scoring")
+def stream_job_description(jd_input: Dict[str, Any], regenerate: bool = False) -> Iterator[str]:
+    """Generate a job description, yielding text fragments as the model produces them"""
+    logger.info(f"Streaming job description for '{jd_input.get('job_title', 'Not specified')}'")
     
     try:
-        jd_analysis = analyze_job_description(jd_text)
-        
-        prompt = PromptTemplates.get_dynamic_evaluation_prompt(jd_analysis, jd_text, resume_text)
+        key = job_description_cache_key(jd_input)
+        cached = _cached_job_description(key, jd_input, regenerate)
+        if cached is not None:
+            yield cached
+            return
         
-        response = client.chat.completions.create(
-            model=settings.MODEL_NAME,
+        prompt = PromptTemplates.get_job_description_prompt(jd_input)
+        fragments = []
+        
+        with routing.route("jd_generation", reason="stream") as model, tracing.span("jd_generation"):
+            stream = get_client().chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": PromptTemplates.HR_PROFESSIONAL},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=2500,
+                temperature=0.8,
+                top_p=0.9,
+                stream=True
+            )
+            
+            try:
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        fragments.append(delta)
+                        yield delta
+            finally:
+                # The SDK's Stream has no close(); release the pooled connection
+                # even when the client disconnects or the generator is closed early
+                stream.response.close()
+        
+        _store_job_description(key, jd_input, "".join(fragments).strip())
+        logger.info("Job description stream completed")
+    
+    except Exception as e:
+        logger.error(f"Error streaming job description: {str(e)}")
+        raise Exception(f"Job description generation failed: {str(e)}")
+
+def _request_evaluation(prompt: str, model: str, max_tokens: int, task: str, reason: str) -> str:
+    with routing.route(task, reason=reason, model=model), tracing.span("llm_evaluation") as span:
+        response = _chat_completion(
+            span,
+            model=model,
             messages=[
                 {"role": "system", "content": PromptTemplates.TECHNICAL_RECRUITER},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=3000,
+            max_tokens=max_tokens,
             temperature=0.2,
             top_p=0.95,
             response_format={"type": "json_object"}
         )
+    
+    logger.info("Received evaluation response from OpenAI")
+    return response.choices[0].message.content.strip()
+
+def _evaluation_model_key(jd_text: str, resume_text: str) -> str:
+    return cache.make_key("evaluation_model", jd_text, resume_text)
+
+def _record_evaluation_model(jd_text: str, resume_text: str, model: str) -> None:
+    """Remember which model scored this candidate so evidence requests use its details"""
+    _shared_cache("evaluation_details").set(_evaluation_model_key(jd_text, resume_text), model)
+
+def evaluate_resume(
+    resume_text: str,
+    jd_text: str,
+    task: str = "evaluation",
+    reason: str = "default",
+    lean: Optional[bool] = None,
+    jd_analysis: Optional[Dict[str, Any]] = None
+) -> EvaluationResult:
+    """Evaluate a resume against a job description using AI with dynamic scoring.
+
+    `task` selects the routed model: "evaluation", or "triage" and "finalist"
+    in tiered mode. `reason` is recorded with the routing decision. Lean mode
+    (default from EVALUATION_MODE) asks only for per-criterion scores and a
+    summary; the full breakdown is available from `evaluation_details`.
+    Pass `jd_analysis` when the job description was analyzed up front for a
+    batch; otherwise it is analyzed (or read from the cache) here.
+    """
+    logger.info("Evaluating resume against job description with dynamic scoring")
+    
+    lean = settings.EVALUATION_MODE == "lean" if lean is None else lean
+    model = routing.model_for(task)
+    key = cache.make_key("evaluation_lean" if lean else "evaluation", model, jd_text, resume_text)
+    cached = _shared_cache("evaluation").get(key)
+    if cached is not None:
+        logger.info("Using cached resume evaluation")
+        _record_evaluation_model(jd_text, resume_text, model)
+        return EvaluationResult(**cached)
+    
+    try:
+        if jd_analysis is None:
+            jd_analysis = analyze_job_description(jd_text)
         
-        result_text = response.choices[0].message.content.strip()
-        logger.info("Received evaluation response from OpenAI")
+        if lean:
+            prompt = PromptTemplates.get_lean_evaluation_prompt(jd_analysis, jd_text, resume_text)
+            result_text = _request_evaluation(prompt, model, settings.LEAN_EVALUATION_MAX_TOKENS, task, reason)
+        else:
+            prompt = PromptTemplates.get_dynamic_evaluation_prompt(jd_analysis, jd_text, resume_text)
+            result_text = _request_evaluation(prompt, model, settings.EVALUATION_MAX_TOKENS, task, reason)
         
         try:
             evaluation_data = json.loads(result_text)
+            if lean:
+                evaluation_data = scoring.expand_lean_evaluation(jd_analysis, evaluation_data)
+            else:
+                # The full response already holds the drill-down details
+                _shared_cache("evaluation_details").set(
+                    cache.make_key("evaluation_details", model, jd_text, resume_text),
+                    evaluation_data
+                )
             
 
             calculated_score = evaluation_data.get("calculated_score")
@@ -446,10 +770,17 @@ def evaluate_resume(resume_text: str, jd_text: str) -> EvaluationResult:
                 calculated_score = calculate_weighted_score(evaluation_data)
             
             missing_skills = []
+            criteria = []
             for category in ['hard_skills', 'soft_skills', 'experience_requirements']:
                 for skill_name, skill_data in evaluation_data.get(category, {}).items():
                     if skill_data.get('score', 0) < 5: 
                         missing_skills.append(skill_name)
+                    criteria.append(CriterionScore(
+                        category=category,
+                        criterion=skill_name,
+                        score=skill_data.get('score', 0),
+                        importance=skill_data.get('importance', 'medium')
+                    ))
             
             overall = evaluation_data.get("overall_assessment", {})
             
@@ -462,9 +793,12 @@ def evaluate_resume(resume_text: str, jd_text: str) -> EvaluationResult:
                 red_flags=overall.get("concerns", []),
                 remarks=overall.get("summary", "Evaluation completed"),
                 recommendation=overall.get("recommendation", "Further review needed"),
-                interview_focus_areas=[]
+                interview_focus_areas=[],
+                criteria=criteria
             )
             
+            _shared_cache("evaluation").set(key, evaluation.model_dump())
+            _record_evaluation_model(jd_text, resume_text, model)
             logger.info(f"Resume evaluation completed. Score: {evaluation.score}")
             return evaluation
             
@@ -484,6 +818,52 @@ def evaluate_resume(resume_text: str, jd_text: str) -> EvaluationResult:
             remarks=f"Evaluation failed due to technical error: {str(e)}"
         )
 
+def evaluation_details(resume_text: str, jd_text: str) -> EvaluationDetails:
+    """Full per-criterion breakdown with reasons and evidence for one candidate.
+
+    Reuses the full evaluation response when the candidate was scored in full
+    mode; after a lean evaluation this makes the full request on demand. In
+    both cases the model that scored the candidate is used, e.g. the finalist
+    model for a tiered finalist.
+    """
+    model = _shared_cache("evaluation_details").get(_evaluation_model_key(jd_text, resume_text))
+    model = model or routing.model_for("evaluation")
+    key = cache.make_key("evaluation_details", model, jd_text, resume_text)
+    evaluation_data = _shared_cache("evaluation_details").get(key)
+    
+    if evaluation_data is None:
+        logger.info("Requesting full evaluation details")
+        jd_analysis = analyze_job_description(jd_text)
+        prompt = PromptTemplates.get_dynamic_evaluation_prompt(jd_analysis, jd_text, resume_text)
+        result_text = _request_evaluation(prompt, model, settings.EVALUATION_MAX_TOKENS, "evaluation", "details")
+        evaluation_data = json.loads(result_text)
+        _shared_cache("evaluation_details").set(key, evaluation_data)
+    
+    calculated_score = evaluation_data.get("calculated_score")
+    if calculated_score is None:
+        calculated_score = calculate_weighted_score(evaluation_data)
+    overall = evaluation_data.get("overall_assessment", {})
+    
+    return EvaluationDetails(
+        score=min(100, max(0, float(calculated_score))),
+        summary=overall.get("summary", ""),
+        strengths=overall.get("strengths", []),
+        concerns=overall.get("concerns", []),
+        recommendation=overall.get("recommendation", ""),
+        criteria=[
+            CriterionEvidence(
+                category=category,
+                criterion=name,
+                score=criterion.get("score", 0),
+                importance=criterion.get("importance", "medium"),
+                reason=criterion.get("reason", ""),
+                evidence=criterion.get("evidence", "")
+            )
+            for category in scoring.CRITERIA_CATEGORIES
+            for name, criterion in evaluation_data.get(category, {}).items()
+        ]
+    )
+
 def generate_email(candidate_name: str, position: str, email_type: str, 
                   evaluation: Optional[EvaluationResult] = None) -> str:
     """Generate personalized email for candidate"""
@@ -526,16 +906,18 @@ def generate_email(candidate_name: str, position: str, email_type: str,
             prompt = PromptTemplates.get_rejection_email_prompt(candidate_name, position, evaluation)
             system_role = PromptTemplates.EMPLOYER_BRANDING
         
-        response = client.chat.completions.create(
-            model=settings.MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_role},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1000,
-            temperature=0.7,
-            top_p=0.95
-        )
+        with routing.route("email", reason=email_type) as model, tracing.span(f"{email_type}_email") as span:
+            response = _chat_completion(
+                span,
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_role},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=1000,
+                temperature=0.7,
+                top_p=0.95
+            )
         
         email_content = response.choices[0].message.content.strip()
         logger.info(f"{email_type.capitalize()} email generated successfully")
@@ -0,0 +1,110 @@
+import heapq
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import cache
+import models
+import scoring
+import skills
+from config import settings
+from logger import logger
+
+# All rollups live in one document that is updated atomically after each
+# matching run, so reading the dashboard never rescans past results.
+ROLLUP_KEY = "rollups"
+TOP_SKILLS = 10
+
+def _store() -> cache.Cache:
+    return cache.get_cache("analytics", max_entries=16, backend=settings.ANALYTICS_BACKEND)
+
+def _empty_rollups() -> Dict[str, Any]:
+    return {
+        "total_jobs": 0,
+        "total_candidates": 0,
+        "qualified_candidates": 0,
+        "score_sum": 0.0,
+        "processing_time_sum": 0.0,
+        "score_histogram": [0] * 10,
+        "local_score_histogram": [0] * 10,
+        "daily": {},
+        "missing_skills": {},
+        "top_missing_skills": [],
+        "updated_at": None
+    }
+
+def _apply_run(
+    rollups: Optional[Dict[str, Any]],
+    candidates: List[models.CandidateResult],
+    processing_time: float
+) -> Dict[str, Any]:
+    rollups = rollups or _empty_rollups()
+    rollups["total_jobs"] += 1
+    rollups["total_candidates"] += len(candidates)
+    rollups["processing_time_sum"] += processing_time
+
+    # Cascade pre-screen scores are not comparable with LLM scores, so they get their own histogram
+    histograms = {
+        "llm": rollups["score_histogram"],
+        "local": rollups.setdefault("local_score_histogram", [0] * 10)
+    }
+    missing_skills = rollups["missing_skills"]
+    for candidate in candidates:
+        rollups["score_sum"] += candidate.score
+        if candidate.score >= scoring.QUALIFYING_SCORE:
+            rollups["qualified_candidates"] += 1
+        histograms["local" if candidate.scoring == "local" else "llm"][min(int(candidate.score // 10), 9)] += 1
+        # LLM criteria names vary between runs; fold them onto taxonomy names where possible
+        for skill in {skills.canonicalize(skill) for skill in candidate.missing_skills if skill.strip()}:
+            missing_skills[skill] = missing_skills.get(skill, 0) + 1
+
+    # Bound the skill table. It may grow to twice the limit before the rarest
+    # skills are dropped, so newly seen skills have room to build up counts.
+    if len(missing_skills) > 2 * settings.ANALYTICS_MAX_TRACKED_SKILLS:
+        kept = heapq.nlargest(settings.ANALYTICS_MAX_TRACKED_SKILLS, missing_skills.items(), key=lambda item: item[1])
+        rollups["missing_skills"] = missing_skills = dict(kept)
+    rollups["top_missing_skills"] = heapq.nlargest(TOP_SKILLS, missing_skills.items(), key=lambda item: item[1])
+
+    today = date.today().isoformat()
+    jobs_processed, candidates_evaluated = rollups["daily"].get(today, (0, 0))
+    rollups["daily"][today] = (jobs_processed + 1, candidates_evaluated + len(candidates))
+    cutoff = (date.today() - timedelta(days=settings.ANALYTICS_HISTORY_DAYS)).isoformat()
+    rollups["daily"] = {day: counts for day, counts in rollups["daily"].items() if day >= cutoff}
+
+    rollups["updated_at"] = datetime.now().isoformat()
+    return rollups
+
+def record_matching_run(candidates: List[models.CandidateResult], processing_time: float) -> None:
+    """Fold one completed matching run into the rollups; failures never affect matching"""
+    try:
+        _store().update(ROLLUP_KEY, lambda rollups: _apply_run(rollups, candidates, processing_time))
+    except Exception as e:
+        logger.error(f"Failed to update analytics rollups: {str(e)}")
+
+def get_summary() -> models.AnalyticsSummary:
+    """Current rollups in their API shape"""
+    rollups = _store().get(ROLLUP_KEY) or _empty_rollups()
+    total_candidates = rollups["total_candidates"]
+    total_jobs = rollups["total_jobs"]
+    return models.AnalyticsSummary(
+        total_jobs=total_jobs,
+        total_candidates=total_candidates,
+        qualified_candidates=rollups["qualified_candidates"],
+        average_score=rollups["score_sum"] / total_candidates if total_candidates else 0.0,
+        average_processing_time=rollups["processing_time_sum"] / total_jobs if total_jobs else 0.0,
+        score_histogram=rollups["score_histogram"],
+        local_score_histogram=rollups.get("local_score_histogram", [0] * 10),
+        daily=[
+            models.DailyActivity(date=day, jobs_processed=counts[0], candidates_evaluated=counts[1])
+            for day, counts in sorted(rollups["daily"].items())
+        ],
+        top_missing_skills=[
+            models.SkillCount(skill=skill, count=count)
+            for skill, count in rollups["top_missing_skills"]
+        ],
+        updated_at=rollups["updated_at"]
+    )
+
+def reset() -> None:
+    """Discard all rollups"""
+    _store().delete(ROLLUP_KEY)
+    logger.info("Analytics rollups reset")
@@ -0,0 +1,408 @@
+"""Score a directory of resumes against a job description, outside the API.
+
+Resumes are extracted and evaluated in parallel and each result is appended
+to the output file as soon as it is ready. Progress is checkpointed to a
+state file, so rerunning the same command after an interruption skips the
+resumes already scored.
+
+Usage (from the app directory):
+    python batch_cli.py job_description.txt ./applicants --output results.csv --concurrency 8
+    python batch_cli.py job_description.pdf ./applicants --output results.jsonl --lean
+    python batch_cli.py job_description.txt ./applicants --output results.parquet
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import ai_services
+import export
+import matching
+import models
+import tracing
+import utils
+
+CSV_FIELDS = [
+    "path", "name", "email", "phone", "location", "years_of_experience", "score",
+    "missing_skills", "matched_skills", "remarks", "error"
+]
+OUTPUT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".parquet": "parquet", ".arrow": "arrow"}
+
+def read_job_description(path: Path) -> str:
+    if utils.validate_file_extension(path.name):
+        return utils.extract_text_from_bytes(path.name, path.read_bytes())
+    return path.read_text(encoding="utf-8")
+
+def iter_resumes(directory: Path, recursive: bool = True) -> Iterator[Path]:
+    """Supported resume files under `directory`, in a stable order"""
+    pattern = "**/*" if recursive else "*"
+    for path in sorted(directory.glob(pattern)):
+        if path.is_file() and not path.name.startswith(".") and utils.validate_file_extension(path.name):
+            yield path
+
+class Checkpoint:
+    """Append-only state file recording which resumes are done.
+
+    The first line identifies the job description; each later line records
+    one finished resume. Lines are flushed and synced as they are written,
+    so an interrupted run loses at most the resumes still in flight.
+    """
+
+    def __init__(self, path: Path, job_description: str, restart: bool = False):
+        self.path = path
+        self.jd_hash = hashlib.sha256(job_description.encode("utf-8")).hexdigest()
+        self.done: Dict[str, str] = {}
+
+        if path.exists() and not restart:
+            with open(path, encoding="utf-8") as state:
+                header = json.loads(state.readline() or "{}")
+                if header.get("job_description_sha256") != self.jd_hash:
+                    raise SystemExit(f"{path} belongs to a different job description; use --restart to start over")
+                for line in state:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # partially written last line
+                    self.done[entry["path"]] = entry["status"]
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+            self._write({"job_description_sha256": self.jd_hash})
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def is_done(self, path: str, retry_errors: bool = False) -> bool:
+        status = self.done.get(path)
+        return status == "ok" or (status == "error" and not retry_errors)
+
+    def mark(self, path: str, status: str) -> None:
+        self.done[path] = status
+        self._write({"path": path, "status": status})
+
+    def close(self) -> None:
+        self._file.close()
+
+def _rewrite_kept_rows(path: Path, output_format: str, keep: Callable[[str], bool]) -> None:
+    """Drop rows of an earlier run that are not checkpointed as done, or are about to be scored again.
+
+    This removes the old error rows of resumes being retried, and any row
+    written just before a crash but never checkpointed. Each path is kept
+    once. Streams through a temporary file that replaces the output.
+    """
+    temporary = path.with_name(path.name + ".tmp")
+    seen = set()
+    dropped = 0
+    with open(path, encoding="utf-8", newline="") as source, open(temporary, "w", encoding="utf-8", newline="") as target:
+        if output_format == "csv":
+            reader = csv.DictReader(source)
+            writer = csv.DictWriter(target, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            rows = ((row["path"], row) for row in reader)
+        else:
+            rows = ((json.loads(line)["path"], line) for line in source if line.strip())
+
+        for row_path, row in rows:
+            if row_path in seen or not keep(row_path):
+                dropped += 1
+                continue
+            seen.add(row_path)
+            if output_format == "csv":
+                writer.writerow(row)
+            else:
+                target.write(row if row.endswith("\n") else row + "\n")
+        target.flush()
+        os.fsync(target.fileno())
+    temporary.replace(path)
+    if dropped:
+        print(f"Removed {dropped} rows of {path} that will be scored again")
+
+class ColumnarParts:
+    """Parquet or Arrow output as a directory of part files, one per row group.
+
+    Each part is written to a temporary name, synced and renamed, so a part
+    file on disk is always complete and a killed run loses only the rows it
+    had buffered. pandas, Polars and DuckDB read the directory as one table.
+    """
+
+    def __init__(self, directory: Path, output_format: str, keep: Optional[Callable[[str], bool]], row_group_size: int):
+        self.directory = directory
+        self.format = output_format
+        self.suffix = export.FORMATS[output_format][1]
+        self.row_group_size = row_group_size
+        self._rows: List[Dict[str, Any]] = []
+
+        if directory.is_file():
+            if keep is not None:
+                raise SystemExit(f"{directory} is a single file from an older run; use --restart to start over")
+            directory.unlink()
+        directory.mkdir(parents=True, exist_ok=True)
+        for stale in directory.glob("*.tmp"):
+            stale.unlink()
+
+        parts = sorted(directory.glob(f"part-*{self.suffix}"))
+        seen = set()
+        for part in parts:
+            if keep is None:
+                part.unlink()
+            else:
+                self._filter_part(part, keep, seen)
+        self._next_part = max((int(part.stem.split("-")[1]) for part in parts), default=-1) + 1
+
+    def _read(self, part: Path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.format == "parquet":
+            return pq.read_table(part)
+        with pa.ipc.open_file(part) as reader:
+            return reader.read_all()
+
+    def _write(self, part: Path, rows) -> None:
+        """Write a list of row dicts or a table to `part` atomically"""
+        import pyarrow as pa
+
+        temporary = part.with_name(part.name + ".tmp")
+        writer = export.ColumnarWriter(str(temporary), self.format, row_group_size=max(len(rows), 1))
+        if isinstance(rows, pa.Table):
+            for batch in rows.to_batches():
+                writer.write_batch(batch)
+        else:
+            for row in rows:
+                writer.write(row)
+        writer.close()
+        with open(temporary, "rb") as written:
+            os.fsync(written.fileno())
+        temporary.replace(part)
+
+    def _filter_part(self, part: Path, keep: Callable[[str], bool], seen: set) -> None:
+        """Drop rows that are not checkpointed as done or are about to be scored again"""
+        import pyarrow as pa
+
+        table = self._read(part)
+        mask = []
+        for row_path in table.column("filename").to_pylist():
+            kept = row_path not in seen and keep(row_path)
+            if kept:
+                seen.add(row_path)
+            mask.append(kept)
+        if all(mask):
+            return
+        if not any(mask):
+            part.unlink()
+        else:
+            self._write(part, table.filter(pa.array(mask)))
+        print(f"Removed {mask.count(False)} rows of {part} that will be scored again")
+
+    def write(self, row: Dict[str, Any]) -> bool:
+        """Buffer one row; returns True when this completed a part and it was written"""
+        self._rows.append(row)
+        if len(self._rows) < self.row_group_size:
+            return False
+        self.flush()
+        return True
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        self._write(self.directory / f"part-{self._next_part:05d}{self.suffix}", self._rows)
+        self._next_part += 1
+        self._rows = []
+
+class ResultWriter:
+    """Appends one result per row to a CSV or JSONL file, or Parquet or Arrow part files.
+
+    `write` and `close` return the (path, status) entries that are now safely
+    in the output and can be checkpointed. CSV and JSONL rows are written
+    immediately; Parquet and Arrow rows are written a part file at a time.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        output_format: str,
+        keep: Optional[Callable[[str], bool]],
+        row_group_size: int
+    ):
+        """`keep` decides which rows of an earlier run's output to keep; None starts a new file"""
+        self.format = output_format
+        new_file = keep is None or not path.exists() or path.stat().st_size == 0
+        self._pending: List[Tuple[str, str]] = []
+        if self.format in export.FORMATS:
+            self._columnar = ColumnarParts(path, self.format, keep, row_group_size)
+            return
+
+        if not new_file:
+            _rewrite_kept_rows(path, self.format, keep)
+        self._file = open(path, "w" if new_file else "a", encoding="utf-8", newline="")
+        if self.format == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            if new_file:
+                self._csv.writeheader()
+
+    def write(self, path: str, candidate: models.CandidateResult, error: Optional[str]) -> List[Tuple[str, str]]:
+        self._pending.append((path, "error" if error else "ok"))
+        if self.format in export.FORMATS:
+            if not self._columnar.write(export.candidate_row(candidate, filename=path, error=error)):
+                return []
+        elif self.format == "jsonl":
+            record = candidate.model_dump(mode="json", exclude={"resume_text", "routing"})
+            self._file.write(json.dumps({"path": path, **record, "error": error}) + "\n")
+        else:
+            self._csv.writerow({
+                "path": path,
+                "name": candidate.name,
+                "email": candidate.email,
+                "phone": candidate.phone,
+                "location": candidate.location,
+                "years_of_experience": candidate.years_of_experience,
+                "score": round(candidate.score, 2),
+                "missing_skills": "; ".join(candidate.missing_skills),
+                "matched_skills": "; ".join(candidate.matched_skills),
+                "remarks": candidate.remarks,
+                "error": error
+            })
+        if self.format not in export.FORMATS:
+            # On disk before the checkpoint records it
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        written, self._pending = self._pending, []
+        return written
+
+    def close(self) -> List[Tuple[str, str]]:
+        if self.format in export.FORMATS:
+            self._columnar.flush()
+        else:
+            self._file.close()
+        written, self._pending = self._pending, []
+        return written
+
+def score_resume(path: Path, job_description: str, lean: Optional[bool]) -> models.CandidateResult:
+    with tracing.trace(path.name) as resume_trace:
+        candidate, processed = matching.evaluate_document(path.name, path.read_bytes(), job_description, lean=lean)
+    if not processed:
+        raise RuntimeError(candidate.remarks)
+    candidate.timings = models.CandidateTiming(**resume_trace.to_dict())
+    return candidate
+
+def run(args: argparse.Namespace) -> int:
+    directory = Path(args.directory)
+    output = Path(args.output)
+    output_format = args.format or OUTPUT_FORMATS.get(output.suffix.lower(), "csv")
+    if output_format in export.FORMATS and not export.available():
+        raise SystemExit(f"{output_format} output requires pyarrow (pip install pyarrow)")
+    state_path = Path(args.state) if args.state else output.with_name(output.name + ".state")
+
+    job_description = read_job_description(Path(args.job_description))
+    checkpoint = Checkpoint(state_path, job_description, restart=args.restart)
+    keep = None
+    if not args.restart and checkpoint.done:
+        keep = lambda path: checkpoint.is_done(path, retry_errors=args.retry_errors)
+    writer = ResultWriter(output, output_format, keep, row_group_size=args.row_group_size)
+
+    pending = [
+        path for path in iter_resumes(directory, recursive=not args.no_recursive)
+        if not checkpoint.is_done(str(path.relative_to(directory)), retry_errors=args.retry_errors)
+    ]
+    print(f"{len(checkpoint.done)} resumes already done, {len(pending)} to score -> {output} ({output_format})")
+    if not pending:
+        writer.close()
+        checkpoint.close()
+        return 0
+
+    ai_services.init_client()
+    # Analyze the job description once up front rather than in every worker
+    ai_services.analyze_job_description(job_description)
+
+    completed = 0
+    failed = 0
+    interrupted = False
+    in_flight: Dict[Future, Path] = {}
+    queue = iter(pending)
+    executor = ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="batch-score")
+
+    def record(future: Future) -> None:
+        nonlocal completed, failed
+        path = in_flight.pop(future)
+        relative = str(path.relative_to(directory))
+        try:
+            candidate, error = future.result(), None
+        except Exception as e:
+            candidate = models.CandidateResult(
+                filename=path.name, score=0, missing_skills=[], remarks="", resume_text=""
+            )
+            error = str(e)
+            failed += 1
+
+        # Output first, then the checkpoint; a row written just before a crash is dropped on resume
+        for written in writer.write(relative, candidate, error):
+            checkpoint.mark(*written)
+        completed += 1
+        status = f"error: {error}" if error else f"{candidate.score:.1f}"
+        print(f"[{completed}/{len(pending)}] {relative}: {status}")
+
+    try:
+        while True:
+            # Keep a bounded window of submitted work so huge directories are not queued at once
+            for path in queue:
+                in_flight[executor.submit(score_resume, path, job_description, args.lean)] = path
+                if len(in_flight) >= args.concurrency * 2:
+                    break
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record(future)
+    except KeyboardInterrupt:
+        interrupted = True
+        # Drop queued work, but keep evaluations that are already paid for
+        started = [future for future in list(in_flight) if not future.cancel()]
+        if started:
+            print(f"Interrupted; saving {len(started)} evaluations already in progress (Ctrl-C again to discard them)")
+        try:
+            for future in as_completed(started):
+                record(future)
+        except KeyboardInterrupt:
+            print("Discarded the evaluations still in progress")
+        print(f"Interrupted after {completed} resumes; rerun the same command to resume")
+        return 130
+    finally:
+        executor.shutdown(wait=not interrupted, cancel_futures=True)
+        for written in writer.close():
+            checkpoint.mark(*written)
+        checkpoint.close()
+
+    print(f"Done: {completed - failed} scored, {failed} failed")
+    return 1 if failed else 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Score a directory of resumes against a job description")
+    parser.add_argument("job_description", help="Job description file (.txt, .pdf, .doc or .docx)")
+    parser.add_argument("directory", help="Directory of resumes; subdirectories are included")
+    parser.add_argument("--output", "-o", default="results.csv", help="Results file, appended to as resumes finish")
+    parser.add_argument("--format", choices=["csv", "jsonl", *export.FORMATS], help="Output format (default from the output extension)")
+    parser.add_argument("--row-group-size", type=int, default=1000, help="Rows per Parquet/Arrow part file; checkpointed as each part is written")
+    parser.add_argument("--concurrency", "-c", type=int, default=4, help="Resumes evaluated in parallel")
+    parser.add_argument("--state", help="Checkpoint file (default: <output>.state)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and overwrite the output")
+    parser.add_argument("--retry-errors", action="store_true", help="Score resumes that failed in an earlier run again")
+    parser.add_argument("--no-recursive", action="store_true", help="Only score files directly in the directory")
+    parser.add_argument("--lean", action="store_true", default=None, help="Use lean scoring (scores and a summary only)")
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.row_group_size < 1:
+        parser.error("--row-group-size must be at least 1")
+    return run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
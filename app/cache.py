@@ -0,0 +1,364 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from config import settings
+from logger import logger
+
+def make_key(*parts: Any) -> str:
+    """Stable hash key for JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache with per-entry TTL and per-key value pools.
+
+    Values are stored as-is; pools hold interchangeable alternatives for a key
+    (for example pre-generated job description variants) served first-in first-out.
+    Pools follow the same size limit and TTL as entries, refreshed on each
+    push, and are dropped with their key's entry when it is evicted or expires.
+    """
+
+    def __init__(self, namespace: str, max_entries: int = 256, default_ttl: Optional[float] = None):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._pools: "OrderedDict[str, Tuple[Deque[Any], Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                self._pools.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _expires_at(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.default_ttl if ttl is None else ttl
+        return time.time() + ttl if ttl else None
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            self._pools.pop(key, None)
+        while len(self._pools) > self.max_entries:
+            self._pools.popitem(last=False)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = self._expires_at(ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def update(self, key: str, func: Callable[[Optional[Any]], Any], ttl: Optional[float] = None) -> Any:
+        """Atomically replace the value for key with func(current value or None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            current = None
+            if entry is not None and (entry[1] is None or entry[1] >= time.time()):
+                current = entry[0]
+            value = func(current)
+            self._entries[key] = (value, self._expires_at(ttl))
+            self._entries.move_to_end(key)
+            self._evict()
+            return value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._pools.pop(key, None)
+
+    def _pool(self, key: str) -> Deque[Any]:
+        entry = self._pools.get(key)
+        if entry is None:
+            return deque()
+        pool, expires_at = entry
+        if expires_at is not None and expires_at < time.time():
+            del self._pools[key]
+            return deque()
+        return pool
+
+    def push(self, key: str, value: Any) -> None:
+        with self._lock:
+            pool = self._pool(key)
+            pool.append(value)
+            self._pools[key] = (pool, self._expires_at(None))
+            self._pools.move_to_end(key)
+            self._evict()
+
+    def pop(self, key: str) -> Optional[Any]:
+        with self._lock:
+            pool = self._pool(key)
+            if not pool:
+                return None
+            return pool.popleft()
+
+    def pool_size(self, key: str) -> int:
+        with self._lock:
+            return len(self._pool(key))
+
+    def pool_items(self, key: str, start: int = 0) -> List[Any]:
+        """Pooled values from position `start` on, oldest first, without removing them"""
+        with self._lock:
+            return list(islice(self._pool(key), start, None))
+
+# Pool rows not yet expired at the time bound to the placeholder
+_LIVE_POOL = "(expires_at IS NULL OR expires_at >= ?)"
+
+class SQLiteCache:
+    """Cache shared by all worker processes on a host, backed by SQLite in WAL mode.
+
+    Same interface as MemoryCache. Values must be JSON-serializable. Each
+    thread keeps its own connection; WAL lets readers proceed while one
+    process writes. A hit records its access time only when the stored one
+    is older than `ACCESS_UPDATE_INTERVAL`, so most reads stay read-only and
+    LRU order is kept to that resolution.
+    """
+
+    ACCESS_UPDATE_INTERVAL = 60.0
+
+    _local = threading.local()
+    _initialized_paths = set()
+    _init_lock = threading.Lock()
+
+    def __init__(self, namespace: str, path: str, max_entries: int = 256, default_ttl: Optional[float] = None):
+        self.namespace = namespace
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        # Connections must not be reused across fork; key them by pid as well
+        conn_key = (self.path, os.getpid())
+        conn = connections.get(conn_key)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            connections[conn_key] = conn
+        return conn
+
+    def _init_schema(self) -> None:
+        with self._init_lock:
+            if self.path in self._initialized_paths:
+                return
+            conn = self._connect()
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_cache_entries_lru ON cache_entries (namespace, accessed_at);
+                CREATE TABLE IF NOT EXISTS cache_pools (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_cache_pools_key ON cache_pools (namespace, key, id);
+                """
+            )
+            # Databases created before pools expired lack the column
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cache_pools)")}
+            if "expires_at" not in columns:
+                conn.execute("ALTER TABLE cache_pools ADD COLUMN expires_at REAL")
+            self._initialized_paths.add(self.path)
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and expires_at < now:
+            self.delete(key)
+            return None
+        if now - accessed_at >= self.ACCESS_UPDATE_INTERVAL:
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key)
+            )
+        return json.loads(value)
+
+    def _write(self, conn: sqlite3.Connection, key: str, value: Any, ttl: Optional[float]) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, key, json.dumps(value), expires_at, now)
+        )
+        # Least recently used entries beyond max_entries are evicted along with their pools
+        for table in ("cache_pools", "cache_entries"):
+            conn.execute(
+                f"""
+                DELETE FROM {table} WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache_entries WHERE namespace = ?
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.namespace, self.namespace, self.max_entries)
+            )
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write(conn, key, value, ttl)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def update(self, key: str, func: Callable[[Optional[Any]], Any], ttl: Optional[float] = None) -> Any:
+        """Atomically replace the value for key with func(current value or None), across processes"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            current = None
+            if row is not None and (row[1] is None or row[1] >= time.time()):
+                current = json.loads(row[0])
+            value = func(current)
+            self._write(conn, key, value, ttl)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def delete(self, key: str) -> None:
+        conn = self._connect()
+        conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+        conn.execute("DELETE FROM cache_pools WHERE namespace = ? AND key = ?", (self.namespace, key))
+
+    def push(self, key: str, value: Any) -> None:
+        """Add a value to the key's pool; the pool's TTL restarts and stale pools are dropped"""
+        now = time.time()
+        expires_at = now + self.default_ttl if self.default_ttl else None
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO cache_pools (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), expires_at)
+            )
+            conn.execute(
+                "UPDATE cache_pools SET expires_at = ? WHERE namespace = ? AND key = ?",
+                (expires_at, self.namespace, key)
+            )
+            conn.execute(
+                "DELETE FROM cache_pools WHERE namespace = ? AND expires_at < ?",
+                (self.namespace, now)
+            )
+            # Keep the max_entries most recently pushed pools
+            conn.execute(
+                """
+                DELETE FROM cache_pools WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache_pools WHERE namespace = ?
+                    GROUP BY key ORDER BY MAX(id) DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.namespace, self.namespace, self.max_entries)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def pop(self, key: str) -> Optional[Any]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT id, value FROM cache_pools WHERE namespace = ? AND key = ? AND {_LIVE_POOL} ORDER BY id LIMIT 1",
+                (self.namespace, key, time.time())
+            ).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM cache_pools WHERE id = ?", (row[0],))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return json.loads(row[1]) if row is not None else None
+
+    def pool_size(self, key: str) -> int:
+        row = self._connect().execute(
+            f"SELECT COUNT(*) FROM cache_pools WHERE namespace = ? AND key = ? AND {_LIVE_POOL}",
+            (self.namespace, key, time.time())
+        ).fetchone()
+        return row[0]
+
+    def pool_items(self, key: str, start: int = 0) -> List[Any]:
+        rows = self._connect().execute(
+            f"SELECT value FROM cache_pools WHERE namespace = ? AND key = ? AND {_LIVE_POOL} ORDER BY id LIMIT -1 OFFSET ?",
+            (self.namespace, key, time.time(), start)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+Cache = Union[MemoryCache, SQLiteCache]
+
+def cache_backend() -> str:
+    """Resolve CACHE_BACKEND; "auto" shares caches through SQLite when running several workers"""
+    backend = settings.CACHE_BACKEND.lower()
+    if backend == "auto":
+        return "sqlite" if settings.WORKERS > 1 else "memory"
+    return backend
+
+_caches: Dict[str, Cache] = {}
+_caches_lock = threading.Lock()
+
+def get_cache(
+    namespace: str,
+    max_entries: int = 256,
+    default_ttl: Optional[float] = None,
+    backend: Optional[str] = None
+) -> Cache:
+    """Return the cache for a namespace, creating it on first use.
+
+    Uses the SQLite backend shared across worker processes when configured,
+    otherwise an in-process LRU. `backend` overrides CACHE_BACKEND for data
+    that must always persist.
+    """
+    with _caches_lock:
+        if namespace not in _caches:
+            if (backend or cache_backend()) == "sqlite":
+                logger.info(f"Using shared SQLite cache for '{namespace}' at {settings.CACHE_PATH}")
+                _caches[namespace] = SQLiteCache(namespace, settings.CACHE_PATH, max_entries=max_entries, default_ttl=default_ttl)
+            else:
+                _caches[namespace] = MemoryCache(namespace, max_entries=max_entries, default_ttl=default_ttl)
+        return _caches[namespace]
@@ -0,0 +1,60 @@
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Runs at most one call per key at a time.
+
+    Callers arriving while a call with the same key is in flight wait for it
+    and share its result or exception instead of starting their own. Nothing
+    is kept once the call finishes; that is the caches' job.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Result of `fn`, and whether this caller ran it rather than sharing another's call"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, True
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = self._stats["calls"]
+            coalesced = self._stats["coalesced"]
+            return {
+                "calls": calls,
+                "coalesced": coalesced,
+                "in_flight": len(self._calls),
+                "coalesced_ratio": round(coalesced / (calls + coalesced), 3) if calls + coalesced else 0.0
+            }
@@ -3,9 +3,10 @@ from pydantic import Field
 from typing import Optional
 from logger import logger
 import os
+import threading
 from pathlib import Path
 
-class settings(BaseSettings):
+class Settings(BaseSettings):
     OPENAI_API_KEY: str = Field(..., description="OpenAI API key")
     APP_NAME: str = "Recruitment AI Agent"
     APP_VERSION: str = "1.0.0"
@@ -13,6 +14,79 @@ class settings(BaseSettings):
     MAX_RESUMES: int = 10
     MODEL_NAME: str = "gpt-3.5-turbo"
     
+    # ZIP uploads of resumes; limits apply across all archives in a request
+    ZIP_MAX_MEMBERS: int = 500
+    ZIP_MAX_MEMBER_BYTES: int = 10_000_000  # larger members are skipped
+    ZIP_MAX_TOTAL_BYTES: int = 200_000_000  # total uncompressed size per request
+    
+    # Per-task model routing; unset tasks use MODEL_NAME
+    JD_ANALYSIS_MODEL: Optional[str] = None
+    JD_GENERATION_MODEL: Optional[str] = None
+    EVALUATION_MODEL: Optional[str] = None
+    EMAIL_MODEL: Optional[str] = None
+    TRIAGE_MODEL: Optional[str] = None  # tiered mode first pass; defaults to EVALUATION_MODEL
+    FINALIST_MODEL: str = "gpt-4"  # tiered mode re-evaluation of top and close-call candidates
+    TIERED_TOP_N: int = 3
+    TIERED_CLOSE_CALL_MARGIN: float = 10.0  # triage scores within this of 70 are re-evaluated
+    
+    # Text extraction
+    PDF_EXTRACTORS: str = "pypdfium2,pypdf,pypdf2,pdfminer"  # backends to use when installed, ranked by measured speed
+    
+    # Resume evaluation output
+    EVALUATION_MODE: str = "full"  # "full" (reasons and evidence per criterion) or "lean" (scores and a summary)
+    EVALUATION_MAX_TOKENS: int = 3000
+    LEAN_EVALUATION_MAX_TOKENS: int = 400
+    
+    # Server
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WORKERS: int = 1
+    
+    # OpenAI HTTP connection pool
+    OPENAI_MAX_CONNECTIONS: int = 20
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    OPENAI_KEEPALIVE_EXPIRY: float = 60.0
+    OPENAI_HTTP2: bool = False  # requires the 'h2' package
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_READ_TIMEOUT: float = 120.0
+    OPENAI_POOL_TIMEOUT: float = 30.0
+    OPENAI_MAX_RETRIES: int = 2
+    OPENAI_PREWARM_CONNECTIONS: int = 0  # connections opened at startup
+    
+    # Caches for JD analysis, text extraction and evaluations
+    CACHE_BACKEND: str = "auto"  # "memory", "sqlite" or "auto" (sqlite when WORKERS > 1)
+    CACHE_PATH: str = ".cache/recruitment_ai.sqlite3"
+    CACHE_TTL_SECONDS: int = 86400
+    CACHE_MAX_ENTRIES: int = 1024
+    
+    JOB_TTL_SECONDS: int = 21600  # how long background job status and results are kept
+    JOB_HEARTBEAT_SECONDS: int = 10  # jobs whose worker misses three heartbeats are marked failed
+    
+    # Columnar (Parquet/Arrow) export
+    EXPORT_ROW_GROUP_SIZE: int = 10_000  # candidates per row group
+    
+    # Cascaded scoring defaults
+    CASCADE_THRESHOLD: float = 50.0  # local skill-coverage score that earns a full LLM evaluation
+    CASCADE_TOP_PERCENT: float = 20.0  # top share of candidates by local score always evaluated by the LLM
+    
+    # Skill taxonomy
+    SKILL_TAXONOMY_PATH: Optional[str] = None  # JSON file of {"Skill": ["alias", ...]} merged into the built-in taxonomy
+    
+    # Dashboard analytics rollups
+    ANALYTICS_BACKEND: str = "sqlite"  # "sqlite" keeps rollups across restarts; "memory" is per process
+    ANALYTICS_HISTORY_DAYS: int = 90
+    ANALYTICS_MAX_TRACKED_SKILLS: int = 500
+    ADMIN_TOKEN: Optional[str] = None  # required in X-Admin-Token to reset analytics; unset disables the reset
+    
+    # Job description cache
+    JD_CACHE_ENABLED: bool = True
+    JD_CACHE_TTL_SECONDS: int = 86400
+    JD_CACHE_MAX_ENTRIES: int = 256
+    JD_VARIANT_POOL_SIZE: int = 0  # pre-generated variants kept per request for instant regeneration
+    
+    # Identical concurrent LLM calls share one upstream request
+    LLM_COALESCING_ENABLED: bool = True
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -22,7 +96,7 @@ class settings(BaseSettings):
 def load_settings_safely():
     """Load settings with fallback for encoding issues"""
     try:
-        return settings()
+        return Settings()
     except UnicodeDecodeError as e:
         logger.warning(f"Encoding issue with .env file: {e}. Trying alternative approach...")
         
@@ -44,7 +118,7 @@ def load_settings_safely():
                         continue
                 
                 # Now try to create settings again
-                return settings()
+                return Settings()
             except Exception as inner_e:
                 logger.error(f"Failed to read .env file: {inner_e}")
         
@@ -53,7 +127,7 @@ def load_settings_safely():
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
         
-        return settings(
+        return Settings(
             OPENAI_API_KEY=api_key,
             APP_NAME=os.environ.get("APP_NAME", "Recruitment AI Agent"),
             APP_VERSION=os.environ.get("APP_VERSION", "1.0.0"),
@@ -62,9 +136,27 @@ def load_settings_safely():
             MODEL_NAME=os.environ.get("MODEL_NAME", "gpt-3.5-turbo")
         )
 
-try:
-    settings = load_settings_safely()
-    logger.info("Configuration loaded successfully")
-except Exception as e:
-    logger.error(f"Error loading configuration: {str(e)}")
-    raise
\ No newline at end of file
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+def get_settings() -> Settings:
+    """Load settings on first use so importing modules stays cheap"""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                try:
+                    _settings = load_settings_safely()
+                    logger.info("Configuration loaded successfully")
+                except Exception as e:
+                    logger.error(f"Error loading configuration: {str(e)}")
+                    raise
+    return _settings
+
+class _LazySettings:
+    """Proxy that defers reading `.env` and the environment until an attribute is used"""
+
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+settings = _LazySettings()
@@ -0,0 +1,143 @@
+import importlib.util
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+
+import models
+from config import settings
+
+# Columnar exports of matching results for analysis in pandas, Polars or
+# DuckDB. pyarrow is optional and imported on first use.
+FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", ".arrow")
+}
+
+# CandidateResult fields carried into the export; timings are flattened into columns
+CANDIDATE_FIELDS = {
+    "filename", "name", "email", "phone", "location", "years_of_experience", "score", "scoring",
+    "local_score", "triage_score", "missing_skills", "matched_skills", "remarks", "criteria", "timings"
+}
+
+def available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+def schema():
+    """One row per candidate; criteria and timing stages are nested lists"""
+    import pyarrow as pa  # imported lazily to keep startup fast
+
+    return pa.schema([
+        ("filename", pa.string()),
+        ("name", pa.string()),
+        ("email", pa.string()),
+        ("phone", pa.string()),
+        ("location", pa.string()),
+        ("years_of_experience", pa.float64()),
+        ("score", pa.float64()),
+        ("scoring", pa.string()),
+        ("local_score", pa.float64()),
+        ("triage_score", pa.float64()),
+        ("missing_skills", pa.list_(pa.string())),
+        ("matched_skills", pa.list_(pa.string())),
+        ("remarks", pa.string()),
+        ("criteria", pa.list_(pa.struct([
+            ("category", pa.string()),
+            ("criterion", pa.string()),
+            ("score", pa.float64()),
+            ("importance", pa.string())
+        ]))),
+        ("total_ms", pa.float64()),
+        ("prompt_tokens", pa.int64()),
+        ("completion_tokens", pa.int64()),
+        ("stages", pa.list_(pa.struct([
+            ("name", pa.string()),
+            ("duration_ms", pa.float64()),
+            ("prompt_tokens", pa.int64()),
+            ("completion_tokens", pa.int64())
+        ]))),
+        ("error", pa.string())
+    ])
+
+def candidate_row(candidate: models.CandidateResult, filename: Optional[str] = None, error: Optional[str] = None) -> Dict[str, Any]:
+    """A candidate result as an export row"""
+    record = candidate.model_dump(mode="json", include=CANDIDATE_FIELDS)
+    timings = record.pop("timings", None) or {}
+    return {
+        **record,
+        "filename": filename or candidate.filename,
+        "total_ms": timings.get("total_ms"),
+        "prompt_tokens": timings.get("prompt_tokens"),
+        "completion_tokens": timings.get("completion_tokens"),
+        "stages": timings.get("stages", []),
+        "error": error
+    }
+
+def batch_rows(batch: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Export rows of a batch saved by `ranking.save_batch`"""
+    for candidate in batch["candidates"]:
+        record = dict(candidate)
+        timings = record.pop("timings", None) or {}
+        yield {
+            **record,
+            "total_ms": timings.get("total_ms"),
+            "prompt_tokens": timings.get("prompt_tokens"),
+            "completion_tokens": timings.get("completion_tokens"),
+            "stages": timings.get("stages", []),
+            "error": None
+        }
+
+class ColumnarWriter:
+    """Writes export rows to a Parquet or Arrow IPC file, one row group at a time.
+
+    Rows are buffered until `row_group_size` are pending, so memory stays
+    bounded however many candidates are written. The file is only complete
+    once `close` has written its footer.
+    """
+
+    def __init__(self, sink: Union[str, BinaryIO], output_format: str = "parquet", row_group_size: Optional[int] = None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.schema = schema()
+        self.row_group_size = row_group_size or settings.EXPORT_ROW_GROUP_SIZE
+        self._rows: List[Dict[str, Any]] = []
+        if output_format == "parquet":
+            self._writer = pq.ParquetWriter(sink, self.schema, compression="zstd")
+        else:
+            # Uncompressed so readers can memory-map the file
+            self._writer = pa.ipc.new_file(sink, self.schema)
+
+    def write(self, row: Dict[str, Any]) -> bool:
+        """Buffer one row; returns True when this completed a row group and it was written"""
+        self._rows.append({name: row.get(name) for name in self.schema.names})
+        if len(self._rows) < self.row_group_size:
+            return False
+        self.flush()
+        return True
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        import pyarrow as pa
+
+        self._writer.write_batch(pa.RecordBatch.from_pylist(self._rows, schema=self.schema))
+        self._rows = []
+
+    def write_batch(self, batch) -> None:
+        """Write an existing record batch with this schema, e.g. one copied from an earlier file"""
+        self.flush()
+        self._writer.write_batch(batch)
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+def write_rows(rows: Iterator[Dict[str, Any]], sink: Union[str, BinaryIO], output_format: str = "parquet") -> int:
+    """Write all rows to `sink` and return how many were written"""
+    writer = ColumnarWriter(sink, output_format)
+    count = 0
+    try:
+        for row in rows:
+            writer.write(row)
+            count += 1
+    finally:
+        writer.close()
+    return count
@@ -0,0 +1,360 @@
+import bisect
+import importlib.util
+import io
+import re
+import threading
+import time
+import zipfile
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from logger import logger
+
+# Approximate seconds per MB of PDF for each backend, from published extractor
+# benchmarks. Used to rank backends until this process has measured its own.
+BENCHMARK_SECONDS_PER_MB = {
+    "pypdfium2": 0.05,
+    "pypdf": 0.6,
+    "pypdf2": 0.8,
+    "pdfminer": 2.5
+}
+# Approximate fixed cost of opening a document, which dominates small resumes
+BENCHMARK_OVERHEAD_SECONDS = {
+    "pypdfium2": 0.002,
+    "pypdf": 0.005,
+    "pypdf2": 0.005,
+    "pdfminer": 0.03
+}
+# Upper bounds (MB) of the size ranges measured separately; larger files share the last range
+SIZE_BUCKETS_MB = (0.1, 1.0)
+# Weight of the newest measurement in the running average
+_SMOOTHING = 0.2
+
+class PdfExtractor:
+    """One PDF text extraction backend; the library is imported on first use"""
+
+    name = ""
+    module = ""
+
+    def available(self) -> bool:
+        return importlib.util.find_spec(self.module) is not None
+
+    def extract(self, content: bytes) -> str:
+        raise NotImplementedError
+
+class PdfiumExtractor(PdfExtractor):
+    name = "pypdfium2"
+    module = "pypdfium2"
+
+    def extract(self, content: bytes) -> str:
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(content)
+        try:
+            pages = []
+            for page in pdf:
+                text_page = page.get_textpage()
+                pages.append(text_page.get_text_range())
+                text_page.close()
+                page.close()
+            return "\n".join(pages)
+        finally:
+            pdf.close()
+
+class PypdfExtractor(PdfExtractor):
+    name = "pypdf"
+    module = "pypdf"
+
+    def extract(self, content: bytes) -> str:
+        import pypdf
+
+        reader = pypdf.PdfReader(io.BytesIO(content))
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+class PyPDF2Extractor(PdfExtractor):
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def extract(self, content: bytes) -> str:
+        import PyPDF2
+
+        reader = PyPDF2.PdfReader(io.BytesIO(content))
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+class PdfminerExtractor(PdfExtractor):
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def extract(self, content: bytes) -> str:
+        from pdfminer.high_level import extract_text
+
+        return extract_text(io.BytesIO(content))
+
+PDF_EXTRACTORS: Dict[str, PdfExtractor] = {
+    extractor.name: extractor
+    for extractor in (PdfiumExtractor(), PypdfExtractor(), PyPDF2Extractor(), PdfminerExtractor())
+}
+
+_stats: Dict[Tuple[str, int], Dict[str, Any]] = {}  # keyed by backend and size range
+_stats_lock = threading.Lock()
+_enabled: Optional[List[PdfExtractor]] = None
+
+def _enabled_extractors() -> List[PdfExtractor]:
+    """Configured backends whose libraries are installed, checked once"""
+    global _enabled
+    if _enabled is None:
+        names = [name.strip().lower() for name in settings.PDF_EXTRACTORS.split(",") if name.strip()]
+        unknown = [name for name in names if name not in PDF_EXTRACTORS]
+        if unknown:
+            logger.warning(f"Ignoring unknown PDF extractors: {', '.join(unknown)}")
+        _enabled = [PDF_EXTRACTORS[name] for name in names if name in PDF_EXTRACTORS and PDF_EXTRACTORS[name].available()]
+        logger.info(f"PDF extractors available: {', '.join(extractor.name for extractor in _enabled) or 'none'}")
+    return _enabled
+
+def _size_bucket(size: int) -> int:
+    return bisect.bisect_left(SIZE_BUCKETS_MB, size / 1_000_000)
+
+def _expected_cost(name: str, size: int) -> float:
+    """Expected seconds to read a document of this size, inflated by the share of
+    similar documents the backend could not read"""
+    stats = _stats.get((name, _size_bucket(size)), {})
+    size_mb = max(size / 1_000_000, 0.01)
+    if stats.get("seconds_per_mb") is None:
+        seconds = BENCHMARK_OVERHEAD_SECONDS.get(name, 0.01) + BENCHMARK_SECONDS_PER_MB.get(name, 1.0) * size_mb
+    else:
+        seconds = stats["seconds_per_mb"] * size_mb
+    if not stats:
+        return seconds
+    success_rate = stats["succeeded"] / stats["attempts"]
+    return seconds / max(success_rate, 0.1)
+
+def _record(name: str, seconds: float, size: int, succeeded: bool) -> None:
+    """Count an attempt; only successful runs update the timing, since a backend
+    that fails fast is not fast"""
+    seconds_per_mb = seconds / max(size / 1_000_000, 0.01)
+    with _stats_lock:
+        stats = _stats.setdefault((name, _size_bucket(size)), {"attempts": 0, "succeeded": 0, "seconds_per_mb": None})
+        stats["attempts"] += 1
+        if not succeeded:
+            return
+        stats["succeeded"] += 1
+        if stats["seconds_per_mb"] is None:
+            stats["seconds_per_mb"] = seconds_per_mb
+        else:
+            stats["seconds_per_mb"] += _SMOOTHING * (seconds_per_mb - stats["seconds_per_mb"])
+
+def ranked_extractors(size: int) -> List[PdfExtractor]:
+    """Available backends, cheapest expected first for a document of `size` bytes"""
+    with _stats_lock:
+        return sorted(_enabled_extractors(), key=lambda extractor: _expected_cost(extractor.name, size))
+
+def extract_pdf_text(content: bytes, filename: str = "") -> str:
+    """Text of a PDF from the fastest backend that reads it.
+
+    Backends are tried cheapest first for the document's size; one that raises or returns only
+    whitespace falls through to the next. Raises the last error when no
+    backend can open the file. A PDF with no text layer yields "".
+    """
+    extractors = ranked_extractors(len(content))
+    if not extractors:
+        raise RuntimeError("No PDF extraction backend is installed")
+
+    last_error = None
+    opened = False
+    for extractor in extractors:
+        start = time.perf_counter()
+        try:
+            text = extractor.extract(content)
+        except Exception as e:
+            _record(extractor.name, time.perf_counter() - start, len(content), False)
+            logger.warning(f"{extractor.name} failed on {filename}: {str(e)}")
+            last_error = e
+            continue
+
+        opened = True
+        succeeded = bool(text.strip())
+        _record(extractor.name, time.perf_counter() - start, len(content), succeeded)
+        if succeeded:
+            logger.info(f"Extracted text from {filename} with {extractor.name}")
+            return text
+        logger.warning(f"{extractor.name} found no text in {filename}")
+
+    if not opened:
+        raise last_error
+    return ""
+
+def benchmark(documents: List[bytes]) -> List[Dict[str, Any]]:
+    """Run every available backend over sample PDFs and seed the ranking with the results"""
+    results = []
+    for extractor in _enabled_extractors():
+        total_seconds = 0.0
+        total_bytes = 0
+        failures = 0
+        for content in documents:
+            start = time.perf_counter()
+            try:
+                succeeded = bool(extractor.extract(content).strip())
+            except Exception:
+                succeeded = False
+            seconds = time.perf_counter() - start
+            _record(extractor.name, seconds, len(content), succeeded)
+            total_seconds += seconds
+            total_bytes += len(content)
+            failures += 0 if succeeded else 1
+        results.append({
+            "extractor": extractor.name,
+            "documents": len(documents),
+            "failures": failures,
+            "seconds": round(total_seconds, 4),
+            "mb_per_second": round(total_bytes / 1_000_000 / total_seconds, 2) if total_seconds else None
+        })
+    return sorted(results, key=lambda result: result["seconds"])
+
+def extraction_metrics() -> List[Dict[str, Any]]:
+    """For each size range, backends in the order they are currently tried, with
+    their measured throughput"""
+    bounds = [0.0, *SIZE_BUCKETS_MB, None]
+    metrics = []
+    for bucket in range(len(SIZE_BUCKETS_MB) + 1):
+        lower, upper = bounds[bucket], bounds[bucket + 1]
+        # Rank as for a document in the middle of the range
+        size = int((lower + upper) / 2 * 1_000_000) if upper is not None else int(lower * 2 * 1_000_000)
+        ranked = ranked_extractors(size)
+        with _stats_lock:
+            extractors = []
+            for extractor in ranked:
+                stats = _stats.get((extractor.name, bucket), {})
+                extractors.append({
+                    "extractor": extractor.name,
+                    "attempts": stats.get("attempts", 0),
+                    "succeeded": stats.get("succeeded", 0),
+                    "expected_seconds_per_mb": round(_expected_cost(extractor.name, size) / (size / 1_000_000), 4),
+                    "measured": stats.get("seconds_per_mb") is not None
+                })
+        metrics.append({"min_mb": lower, "max_mb": upper, "extractors": extractors})
+    return metrics
+
+# WordprocessingML elements read by the streaming DOCX parser
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_PARAGRAPH = _W + "p"
+_TEXT = _W + "t"
+_TAB = _W + "tab"
+_BREAKS = (_W + "br", _W + "cr")
+_ROW = _W + "tr"
+_CELL = _W + "tc"
+# Text boxes are stored twice; the VML fallback copy is skipped
+_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_TAGS = (_PARAGRAPH, _TEXT, _TAB, *_BREAKS, _ROW, _CELL, _FALLBACK)
+_HEADER_FOOTER_PART = re.compile(r"word/(header|footer)(\d*)\.xml")
+
+def _iter_part_lines(stream: IO[bytes]) -> Iterator[str]:
+    """Paragraph and table-row text of one WordprocessingML part, in document order.
+
+    Only the elements that carry text are reported by the parser, and each
+    finished top-level block is freed as parsing goes, so memory stays
+    constant however long the document is. Table rows become one line with
+    cells joined by " | "; text boxes are emitted as their own lines.
+    """
+    from lxml import etree  # installed with python-docx; imported lazily to keep startup fast
+
+    paragraphs: List[List[str]] = []  # open paragraphs; a text box nests inside one
+    rows: List[List[str]] = []
+    cells: List[List[str]] = []
+    fallback_level = 0
+
+    for event, element in etree.iterparse(stream, events=("start", "end"), tag=_TAGS):
+        tag = element.tag
+        if tag == _FALLBACK:
+            fallback_level += 1 if event == "start" else -1
+            continue
+        if fallback_level:
+            continue
+
+        if event == "start":
+            if tag == _PARAGRAPH:
+                paragraphs.append([])
+            elif tag == _ROW:
+                rows.append([])
+            elif tag == _CELL:
+                cells.append([])
+            continue
+
+        if tag == _TEXT:
+            if paragraphs:
+                paragraphs[-1].append(element.text or "")
+            continue
+        if tag == _TAB:
+            if paragraphs:
+                paragraphs[-1].append("\t")
+            continue
+        if tag in _BREAKS:
+            if paragraphs:
+                paragraphs[-1].append("\n")
+            continue
+
+        if tag == _PARAGRAPH:
+            text = "".join(paragraphs.pop())
+            if cells:
+                cells[-1].append(text)
+            else:
+                yield text
+        elif tag == _CELL:
+            cell = " ".join(line.strip() for line in cells.pop() if line.strip())
+            if rows and cell:
+                rows[-1].append(cell)
+        elif tag == _ROW:
+            line = " | ".join(rows.pop())
+            if cells:
+                cells[-1].append(line)
+            elif line:
+                yield line
+
+        if not paragraphs and not cells:
+            # Free the finished block and everything before it
+            element.clear()
+            parent = element.getparent()
+            while parent is not None and element.getprevious() is not None:
+                del parent[0]
+
+def iter_docx_lines(content: bytes) -> Iterator[str]:
+    """Lines of a DOCX file: headers, then the body, then footers.
+
+    Parts are decompressed and parsed incrementally straight from the zip.
+    Header and footer lines repeated across sections are emitted once.
+    """
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        parts = {"header": [], "footer": []}
+        for name in archive.namelist():
+            match = _HEADER_FOOTER_PART.fullmatch(name)
+            if match:
+                parts[match.group(1)].append((int(match.group(2) or 0), name))
+
+        seen = set()
+
+        def header_footer_lines(kind: str) -> Iterator[str]:
+            for _, name in sorted(parts[kind]):
+                with archive.open(name) as stream:
+                    for line in _iter_part_lines(stream):
+                        if line.strip() and line not in seen:
+                            seen.add(line)
+                            yield line
+
+        yield from header_footer_lines("header")
+        with archive.open("word/document.xml") as stream:
+            yield from _iter_part_lines(stream)
+        yield from header_footer_lines("footer")
+
+def extract_docx_text(content: bytes) -> str:
+    """Text of a DOCX file, including tables, text boxes, headers and footers"""
+    return "\n".join(iter_docx_lines(content)) + "\n"
+
+if __name__ == "__main__":
+    import argparse
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Benchmark the installed PDF extraction backends")
+    parser.add_argument("files", nargs="+", help="Sample PDF files")
+    args = parser.parse_args()
+
+    for result in benchmark([Path(path).read_bytes() for path in args.files]):
+        print(f"{result['extractor']:<10} {result['seconds']:>8.3f}s  {result['mb_per_second'] or 0:>8.2f} MB/s  failures: {result['failures']}")
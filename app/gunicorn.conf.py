@@ -0,0 +1,30 @@
+"""Gunicorn configuration for running the API with several worker processes.
+
+Usage (from the app directory):
+    gunicorn main:app
+
+The app is imported once in the master (`preload_app`) and forked into
+`WORKERS` Uvicorn workers. Send SIGHUP to the master for a graceful reload:
+new workers are started and old ones finish their in-flight requests within
+`graceful_timeout`. Caches are shared between workers through the SQLite
+store configured by CACHE_BACKEND / CACHE_PATH.
+"""
+from config import settings
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = settings.WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# Resume batches can take minutes; keep the worker timeout above the slowest expected request
+timeout = 300
+graceful_timeout = 60
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth from PDF parsing. Background
+# matching jobs run inside the worker that accepted them; one still running when
+# its worker is recycled or reloaded is reported as failed (see jobs.py).
+max_requests = 1000
+max_requests_jitter = 100
+
+accesslog = "-"
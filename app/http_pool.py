@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from config import settings
+from logger import logger
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """Wraps an httpx transport to track in-flight requests and pool occupancy"""
+
+    def __init__(self, transport: httpx.HTTPTransport, max_connections: int):
+        self._transport = transport
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_total = 0
+        self.errors_total = 0
+        self.total_latency_ms = 0.0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.in_flight += 1
+            self.requests_total += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            return self._transport.handle_request(request)
+        except Exception:
+            with self._lock:
+                self.errors_total += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.in_flight -= 1
+                self.total_latency_ms += elapsed_ms
+
+    def close(self) -> None:
+        self._transport.close()
+
+    def _pool_state(self) -> Dict[str, int]:
+        # httpcore does not expose pool state publicly; read it defensively
+        pool = getattr(self._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for connection in connections if connection.is_idle())
+        queued = len(getattr(pool, "_requests", []) or [])
+        return {
+            "connections_open": len(connections),
+            "connections_idle": idle,
+            "connections_active": len(connections) - idle,
+            "requests_waiting": max(0, queued - (len(connections) - idle))
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "requests_total": self.requests_total,
+                "errors_total": self.errors_total,
+                "avg_latency_ms": round(self.total_latency_ms / self.requests_total, 2) if self.requests_total else 0.0
+            }
+        snapshot.update(self._pool_state())
+        snapshot["max_connections"] = self.max_connections
+        snapshot["utilization"] = round(snapshot["connections_active"] / self.max_connections, 3) if self.max_connections else 0.0
+        snapshot["peak_utilization"] = round(self.peak_in_flight / self.max_connections, 3) if self.max_connections else 0.0
+        return snapshot
+
+_transport: Optional[InstrumentedTransport] = None
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def build_http_client() -> httpx.Client:
+    """Build the pooled httpx client used by the OpenAI SDK from settings"""
+    global _transport
+
+    http2 = settings.OPENAI_HTTP2
+    if http2 and not _http2_available():
+        logger.warning("OPENAI_HTTP2 is enabled but the 'h2' package is not installed; falling back to HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+    )
+    _transport = InstrumentedTransport(
+        httpx.HTTPTransport(limits=limits, http2=http2),
+        max_connections=settings.OPENAI_MAX_CONNECTIONS
+    )
+    logger.info(
+        f"OpenAI HTTP pool: max_connections={settings.OPENAI_MAX_CONNECTIONS}, "
+        f"keepalive={settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS}, http2={http2}"
+    )
+    return httpx.Client(transport=_transport, timeout=build_timeout())
+
+def build_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.OPENAI_READ_TIMEOUT,
+        connect=settings.OPENAI_CONNECT_TIMEOUT,
+        pool=settings.OPENAI_POOL_TIMEOUT
+    )
+
+def pool_metrics() -> Dict[str, Any]:
+    """Current pool utilization, or an empty dict before the client is built"""
+    if _transport is None:
+        return {}
+    return _transport.metrics()
@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from collections.abc import Sized
+from typing import Any, Dict, Iterable, Optional, Set
+
+import cache
+import matching
+import models
+from config import settings
+from logger import logger
+
+# Job records live in the shared cache so any worker can answer status polls,
+# while the work itself runs on the worker that accepted the job. That worker
+# records its pid and a heartbeat, so a job left behind when it exits (a
+# reload, max_requests recycling or a crash) is reported as failed.
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="matching-job")
+_active_jobs: Set[str] = set()
+_active_lock = threading.Lock()
+_heartbeat_pid: Optional[int] = None
+
+ORPHANED_ERROR = "The worker running this job stopped before it finished; please resubmit"
+
+def _job_store() -> cache.Cache:
+    return cache.get_cache(
+        "jobs",
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        default_ttl=settings.JOB_TTL_SECONDS
+    )
+
+def _candidates_key(job_id: str) -> str:
+    return f"{job_id}:candidates"
+
+def get_job(job_id: str, since: int = 0) -> Optional[Dict[str, Any]]:
+    """Job record, with only the candidates evaluated after the first `since`.
+
+    Candidates are listed while the job runs; once it has finished they are
+    in `result`.
+    """
+    job = _job_store().get(job_id)
+    if job is None:
+        return None
+    if job["status"] in ("queued", "running") and _is_orphaned(job):
+        job = _fail_orphaned_job(job_id)
+        if job is None:
+            return None
+    candidates = []
+    if job["status"] in ("queued", "running"):
+        candidates = _job_store().pool_items(_candidates_key(job_id), since)
+    return dict(job, candidates=candidates)
+
+def _owner_alive(pid: Optional[int]) -> bool:
+    # Caches are shared per host, so the owner is a local process; signal 0 only checks it exists
+    if pid is None or pid == os.getpid() or os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def _is_orphaned(job: Dict[str, Any]) -> bool:
+    """Whether the worker that owns an unfinished job has exited or stopped sending heartbeats"""
+    heartbeat_at = job.get("heartbeat_at")
+    if heartbeat_at is not None and time.time() - heartbeat_at > 3 * settings.JOB_HEARTBEAT_SECONDS:
+        return True
+    return not _owner_alive(job.get("owner_pid"))
+
+def _fail_orphaned_job(job_id: str) -> Dict[str, Any]:
+    def fail(job: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        # Re-checked inside the update in case the owner finished meanwhile
+        if job is None or job["status"] not in ("queued", "running") or not _is_orphaned(job):
+            return job
+        logger.warning(f"Matching job {job_id} was orphaned by worker {job.get('owner_pid')}")
+        return dict(job, status="failed", error=ORPHANED_ERROR, updated_at=datetime.now().isoformat())
+
+    job = _job_store().update(job_id, fail)
+    _job_store().delete(_candidates_key(job_id))
+    return job
+
+def _update_job(job_id: str, **changes: Any) -> None:
+    _job_store().update(
+        job_id,
+        lambda job: dict(job or {}, **changes, updated_at=datetime.now().isoformat(), heartbeat_at=time.time())
+    )
+
+def _send_heartbeats() -> None:
+    while True:
+        time.sleep(settings.JOB_HEARTBEAT_SECONDS)
+        with _active_lock:
+            job_ids = list(_active_jobs)
+        for job_id in job_ids:
+            try:
+                _job_store().update(job_id, lambda job: dict(job, heartbeat_at=time.time()) if job else job)
+            except Exception as e:
+                logger.error(f"Error recording heartbeat for job {job_id}: {str(e)}")
+
+def _start_heartbeat() -> None:
+    """Start this process's heartbeat thread once; threads do not survive fork"""
+    global _heartbeat_pid
+    with _active_lock:
+        if _heartbeat_pid == os.getpid():
+            return
+        _heartbeat_pid = os.getpid()
+    threading.Thread(target=_send_heartbeats, name="matching-job-heartbeat", daemon=True).start()
+
+def submit_matching_job(
+    job_description: str,
+    documents: Iterable[matching.ResumeDocument],
+    include_timings: bool = False,
+    options: Optional[models.MatchingOptions] = None
+) -> Dict[str, Any]:
+    """Queue a matching run in the background and return its job record"""
+    job_id = uuid.uuid4().hex
+    now = datetime.now().isoformat()
+    job = {
+        "job_id": job_id,
+        "status": "queued",
+        # Unknown for streamed archives until every member has been read
+        "total": len(documents) if isinstance(documents, Sized) else 0,
+        "processed": 0,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "owner_pid": os.getpid(),
+        "heartbeat_at": time.time()
+    }
+    _start_heartbeat()
+    with _active_lock:
+        _active_jobs.add(job_id)
+    _job_store().set(job_id, job)
+    _executor.submit(_run_matching_job, job_id, job_description, documents, include_timings, options)
+    logger.info(f"Queued matching job {job_id} for {job['total'] or 'streamed'} resumes")
+    return job
+
+def _run_matching_job(
+    job_id: str,
+    job_description: str,
+    documents: Iterable[matching.ResumeDocument],
+    include_timings: bool,
+    options: Optional[models.MatchingOptions]
+) -> None:
+    _update_job(job_id, status="running")
+
+    def on_progress(processed: int, total: int, candidate: models.CandidateResult) -> None:
+        # Publish each evaluation as it completes so pollers can show rows incrementally;
+        # appended on its own so the job record stays small however many candidates there are
+        _job_store().push(_candidates_key(job_id), candidate.model_dump(mode="json"))
+        _update_job(job_id, processed=processed, total=total)
+
+    try:
+        result = matching.run_matching(
+            job_description,
+            documents,
+            include_timings=include_timings,
+            on_progress=on_progress,
+            options=options
+        )
+        _update_job(job_id, status="completed", result=result.model_dump(mode="json"))
+        logger.info(f"Matching job {job_id} completed")
+    except Exception as e:
+        logger.error(f"Matching job {job_id} failed: {str(e)}", exc_info=True)
+        _update_job(job_id, status="failed", error=str(e))
+    finally:
+        with _active_lock:
+            _active_jobs.discard(job_id)
+        # The finished job's candidates are in its result
+        _job_store().delete(_candidates_key(job_id))
@@ -1,38 +1,211 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Logging is configured from the environment rather than `config.settings`
+# because config itself logs while loading.
+LOG_DIR = os.environ.get("LOG_DIR", "logs")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()  # "text" or "json"
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", "5"))
+LOG_MAX_MESSAGE_CHARS = int(os.environ.get("LOG_MAX_MESSAGE_CHARS", "2000"))
+LOG_SAMPLE_EVERY = int(os.environ.get("LOG_SAMPLE_EVERY", "100"))
+# Rotation is not safe across processes, so each worker gets its own log file
+LOG_FILE_PER_PROCESS = int(os.environ.get("WORKERS", "1")) > 1
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes present on every LogRecord, plus the traceback added by
+# ExceptionQueueHandler; anything else was passed via `extra`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "exception"}
+
+def truncate(value: Any, limit: int = LOG_MAX_MESSAGE_CHARS) -> str:
+    """Render a value as a string capped at `limit` characters"""
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [truncated {len(text) - limit} chars]"
+
+def _exception_text(formatter: logging.Formatter, record: logging.LogRecord) -> Optional[str]:
+    """Traceback kept by ExceptionQueueHandler, or formatted from exc_info when logged directly"""
+    exception = getattr(record, "exception", None)
+    if exception is None and record.exc_info:
+        exception = formatter.formatException(record.exc_info)
+    return exception
+
+class TruncatingFormatter(logging.Formatter):
+    """Plain text formatter that caps the size of each message; tracebacks are never cut"""
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        record.message = truncate(record.message)
+        return super().formatMessage(record)
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        exception = getattr(record, "exception", None)
+        if exception:
+            text = f"{text}\n{exception}"
+        return text
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with size caps on message and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": truncate(record.getMessage()),
+        }
+        for key, value in vars(record).items():
+            if key in _RESERVED_ATTRS or key.startswith("_"):
+                continue
+            if isinstance(value, (int, float, bool)) or value is None:
+                entry[key] = value
+            else:
+                entry[key] = truncate(value)
+        exception = _exception_text(self, record)
+        if exception:
+            entry["exception"] = exception
+        return json.dumps(entry, ensure_ascii=False)
+
+class ExceptionQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps the traceback apart from the message.
+
+    The stock `prepare` merges the traceback into the message and clears
+    exc_info before the listener sees the record, so formatters could only
+    truncate it along with the message. Here it travels as `exception`.
+    """
+
+    _formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        exception = record.exc_text
+        if record.exc_info:
+            exception = self._formatter.formatException(record.exc_info)
+        if record.stack_info:
+            stack = self._formatter.formatStack(record.stack_info)
+            exception = f"{exception}\n{stack}" if exception else stack
+
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        record.exception = exception
+        return record
+
+class SamplingFilter(logging.Filter):
+    """Keep one in every `every` records that carry a `sample_key` extra.
+
+    Used for high-frequency lines such as health checks; records without a
+    sample key always pass.
+    """
+
+    def __init__(self, every: int = LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.every = max(1, every)
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None:
+            return True
+        with self._lock:
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+        if (count - 1) % self.every:
+            return False
+        record.sampled_count = count
+        return True
+
+class LazyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that creates its directory on first write, not at import"""
+
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, delay=True, **kwargs)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+def _build_file_handler(formatter: logging.Formatter, per_process: bool) -> logging.Handler:
+    """Size-rotated file handler; with `per_process` the file name includes the pid"""
+    suffix = f".{os.getpid()}" if per_process else ""
+    log_file = Path(LOG_DIR) / f"recruitment_ai_{datetime.now().strftime('%Y%m%d')}{suffix}.log"
+    file_handler = LazyRotatingFileHandler(
+        log_file,
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding="utf-8"
+    )
+    file_handler.setFormatter(formatter)
+    return file_handler
+
+def _build_formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JSONFormatter()
+    return TruncatingFormatter(TEXT_FORMAT)
 
 def setup_logger(name: str = "recruitment_ai"):
-    """Setup and configure logger"""
+    """Setup and configure logger.
+
+    Records are pushed onto an in-memory queue by the calling thread and
+    written to stdout and a size-rotated file by a background listener, so
+    request handlers never block on disk or console I/O.
+    """
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    # Create logs directory if it doesn't exist
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    
-    # File handler
-    log_file = log_dir / f"recruitment_ai_{datetime.now().strftime('%Y%m%d')}.log"
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(logging.INFO)
-    
+    logger.setLevel(LOG_LEVEL)
+
+    if any(isinstance(handler, logging.handlers.QueueHandler) for handler in logger.handlers):
+        return logger
+
+    formatter = _build_formatter()
+
+    # File handler, rotated by size; the logs directory is created on first write
+    file_handler = _build_file_handler(formatter, LOG_FILE_PER_PROCESS)
+
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    
-    # Formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
-    
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    queue_handler = ExceptionQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+    logger.addHandler(queue_handler)
+
+    def restart_listener_in_child():
+        # The listener thread does not survive fork (e.g. gunicorn --preload);
+        # give each worker a fresh queue, its own listener thread and its own
+        # log file, since workers rotating one file would overwrite each other.
+        child_queue: queue.Queue = queue.Queue(-1)
+        child_file_handler = _build_file_handler(formatter, per_process=True)
+        child_listener = logging.handlers.QueueListener(child_queue, child_file_handler, console_handler, respect_handler_level=True)
+        queue_handler.queue = child_queue
+        child_listener.start()
+        atexit.register(child_listener.stop)
+
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=restart_listener_in_child)
+
     return logger
 
 # Global logger instance
-logger = setup_logger()
\ No newline at end of file
+logger = setup_logger()
@@ -1,25 +1,48 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, status
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException, Query, Request, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from typing import Iterable, List, Optional
+from contextlib import asynccontextmanager, closing
+from starlette.background import BackgroundTask
+import hmac
 import tempfile
 import os
 from pathlib import Path
 import time
+import json
 from datetime import datetime
 
 import models
 import utils
 import ai_services
+import serialization
+import matching
+import jobs
+import analytics
+import export
+import extraction
+import ranking
+import routing
 from config import settings
-from logger import logger
+from logger import logger, truncate
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load configuration and build API clients once the server starts, not at import"""
+    app.title = settings.APP_NAME
+    app.version = settings.APP_VERSION
+    app.openapi_schema = None
+    await run_in_threadpool(ai_services.init_client)
+    logger.info(f"{settings.APP_NAME} v{settings.APP_VERSION} started")
+    yield
 
 app = FastAPI(
-    title=settings.APP_NAME,
+    title="Recruitment AI Agent",
     description="AI-powered recruitment system for job matching and candidate evaluation",
-    version=settings.APP_VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -39,20 +62,68 @@ async def root():
 @app.get("/health", response_model=models.HealthCheck, tags=["Health"])
 async def health_check():
     """Health check endpoint"""
-    logger.info("Health check requested")
+    logger.info("Health check requested", extra={"sample_key": "health_check"})
     return {
         "status": "healthy",
         "version": settings.APP_VERSION,
         "timestamp": datetime.now()
     }
 
+@app.get("/metrics/http-pool", tags=["Health"])
+async def http_pool_metrics():
+    """OpenAI HTTP connection pool utilization, for sizing the pool against concurrency"""
+    return {
+        "pool": ai_services.http_pool_metrics(),
+        "settings": {
+            "max_connections": settings.OPENAI_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry": settings.OPENAI_KEEPALIVE_EXPIRY,
+            "http2": settings.OPENAI_HTTP2,
+            "connect_timeout": settings.OPENAI_CONNECT_TIMEOUT,
+            "read_timeout": settings.OPENAI_READ_TIMEOUT
+        }
+    }
+
+@app.get("/metrics/routing", tags=["Health"])
+async def routing_metrics():
+    """Model configured for each LLM task, with call counts and latency per task and model"""
+    return {
+        "models": {task: routing.model_for(task) for task in routing.TASKS},
+        "routing": routing.routing_metrics()
+    }
+
+@app.get("/metrics/coalescing", tags=["Health"])
+async def coalescing_metrics():
+    """Upstream LLM calls made, and identical concurrent calls that shared one instead"""
+    return {
+        "enabled": settings.LLM_COALESCING_ENABLED,
+        "coalescing": ai_services.coalescing_metrics()
+    }
+
+@app.get("/metrics/extraction", tags=["Health"])
+async def extraction_metrics():
+    """PDF extraction backends in the order they are tried for each size range, with measured throughput"""
+    return {"pdf_extractors": extraction.extraction_metrics()}
+
 @app.post("/generate-job-description", tags=["Job Description"])
-async def generate_job_description(request: models.JobDescriptionRequest):
+async def generate_job_description(
+    request: models.JobDescriptionRequest,
+    stream: bool = Query(False, description="Stream tokens as server-sent events while they are generated"),
+    regenerate: bool = Query(False, description="Return a new variant instead of the cached description")
+):
     """Generate job description using AI"""
-    logger.info(f"Received job description generation request: {request.dict()}")
+    logger.info(f"Received job description generation request for '{request.job_title}'")
+    logger.debug(f"Job description request payload: {truncate(request.dict())}")
+    
+    if stream:
+        return StreamingResponse(
+            _job_description_events(request.dict(), regenerate),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
     
     try:
-        job_description = ai_services.generate_job_description(request.dict())
+        job_description = await run_in_threadpool(ai_services.generate_job_description, request.dict(), regenerate=regenerate)
         logger.info("Job description generated successfully")
         
         return {"job_description": job_description}
@@ -64,6 +135,17 @@ async def generate_job_description(request: models.JobDescriptionRequest):
             detail=f"Error generating job description: {str(e)}"
         )
 
+def _job_description_events(jd_input: dict, regenerate: bool = False):
+    """Server-sent events for a streamed job description: one `data` event per fragment, then `done`"""
+    try:
+        # Closed explicitly so a client disconnect releases the upstream stream at once
+        with closing(ai_services.stream_job_description(jd_input, regenerate=regenerate)) as fragments:
+            for fragment in fragments:
+                yield f"data: {json.dumps(fragment)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+
 @app.post("/upload-job-description", tags=["Job Description"])
 async def upload_job_description(file: UploadFile = File(...)):
     """Upload and extract job description from file"""
@@ -98,103 +180,253 @@ async def upload_job_description(file: UploadFile = File(...)):
             detail=f"Error processing file: {str(e)}"
         )
 
+async def _read_resumes(
+    resumes: List[UploadFile],
+    keep_archives: bool = False
+) -> Iterable[matching.ResumeDocument]:
+    """Validate the batch and turn uploads into documents for the matching pipeline.
+
+    Individual files are read into memory. ZIP archives are checked against
+    the member limits, which apply across all archives in the request, and streamed member by member while matching runs;
+    with `keep_archives` they are first copied to temporary files so a
+    background job can read them after the request has finished.
+    """
+    files = [resume for resume in resumes if not utils.is_zip_archive(resume.filename)]
+    if len(files) > settings.MAX_RESUMES:
+        logger.error(f"Too many resumes uploaded: {len(files)} (max: {settings.MAX_RESUMES})")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum {settings.MAX_RESUMES} resumes allowed"
+        )
+    
+    uploads = [(resume.filename, resume.file) for resume in resumes if utils.is_zip_archive(resume.filename)]
+    await run_in_threadpool(utils.validate_zip_archives, uploads)
+    archives = []
+    for filename, file in uploads:
+        archive = await run_in_threadpool(utils.spool_to_temp_file, file) if keep_archives else file
+        archives.append((filename, archive))
+    
+    documents = [(resume.filename, await resume.read()) for resume in files]
+    if not archives:
+        return documents
+    logger.info(f"Streaming resumes from {len(archives)} ZIP archive(s)")
+    return utils.iter_resume_documents(documents, archives)
+
+def matching_options(
+    cascade: bool = Form(False, description="Pre-screen with a local skill-coverage score; only contenders get a full LLM evaluation"),
+    cascade_threshold: Optional[float] = Form(None, ge=0, le=100, description="Local score that earns a full evaluation (default CASCADE_THRESHOLD)"),
+    cascade_top_percent: Optional[float] = Form(None, ge=0, le=100, description="Top share of candidates always fully evaluated (default CASCADE_TOP_PERCENT)"),
+    tiered: bool = Form(False, description="Evaluate with the triage model and re-evaluate finalists with the finalist model"),
+    tiered_top_n: Optional[int] = Form(None, ge=0, description="Highest-scoring candidates re-evaluated as finalists (default TIERED_TOP_N)"),
+    tiered_margin: Optional[float] = Form(None, ge=0, le=100, description="Triage scores this close to the qualifying score are re-evaluated (default TIERED_CLOSE_CALL_MARGIN)"),
+    lean: Optional[bool] = Form(None, description="Request only per-criterion scores and a summary (default EVALUATION_MODE); fetch evidence from /match-candidates/evidence"),
+    top_k: Optional[int] = Form(None, ge=1, description="Return only the first K candidates in `sort` order; page through the rest with next_cursor"),
+    sort: str = Form("upload", pattern="^(upload|score)$", description="Candidate order: upload or score (highest first)")
+) -> models.MatchingOptions:
+    """Pipeline options shared by the synchronous and background matching endpoints"""
+    return models.MatchingOptions(
+        cascade=cascade,
+        cascade_threshold=cascade_threshold,
+        cascade_top_percent=cascade_top_percent,
+        tiered=tiered,
+        tiered_top_n=tiered_top_n,
+        tiered_margin=tiered_margin,
+        lean=lean,
+        top_k=top_k,
+        sort=sort
+    )
+
 @app.post("/match-candidates", response_model=models.MatchingResponse, tags=["Matching"])
 async def match_candidates(
+    request: Request,
     job_description: str = Form(..., description="Job description text"),
-    resumes: List[UploadFile] = File(..., description="Resume files to evaluate")
+    resumes: List[UploadFile] = File(..., description="Resume files to evaluate, or ZIP archives of resumes"),
+    include_timings: bool = Form(False, description="Include per-stage and per-candidate timing breakdown"),
+    options: models.MatchingOptions = Depends(matching_options),
+    fields: Optional[str] = Query(None, description="Comma-separated candidate fields to return, e.g. score,filename"),
+    include_resume_text: bool = Query(True, description="Include the resume text snippet for each candidate")
 ):
     """Match candidates against job description"""
-    start_time = time.time()
     logger.info(f"Received candidate matching request for {len(resumes)} resumes")
     
-    if len(resumes) > settings.MAX_RESUMES:
-        logger.error(f"Too many resumes uploaded: {len(resumes)} (max: {settings.MAX_RESUMES})")
+    candidate_fields = serialization.parse_fields(fields)
+    documents = await _read_resumes(resumes)
+    
+    result = await run_in_threadpool(
+        matching.run_matching,
+        job_description,
+        documents,
+        include_timings=include_timings,
+        options=options
+    )
+    return serialization.matching_response(
+        result,
+        accept_encoding=request.headers.get("accept-encoding"),
+        fields=candidate_fields,
+        include_resume_text=include_resume_text
+    )
+
+@app.post(
+    "/match-candidates/jobs",
+    response_model=models.JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Matching"]
+)
+async def submit_matching_job(
+    job_description: str = Form(..., description="Job description text"),
+    resumes: List[UploadFile] = File(..., description="Resume files to evaluate, or ZIP archives of resumes"),
+    include_timings: bool = Form(False, description="Include per-stage and per-candidate timing breakdown"),
+    options: models.MatchingOptions = Depends(matching_options)
+):
+    """Start candidate matching in the background; poll GET /jobs/{job_id} for progress and results"""
+    logger.info(f"Received background matching request for {len(resumes)} resumes")
+    
+    documents = await _read_resumes(resumes, keep_archives=True)
+    return jobs.submit_matching_job(job_description, documents, include_timings=include_timings, options=options)
+
+@app.post("/match-candidates/evidence", response_model=models.EvaluationDetails, tags=["Matching"])
+async def candidate_evidence(
+    job_description: str = Form(..., description="Job description text"),
+    resume: UploadFile = File(..., description="Resume file to explain")
+):
+    """Full per-criterion reasons and resume evidence for one candidate, fetched when drilling in"""
+    logger.info(f"Received evidence request for {resume.filename}")
+    
+    if not resume.filename or not utils.validate_file_extension(resume.filename):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Maximum {settings.MAX_RESUMES} resumes allowed"
+            detail="Unsupported file format. Please upload PDF or DOC/DOCX files."
         )
     
-    candidates = []
-    processed_files = 0
+    content = await resume.read()
+    try:
+        resume_text = await run_in_threadpool(utils.extract_text_from_bytes, resume.filename, content)
+        details = await run_in_threadpool(ai_services.evaluation_details, resume_text, job_description)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching evidence for {resume.filename}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching evaluation details: {str(e)}"
+        )
     
-    for resume in resumes:
-        if not resume.filename:
-            logger.warning("Skipping resume with no filename")
-            continue
-        
-        if not utils.validate_file_extension(resume.filename):
-            logger.warning(f"Skipping invalid file: {resume.filename}")
-            continue
-        
-        try:
-            logger.info(f"Processing resume: {resume.filename}")
-            
-            resume_text = utils.extract_text_from_file(resume)
-            
-            evaluation = ai_services.evaluate_resume(resume_text, job_description)
-            
-            candidate = models.CandidateResult(
-                filename=resume.filename,
-                score=evaluation.score,
-                missing_skills=evaluation.missing_skills,
-                remarks=evaluation.remarks,
-                resume_text=resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
-            )
-            
-            candidates.append(candidate)
-            processed_files += 1
-            logger.info(f"Successfully processed {resume.filename} - Score: {evaluation.score}")
-            
-        except Exception as e:
-            logger.error(f"Error processing resume {resume.filename}: {str(e)}")
-            error_candidate = models.CandidateResult(
-                filename=resume.filename,
-                score=0,
-                missing_skills=["Processing Error"],
-                remarks=f"Error processing resume: {str(e)}",
-                resume_text=""
-            )
-            candidates.append(error_candidate)
-    
-    best_candidate = None
-    if candidates:
-        best_candidate = max(candidates, key=lambda x: x.score)
-        logger.info(f"Best candidate: {best_candidate.filename} with score {best_candidate.score}")
-    
-    interview_email = None
-    rejection_email = None
-    
-    if best_candidate and best_candidate.score >= 70:
-        logger.info("Generating interview email for best candidate")
-        interview_email = ai_services.generate_email(
-            candidate_name=best_candidate.filename,
-            position="the position",
-            email_type="interview",
-            evaluation=best_candidate
-        )
-    
-    logger.info("Generating rejection email template")
-    rejection_email = ai_services.generate_email(
-        candidate_name="Candidate",
-        position="the position",
-        email_type="rejection"
+    details.filename = resume.filename
+    return details
+
+@app.get("/jobs/{job_id}", response_model=models.JobStatus, tags=["Matching"])
+async def get_job_status(
+    job_id: str,
+    since: int = Query(0, ge=0, description="Skip the first N evaluated candidates already received")
+):
+    """Status, progress and (once completed) results of a background matching job"""
+    job = await run_in_threadpool(jobs.get_job, job_id, since=since)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found or expired"
+        )
+    return job
+
+@app.post("/batches/{batch_id}/rerank", response_model=models.RerankResponse, tags=["Matching"])
+async def rerank_batch(batch_id: str, request: models.RerankRequest):
+    """Re-order a completed matching batch with custom weights, without calling the model again"""
+    result = await run_in_threadpool(ranking.rerank, batch_id, request)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Batch {batch_id} not found or expired"
+        )
+    return result
+
+@app.get("/batches/{batch_id}/candidates", response_model=models.CandidatePage, tags=["Matching"])
+async def list_batch_candidates(
+    request: Request,
+    batch_id: str,
+    limit: int = Query(50, ge=1, le=1000, description="Candidates per page"),
+    sort: str = Query("upload", pattern="^(upload|score)$", description="Candidate order; ignored when a cursor is given"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a matching response or the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated candidate fields to return, e.g. score,filename"),
+    include_resume_text: bool = Query(True, description="Include the resume text snippet for each candidate")
+):
+    """Page through the candidates of a completed matching batch"""
+    candidate_fields = serialization.parse_fields(fields)
+    try:
+        page = await run_in_threadpool(ranking.candidate_page, batch_id, limit, sort=sort, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if page is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Batch {batch_id} not found or expired"
+        )
+    return serialization.matching_response(
+        page,
+        accept_encoding=request.headers.get("accept-encoding"),
+        fields=candidate_fields,
+        include_resume_text=include_resume_text
     )
-    
-    processing_time = time.time() - start_time
-    logger.info(f"Candidate matching completed. Processed {processed_files} files in {processing_time:.2f} seconds")
-    
-    return models.MatchingResponse(
-        candidates=candidates,
-        best_candidate=best_candidate.filename if best_candidate else None,
-        interview_email=interview_email,
-        rejection_email=rejection_email,
-        processing_time=processing_time
+
+@app.get("/batches/{batch_id}/export", tags=["Matching"])
+async def export_batch(
+    batch_id: str,
+    file_format: str = Query("parquet", alias="format", pattern="^(parquet|arrow)$", description="parquet or arrow (Arrow IPC file)")
+):
+    """Download a completed matching batch as a columnar file, one row per candidate"""
+    if not export.available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Columnar export requires pyarrow (pip install pyarrow)"
+        )
+    batch = await run_in_threadpool(ranking.load_batch, batch_id)
+    if batch is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Batch {batch_id} not found or expired"
+        )
+
+    media_type, suffix = export.FORMATS[file_format]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as output:
+        path = output.name
+    try:
+        count = await run_in_threadpool(export.write_rows, export.batch_rows(batch), path, file_format)
+    except Exception:
+        os.unlink(path)
+        raise
+    logger.info(f"Exported batch {batch_id} as {file_format}: {count} candidates")
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=f"batch-{batch_id}{suffix}",
+        background=BackgroundTask(os.unlink, path)
     )
 
+@app.get("/analytics", response_model=models.AnalyticsSummary, tags=["Analytics"])
+async def get_analytics():
+    """Precomputed dashboard rollups across all matching runs"""
+    return await run_in_threadpool(analytics.get_summary)
+
+@app.delete("/analytics", response_model=models.AnalyticsSummary, tags=["Analytics"])
+async def reset_analytics(
+    admin_token: Optional[str] = Header(None, alias="X-Admin-Token", description="Must match ADMIN_TOKEN")
+):
+    """Clear the dashboard rollups shared by all users; requires the admin token"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Analytics reset is disabled; set ADMIN_TOKEN to enable it"
+        )
+    if not admin_token or not hmac.compare_digest(admin_token, settings.ADMIN_TOKEN):
+        logger.warning("Rejected analytics reset with a missing or invalid admin token")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+    await run_in_threadpool(analytics.reset)
+    return await run_in_threadpool(analytics.get_summary)
+
 @app.post("/generate-email", tags=["Email"])
 async def generate_email(request: dict):
     """Generate personalized email for candidate"""
-    logger.info(f"Received email generation request: {request}")
+    logger.info(f"Received {request.get('email_type', 'interview')} email generation request for {request.get('candidate_name', 'Candidate')}")
+    logger.debug(f"Email request payload: {truncate(request)}")
     
     try:
         candidate_name = request.get("candidate_name", "Candidate")
@@ -214,7 +446,8 @@ async def generate_email(request: dict):
             interview_focus_areas=evaluation_data.get("interview_focus_areas", [])
         )
         
-        email_content = ai_services.generate_email(
+        email_content = await run_in_threadpool(
+            ai_services.generate_email,
             candidate_name=candidate_name,
             position=position,
             email_type=email_type,
@@ -243,4 +476,8 @@ async def global_exception_handler(request, exc):
 if __name__ == "__main__":
     import uvicorn
     logger.info("Starting Recruitment AI Agent server")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    if settings.WORKERS > 1:
+        # Multiple worker processes need an import string; caches are shared through SQLite
+        uvicorn.run("main:app", host=settings.HOST, port=settings.PORT, workers=settings.WORKERS)
+    else:
+        uvicorn.run(app, host=settings.HOST, port=settings.PORT)
@@ -0,0 +1,357 @@
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import ai_services
+import analytics
+import models
+import profiles
+import ranking
+import routing
+import scoring
+import skills
+import tracing
+import utils
+from config import settings
+from logger import logger
+
+# (filename, raw file bytes) for one uploaded resume
+ResumeDocument = Tuple[str, bytes]
+ProgressCallback = Callable[[int, int, models.CandidateResult], None]
+
+def _snippet(resume_text: str) -> str:
+    return resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
+
+def _error_result(filename: str, error: Exception) -> models.CandidateResult:
+    # HTTPException from text extraction carries its message in `detail`
+    message = getattr(error, "detail", None) or str(error)
+    logger.error(f"Error processing resume {filename}: {message}")
+    return models.CandidateResult(
+        filename=filename,
+        score=0,
+        missing_skills=["Processing Error"],
+        remarks=f"Error processing resume: {message}",
+        resume_text=""
+    )
+
+def _prepare_document(
+    filename: str,
+    content: bytes,
+    jd_skills: List[str]
+) -> Tuple[models.CandidateResult, Optional[str]]:
+    """Extract text, profile and skills for one resume, without any model calls.
+
+    Returns the partially filled result and the full resume text, or an
+    error result and None when the file cannot be read.
+    """
+    try:
+        logger.info(f"Processing resume: {filename}")
+
+        with tracing.span("text_extraction"):
+            resume_text = utils.extract_text_from_bytes(filename, content)
+
+        with tracing.span("profile_extraction"):
+            profile = profiles.extract_profile(resume_text)
+
+        with tracing.span("skill_matching"):
+            resume_skills = skills.extract_skills(resume_text)
+            present = set(resume_skills)
+
+        return models.CandidateResult(
+            filename=filename,
+            score=0,
+            missing_skills=[],
+            remarks="",
+            resume_text=_snippet(resume_text),
+            skills=resume_skills,
+            matched_skills=[skill for skill in jd_skills if skill in present],
+            unmatched_skills=[skill for skill in jd_skills if skill not in present],
+            **profile.model_dump()
+        ), resume_text
+
+    except Exception as e:
+        return _error_result(filename, e), None
+
+def _evaluate_candidate(
+    candidate: models.CandidateResult,
+    resume_text: str,
+    job_description: str,
+    task: str = "evaluation",
+    reason: str = "default",
+    lean: Optional[bool] = None,
+    jd_analysis: Optional[Dict] = None
+) -> Tuple[models.CandidateResult, bool]:
+    """Full LLM evaluation with the model routed for `task`; returns the result and whether it succeeded"""
+    with routing.collect() as decisions:
+        try:
+            evaluation = ai_services.evaluate_resume(
+                resume_text,
+                job_description,
+                task=task,
+                reason=reason,
+                lean=lean,
+                jd_analysis=jd_analysis
+            )
+            logger.info(f"Successfully processed {candidate.filename} - Score: {evaluation.score}")
+            result, processed = candidate.model_copy(update={
+                "score": evaluation.score,
+                "missing_skills": evaluation.missing_skills,
+                "remarks": evaluation.remarks,
+                "criteria": evaluation.criteria,
+                "scoring": "llm"
+            }), True
+
+        except Exception as e:
+            result, processed = _error_result(candidate.filename, e), False
+
+    result.routing = candidate.routing + decisions
+    return result, processed
+
+def evaluate_document(
+    filename: str,
+    content: bytes,
+    job_description: str,
+    lean: Optional[bool] = None
+) -> Tuple[models.CandidateResult, bool]:
+    """Extract and fully evaluate a single resume outside a matching run; returns the result and whether it succeeded"""
+    candidate, resume_text = _prepare_document(filename, content, skills.extract_skills(job_description))
+    if resume_text is None:
+        return candidate, False
+    return _evaluate_candidate(candidate, resume_text, job_description, lean=lean)
+
+def _select_for_llm(local_scores: Dict[int, float], threshold: float, top_percent: float) -> List[int]:
+    """Candidates that pass the cascade: at or above the threshold, or within the top share"""
+    ranked = sorted(local_scores, key=local_scores.get, reverse=True)
+    top_count = math.ceil(len(ranked) * top_percent / 100) if top_percent > 0 else 0
+    return [index for rank, index in enumerate(ranked) if rank < top_count or local_scores[index] >= threshold]
+
+def _select_finalists(triage_scores: Dict[int, float], top_n: int, margin: float) -> Dict[int, str]:
+    """Candidates to re-evaluate with the finalist model, with the reason for each"""
+    ranked = sorted(triage_scores, key=triage_scores.get, reverse=True)
+    finalists = {index: "top_n" for index in ranked[:top_n]}
+    for index, score in triage_scores.items():
+        if index not in finalists and abs(score - scoring.QUALIFYING_SCORE) <= margin:
+            finalists[index] = "close_call"
+    return finalists
+
+def run_matching(
+    job_description: str,
+    documents: Iterable[ResumeDocument],
+    include_timings: bool = False,
+    on_progress: Optional[ProgressCallback] = None,
+    options: Optional[models.MatchingOptions] = None
+) -> models.MatchingResponse:
+    """Evaluate every resume against the job description and draft follow-up emails.
+
+    Shared by the synchronous /match-candidates endpoint and background jobs.
+    `on_progress` is called as each candidate's result becomes final, with
+    (processed, total, result). In cascade mode every resume first gets a
+    local skill-coverage score and only contenders are sent to the LLM. In
+    tiered mode the LLM pass uses the triage model and only the top-N and
+    close calls are re-evaluated with the finalist model.
+
+    `documents` may be a lazy iterator (e.g. members streamed from a ZIP
+    archive); each resume's bytes are released once its text is extracted.
+
+    With `options.top_k`, only the first K candidates in `options.sort`
+    order are returned, tracked in a bounded heap as results become final;
+    the whole batch is saved and the rest are fetched by `next_cursor`.
+    """
+    options = options or models.MatchingOptions()
+    start_time = time.time()
+    filenames: List[str] = []
+
+    with tracing.trace("match_candidates") as request_trace, routing.collect() as batch_routing:
+        with tracing.span("skill_matching"):
+            jd_skills = skills.extract_skills(job_description)
+
+        # Keyed by upload position so duplicate filenames stay distinct
+        results: Dict[int, models.CandidateResult] = {}
+        candidate_traces: Dict[int, tracing.Trace] = {}
+        evaluated = []
+        page = ranking.TopK(options.top_k, options.sort) if options.top_k else None
+
+        def finalize(index: int, candidate: models.CandidateResult, processed: bool) -> None:
+            results[index] = candidate
+            if processed:
+                evaluated.append(candidate)
+            if page is not None:
+                page.push(index, candidate.score, candidate)
+            if on_progress is not None:
+                on_progress(len(results), len(filenames), candidate)
+
+        prepared = []
+        unreadable = []
+        for filename, content in documents:
+            if not filename:
+                logger.warning("Skipping resume with no filename")
+                continue
+            if not utils.validate_file_extension(filename):
+                logger.warning(f"Skipping invalid file: {filename}")
+                continue
+            index = len(filenames)
+            filenames.append(filename)
+            with tracing.trace(filename) as candidate_trace:
+                candidate, resume_text = _prepare_document(filename, content, jd_skills)
+            candidate_traces[index] = candidate_trace
+            if resume_text is None:
+                unreadable.append((index, candidate))
+            else:
+                prepared.append((index, candidate, resume_text))
+
+        # Reported once every document has been read and the total is known
+        for index, candidate in unreadable:
+            finalize(index, candidate, False)
+
+        # Analyzed once for the batch, under the request trace, so its time and
+        # tokens are a batch-level stage rather than part of the first candidate
+        jd_analysis = ai_services.analyze_job_description(job_description) if prepared else None
+
+        to_evaluate = prepared
+        if options.cascade and prepared:
+            threshold = settings.CASCADE_THRESHOLD if options.cascade_threshold is None else options.cascade_threshold
+            top_percent = settings.CASCADE_TOP_PERCENT if options.cascade_top_percent is None else options.cascade_top_percent
+
+            with tracing.span("local_scoring"):
+                local_scores = {}
+                local_missing = {}
+                for index, candidate, resume_text in prepared:
+                    local_scores[index], local_missing[index] = scoring.local_skill_score(
+                        jd_analysis, candidate.skills, resume_text, jd_skills
+                    )
+                selected = set(_select_for_llm(local_scores, threshold, top_percent))
+
+            to_evaluate = []
+            for index, candidate, resume_text in prepared:
+                local_score = round(local_scores[index], 2)
+                candidate = candidate.model_copy(update={"local_score": local_score})
+                if index in selected:
+                    to_evaluate.append((index, candidate, resume_text))
+                    continue
+                finalize(index, candidate.model_copy(update={
+                    "score": local_score,
+                    "missing_skills": local_missing[index],
+                    "remarks": f"Pre-screened by skill coverage ({local_score:.0f}/100); not sent for full evaluation.",
+                    "scoring": "local"
+                }), True)
+            logger.info(f"Cascade: {len(to_evaluate)} of {len(prepared)} candidates sent for full evaluation")
+
+        triage_model = routing.model_for("triage")
+        finalist_model = routing.model_for("finalist")
+        tiered = options.tiered and triage_model != finalist_model
+        if options.tiered and not tiered:
+            logger.warning(f"Tiered mode skipped: triage and finalist models are both {triage_model}")
+
+        triaged = []
+        for index, candidate, resume_text in to_evaluate:
+            with tracing.resume(candidate_traces[index]):
+                candidate, processed = _evaluate_candidate(
+                    candidate,
+                    resume_text,
+                    job_description,
+                    task="triage" if tiered else "evaluation",
+                    lean=options.lean,
+                    jd_analysis=jd_analysis
+                )
+            if tiered and processed:
+                triaged.append((index, candidate, resume_text))
+            else:
+                finalize(index, candidate, processed)
+
+        if triaged:
+            top_n = settings.TIERED_TOP_N if options.tiered_top_n is None else options.tiered_top_n
+            margin = settings.TIERED_CLOSE_CALL_MARGIN if options.tiered_margin is None else options.tiered_margin
+            finalists = _select_finalists({index: candidate.score for index, candidate, _ in triaged}, top_n, margin)
+            logger.info(f"Tiered: {len(finalists)} of {len(triaged)} candidates re-evaluated with {finalist_model}")
+
+            for index, candidate, resume_text in triaged:
+                candidate = candidate.model_copy(update={"triage_score": candidate.score})
+                if index in finalists:
+                    with tracing.resume(candidate_traces[index]):
+                        final, processed = _evaluate_candidate(
+                            candidate,
+                            resume_text,
+                            job_description,
+                            task="finalist",
+                            reason=finalists[index],
+                            lean=options.lean,
+                            jd_analysis=jd_analysis
+                        )
+                    # Keep the triage result if the finalist call fails
+                    if processed:
+                        candidate = final
+                finalize(index, candidate, True)
+
+        # Report candidates in upload order, whatever order they completed in
+        candidates = [results[index] for index in sorted(results)]
+        if include_timings:
+            for index, candidate in zip(sorted(results), candidates):
+                candidate.timings = models.CandidateTiming(**candidate_traces[index].to_dict())
+
+        best_candidate = None
+        contenders = [candidate for candidate in candidates if candidate.scoring == "llm"] or candidates
+        if contenders:
+            best_candidate = max(contenders, key=lambda x: x.score)
+            logger.info(f"Best candidate: {best_candidate.filename} with score {best_candidate.score}")
+
+        interview_email = None
+        rejection_email = None
+
+        if best_candidate and best_candidate.score >= scoring.QUALIFYING_SCORE:
+            logger.info("Generating interview email for best candidate")
+            interview_email = ai_services.generate_email(
+                candidate_name=best_candidate.name or best_candidate.filename,
+                position="the position",
+                email_type="interview",
+                evaluation=best_candidate
+            )
+
+        logger.info("Generating rejection email template")
+        rejection_email = ai_services.generate_email(
+            candidate_name="Candidate",
+            position="the position",
+            email_type="rejection"
+        )
+
+    processing_time = time.time() - start_time
+    logger.info(f"Candidate matching completed. Processed {len(evaluated)} files in {processing_time:.2f} seconds")
+    analytics.record_matching_run(evaluated, processing_time)
+    batch_id = ranking.save_batch(candidates)
+
+    returned = candidates
+    total_candidates = None
+    next_cursor = None
+    if page is not None:
+        returned = page.items()
+        total_candidates = len(candidates)
+        if page.truncated and batch_id:
+            next_cursor = ranking.encode_cursor(options.sort, page.last_key())
+        elif page.truncated:
+            logger.warning(f"Returning top {options.top_k} of {len(candidates)} candidates; the rest cannot be paged without a saved batch")
+    elif options.sort == "score":
+        returned = [
+            results[index]
+            for index in sorted(results, key=lambda index: ranking.sort_key("score", index, results[index].score))
+        ]
+
+    timings = None
+    if include_timings:
+        slowest = max(candidate_traces.items(), key=lambda item: item[1].total_ms, default=None)
+        timings = models.TimingBreakdown(
+            **request_trace.to_dict(),
+            slowest_candidate=filenames[slowest[0]] if slowest else None
+        )
+        logger.info(f"Stage timings: {timings.stages}")
+
+    return models.MatchingResponse(
+        candidates=returned,
+        best_candidate=best_candidate.filename if best_candidate else None,
+        interview_email=interview_email,
+        rejection_email=rejection_email,
+        processing_time=processing_time,
+        timings=timings,
+        routing=batch_routing,
+        batch_id=batch_id,
+        total_candidates=total_candidates,
+        next_cursor=next_cursor
+    )
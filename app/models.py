@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, NonNegativeFloat
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 
 class JobDescriptionRequest(BaseModel):
@@ -11,6 +11,12 @@ class JobDescriptionRequest(BaseModel):
     industry: Optional[str] = Field(None, description="Industry")
     location: Optional[str] = Field(None, description="Location")
 
+class CriterionScore(BaseModel):
+    category: str = Field(..., description="hard_skills, soft_skills or experience_requirements")
+    criterion: str = Field(..., description="Criterion name from the job description analysis")
+    score: float = Field(..., description="Criterion score out of 10")
+    importance: str = Field("medium", description="Importance of the criterion: high, medium or low")
+
 class EvaluationResult(BaseModel):
     score: float = Field(..., ge=0, le=100, description="Matching score out of 100")
     missing_skills: List[str] = Field(..., description="List of missing skills")
@@ -21,13 +27,80 @@ class EvaluationResult(BaseModel):
     remarks: str = Field(..., description="Evaluation remarks")
     recommendation: str = Field(..., description="Recommendation")
     interview_focus_areas: List[str] = Field(default_factory=list, description="Interview focus areas")
+    criteria: List[CriterionScore] = Field(default_factory=list, description="Score per evaluation criterion")
+
+class CriterionEvidence(CriterionScore):
+    reason: str = Field("", description="Why the candidate received this score")
+    evidence: str = Field("", description="Resume excerpt supporting the score")
+
+class EvaluationDetails(BaseModel):
+    filename: Optional[str] = Field(None, description="Resume filename")
+    score: float = Field(..., ge=0, le=100, description="Matching score out of 100")
+    summary: str = Field("", description="Overall assessment")
+    strengths: List[str] = Field(default_factory=list, description="Key strengths")
+    concerns: List[str] = Field(default_factory=list, description="Potential gaps")
+    recommendation: str = Field("", description="hire, consider or reject")
+    criteria: List[CriterionEvidence] = Field(default_factory=list, description="Score, reason and evidence per criterion")
+
+class StageTiming(BaseModel):
+    name: str = Field(..., description="Stage name")
+    duration_ms: float = Field(..., description="Time spent in this stage in milliseconds")
+    prompt_tokens: int = Field(0, description="Prompt tokens consumed by this stage")
+    completion_tokens: int = Field(0, description="Completion tokens consumed by this stage")
 
-class CandidateResult(BaseModel):
+class CandidateTiming(BaseModel):
+    total_ms: float = Field(..., description="Total time spent on this candidate in milliseconds")
+    stages: List[StageTiming] = Field(default_factory=list, description="Per-stage durations")
+    prompt_tokens: int = Field(0, description="Prompt tokens consumed for this candidate")
+    completion_tokens: int = Field(0, description="Completion tokens consumed for this candidate")
+
+class TimingBreakdown(BaseModel):
+    total_ms: float = Field(..., description="Total request time in milliseconds")
+    stages: List[StageTiming] = Field(default_factory=list, description="Per-stage durations summed over the request")
+    prompt_tokens: int = Field(0, description="Prompt tokens consumed by the request")
+    completion_tokens: int = Field(0, description="Completion tokens consumed by the request")
+    slowest_candidate: Optional[str] = Field(None, description="Filename of the slowest candidate")
+
+class RoutingDecision(BaseModel):
+    task: str = Field(..., description="Task routed: jd_analysis, jd_generation, evaluation, triage, finalist or email")
+    model: str = Field(..., description="Model the task was sent to")
+    reason: str = Field("default", description="Why this model was chosen")
+    latency_ms: float = Field(..., description="Model call latency in milliseconds")
+    succeeded: bool = Field(True, description="Whether the call completed without error")
+
+class CandidateProfile(BaseModel):
+    name: Optional[str] = Field(None, description="Candidate name found in the resume")
+    email: Optional[str] = Field(None, description="Contact email")
+    phone: Optional[str] = Field(None, description="Contact phone number")
+    location: Optional[str] = Field(None, description="Candidate location")
+    years_of_experience: Optional[float] = Field(None, ge=0, description="Total years of professional experience")
+
+class CandidateResult(CandidateProfile):
     filename: str = Field(..., description="Resume filename")
     score: float = Field(..., ge=0, le=100, description="Matching score")
     missing_skills: List[str] = Field(..., description="Missing skills")
     remarks: str = Field(..., description="Evaluation remarks")
     resume_text: str = Field(..., description="Extracted resume text")
+    skills: List[str] = Field(default_factory=list, description="Known skills mentioned in the resume")
+    matched_skills: List[str] = Field(default_factory=list, description="Skills named in the job description that the resume mentions")
+    unmatched_skills: List[str] = Field(default_factory=list, description="Skills named in the job description that the resume does not mention")
+    scoring: str = Field("llm", description="How the score was produced: 'llm' or 'local' (cascade pre-screen only)")
+    local_score: Optional[float] = Field(None, ge=0, le=100, description="Cascade pre-screen score from weighted skill coverage")
+    triage_score: Optional[float] = Field(None, ge=0, le=100, description="First-pass score from the triage model in tiered mode")
+    criteria: List[CriterionScore] = Field(default_factory=list, description="Score per evaluation criterion")
+    routing: List[RoutingDecision] = Field(default_factory=list, description="Model calls made for this candidate")
+    timings: Optional[CandidateTiming] = Field(None, description="Per-stage timing for this candidate")
+
+class MatchingOptions(BaseModel):
+    cascade: bool = Field(False, description="Pre-screen with a local skill-coverage score and only send contenders to the LLM")
+    cascade_threshold: Optional[float] = Field(None, ge=0, le=100, description="Local score at or above which a candidate gets a full evaluation")
+    cascade_top_percent: Optional[float] = Field(None, ge=0, le=100, description="Share of candidates, by local score, that always get a full evaluation")
+    tiered: bool = Field(False, description="Score with the triage model, then re-evaluate finalists with the finalist model")
+    tiered_top_n: Optional[int] = Field(None, ge=0, description="Top candidates by triage score re-evaluated by the finalist model")
+    tiered_margin: Optional[float] = Field(None, ge=0, le=100, description="Triage scores this close to the qualifying score count as close calls")
+    lean: Optional[bool] = Field(None, description="Request only per-criterion scores and a summary; defaults to EVALUATION_MODE")
+    top_k: Optional[int] = Field(None, ge=1, description="Return only the first K candidates in `sort` order; the rest are fetched by cursor")
+    sort: Literal["upload", "score"] = Field("upload", description="Candidate order: upload order or highest score first")
 
 class MatchingResponse(BaseModel):
     candidates: List[CandidateResult] = Field(..., description="List of evaluated candidates")
@@ -35,6 +108,77 @@ class MatchingResponse(BaseModel):
     interview_email: Optional[str] = Field(None, description="Generated interview email")
     rejection_email: Optional[str] = Field(None, description="Generated rejection email")
     processing_time: float = Field(..., description="Total processing time in seconds")
+    timings: Optional[TimingBreakdown] = Field(None, description="Per-stage and per-candidate timing breakdown")
+    routing: List[RoutingDecision] = Field(default_factory=list, description="Batch-level model calls (JD analysis, emails)")
+    batch_id: Optional[str] = Field(None, description="Identifier for re-ranking this batch with POST /batches/{batch_id}/rerank")
+    total_candidates: Optional[int] = Field(None, description="Number of candidates in the batch, when only a page is returned")
+    next_cursor: Optional[str] = Field(None, description="Cursor for GET /batches/{batch_id}/candidates to fetch the next page")
+
+class CandidatePage(BaseModel):
+    batch_id: str = Field(..., description="Batch the candidates belong to")
+    candidates: List[CandidateResult] = Field(default_factory=list, description="Candidates on this page")
+    total_candidates: int = Field(..., description="Number of candidates in the batch")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page; None on the last page")
+
+class RerankRequest(BaseModel):
+    importance_weights: Dict[str, NonNegativeFloat] = Field(
+        default_factory=dict,
+        description="Weight per importance level (high, medium, low); unset levels keep 1.5/1.0/0.5"
+    )
+    category_weights: Dict[str, NonNegativeFloat] = Field(
+        default_factory=dict,
+        description="Multiplier per category (hard_skills, soft_skills, experience_requirements); default 1"
+    )
+    criterion_weights: Dict[str, NonNegativeFloat] = Field(
+        default_factory=dict,
+        description="Multiplier per criterion name, applied on top of the importance and category weights"
+    )
+
+class RankedCandidate(BaseModel):
+    rank: int = Field(..., description="Position in the new ordering, starting at 1")
+    index: int = Field(..., description="Position of the candidate in the original batch")
+    filename: str = Field(..., description="Resume filename")
+    name: Optional[str] = Field(None, description="Candidate name")
+    score: float = Field(..., description="Score under the new weights")
+    original_score: float = Field(..., description="Score returned by the matching run")
+
+class RerankResponse(BaseModel):
+    batch_id: str = Field(..., description="Batch that was re-ranked")
+    criteria: List[str] = Field(default_factory=list, description="Criteria columns of the score matrix")
+    candidates: List[RankedCandidate] = Field(default_factory=list, description="Candidates ordered by the new score")
+    duration_ms: float = Field(..., description="Time spent re-scoring the batch in milliseconds")
+
+class JobStatus(BaseModel):
+    job_id: str = Field(..., description="Background job identifier")
+    status: str = Field(..., description="queued, running, completed or failed")
+    total: int = Field(0, description="Number of resumes in the job")
+    processed: int = Field(0, description="Number of resumes evaluated so far")
+    candidates: List[CandidateResult] = Field(default_factory=list, description="Candidates evaluated so far, in completion order, while the job runs; see result once completed")
+    result: Optional[MatchingResponse] = Field(None, description="Matching results once completed")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    created_at: datetime = Field(..., description="When the job was submitted")
+    updated_at: datetime = Field(..., description="When the job last changed")
+
+class DailyActivity(BaseModel):
+    date: str = Field(..., description="Day (YYYY-MM-DD)")
+    jobs_processed: int = Field(0, description="Matching runs completed that day")
+    candidates_evaluated: int = Field(0, description="Resumes evaluated that day")
+
+class SkillCount(BaseModel):
+    skill: str = Field(..., description="Skill name")
+    count: int = Field(..., description="Number of candidates missing the skill")
+
+class AnalyticsSummary(BaseModel):
+    total_jobs: int = Field(0, description="Matching runs completed")
+    total_candidates: int = Field(0, description="Resumes evaluated")
+    qualified_candidates: int = Field(0, description="Candidates scoring 70 or more")
+    average_score: float = Field(0.0, description="Mean score across all evaluated candidates")
+    average_processing_time: float = Field(0.0, description="Mean matching run duration in seconds")
+    score_histogram: List[int] = Field(default_factory=lambda: [0] * 10, description="LLM-scored candidate counts per 10-point score bucket")
+    local_score_histogram: List[int] = Field(default_factory=lambda: [0] * 10, description="Counts per 10-point bucket of candidates scored only by the cascade pre-screen")
+    daily: List[DailyActivity] = Field(default_factory=list, description="Activity per day, oldest first")
+    top_missing_skills: List[SkillCount] = Field(default_factory=list, description="Most frequently missing skills")
+    updated_at: Optional[datetime] = Field(None, description="When the rollups last changed")
 
 class HealthCheck(BaseModel):
     status: str = Field(..., description="Service status")
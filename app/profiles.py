@@ -0,0 +1,131 @@
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+import models
+
+# Patterns are compiled once at import; extraction runs once per resume at ingest
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+PHONE_PATTERN = re.compile(r"(?<![\w.(])(\+?\(?\d[\d \t().-]{6,18}\d)(?![\w.])")
+LABELED_NAME_PATTERN = re.compile(r"^\s*(?:full\s+)?name\s*[:\-]\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+NAME_LINE_PATTERN = re.compile(r"^[A-Z][A-Za-z'.-]+(?:\s+[A-Z][A-Za-z'.-]*){1,3}$")
+REVERSED_NAME_PATTERN = re.compile(r"^([A-Z][A-Za-z'-]+),\s*([A-Z][A-Za-z'-]+)$")
+LABELED_LOCATION_PATTERN = re.compile(r"^\s*(?:location|address|city|based in)\s*[:\-]\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+CITY_REGION_PATTERN = re.compile(r"\b([A-Z][a-zA-Z.]+(?:\s[A-Z][a-zA-Z.]+)*,\s?(?:[A-Z]{2}|[A-Z][a-zA-Z]+(?:\s[A-Z][a-zA-Z]+)*))\b")
+YEARS_STATED_PATTERN = re.compile(
+    r"(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years|yrs)\.?(?:\s+of)?(?:\s+[\w/-]+){0,3}?\s+experience",
+    re.IGNORECASE
+)
+DATE_RANGE_PATTERN = re.compile(
+    r"\b((?:19|20)\d{2})\s*(?:-|–|—|to)\s*((?:19|20)\d{2}|present|current|now|date)\b",
+    re.IGNORECASE
+)
+
+# Header lines that look like names but are not
+NON_NAME_WORDS = {"resume", "curriculum", "vitae", "cv", "profile", "summary", "objective", "experience", "contact"}
+HEADER_LINES = 8
+# "City, Region" lines ending in one of these are locations, never reversed names
+REGIONS = {
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "DC", "FL", "GA", "HI", "ID", "IL", "IN", "IA", "KS",
+    "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ", "NM", "NY", "NC",
+    "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY",
+    "Alabama", "Alaska", "Arizona", "Arkansas", "California", "Colorado", "Connecticut", "Delaware",
+    "Florida", "Georgia", "Hawaii", "Idaho", "Illinois", "Indiana", "Iowa", "Kansas", "Kentucky",
+    "Louisiana", "Maine", "Maryland", "Massachusetts", "Michigan", "Minnesota", "Mississippi", "Missouri",
+    "Montana", "Nebraska", "Nevada", "Ohio", "Oklahoma", "Oregon", "Pennsylvania", "Tennessee", "Texas",
+    "Utah", "Vermont", "Virginia", "Washington", "Wisconsin", "Wyoming",
+    "ON", "QC", "BC", "AB", "MB", "SK", "NS", "Ontario", "Quebec",
+    "USA", "US", "UK", "Canada", "India", "Germany", "France", "Australia", "Ireland", "Netherlands"
+}
+MAX_YEARS = 50
+
+def _header_lines(text: str) -> List[str]:
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    return lines[:HEADER_LINES]
+
+def _header_name(lines: List[str]) -> Tuple[Optional[int], Optional[str]]:
+    """Index of the header line taken as the name, and the name"""
+    for index, line in enumerate(lines):
+        reversed_name = REVERSED_NAME_PATTERN.match(line)
+        if reversed_name and reversed_name.group(2) not in REGIONS:
+            return index, f"{reversed_name.group(2)} {reversed_name.group(1)}"
+        if NAME_LINE_PATTERN.match(line) and not NON_NAME_WORDS & set(line.lower().split()):
+            return index, line
+    return None, None
+
+def extract_name(text: str) -> Optional[str]:
+    """Candidate name from a "Name:" label or a name-shaped line at the top of the resume"""
+    labeled = LABELED_NAME_PATTERN.search(text)
+    if labeled:
+        return labeled.group(1).strip()
+    return _header_name(_header_lines(text))[1]
+
+def extract_email(text: str) -> Optional[str]:
+    match = EMAIL_PATTERN.search(text)
+    return match.group(0) if match else None
+
+def extract_phone(text: str) -> Optional[str]:
+    for match in PHONE_PATTERN.finditer(text):
+        candidate = match.group(1).strip()
+        digits = sum(ch.isdigit() for ch in candidate)
+        # Skip date ranges like 2019-2021 that have the right shape but no phone-length digits
+        if 7 <= digits <= 15 and not DATE_RANGE_PATTERN.fullmatch(candidate):
+            return candidate
+    return None
+
+def extract_location(text: str) -> Optional[str]:
+    """Location from a label, or a "City, Region" pair in the resume header"""
+    labeled = LABELED_LOCATION_PATTERN.search(text)
+    if labeled:
+        return labeled.group(1).strip()
+
+    lines = _header_lines(text)
+    name_index = None if LABELED_NAME_PATTERN.search(text) else _header_name(lines)[0]
+    for index, line in enumerate(lines):
+        if index == name_index:
+            continue
+        match = CITY_REGION_PATTERN.search(line)
+        if match:
+            return match.group(1)
+    return None
+
+def _merged_span_years(ranges: List[Tuple[int, int]]) -> int:
+    total = 0
+    current_start, current_end = None, None
+    for start, end in sorted(ranges):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+def extract_years_of_experience(text: str) -> Optional[float]:
+    """Total years of experience, as stated ("7+ years of experience") or summed from date ranges"""
+    stated = [float(value) for value in YEARS_STATED_PATTERN.findall(text)]
+    stated = [value for value in stated if value <= MAX_YEARS]
+    if stated:
+        return max(stated)
+
+    this_year = date.today().year
+    ranges = []
+    for start, end in DATE_RANGE_PATTERN.findall(text):
+        end_year = this_year if not end.isdigit() else int(end)
+        if int(start) <= end_year <= this_year:
+            ranges.append((int(start), end_year))
+    if not ranges:
+        return None
+    return float(min(_merged_span_years(ranges), MAX_YEARS))
+
+def extract_profile(text: str) -> models.CandidateProfile:
+    """Structured contact details and experience pulled from resume text"""
+    return models.CandidateProfile(
+        name=extract_name(text),
+        email=extract_email(text),
+        phone=extract_phone(text),
+        location=extract_location(text),
+        years_of_experience=extract_years_of_experience(text)
+    )
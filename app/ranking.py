@@ -0,0 +1,218 @@
+import base64
+import heapq
+import json
+import time
+import uuid
+from typing import Any, Iterable, List, Optional, Tuple
+
+import cache
+import models
+import scoring
+from config import settings
+from logger import logger
+
+# Each matching run keeps its candidate x criterion score matrix, so a batch
+# can be re-ranked with different weights without calling the model again,
+# and its full results, so they can be paged through by cursor.
+
+def _batch_store() -> cache.Cache:
+    return cache.get_cache(
+        "batches",
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        default_ttl=settings.JOB_TTL_SECONDS
+    )
+
+def save_batch(candidates: List[models.CandidateResult]) -> Optional[str]:
+    """Store the per-criterion score matrix of a matching run and return its batch id.
+
+    Columns are the union of (category, criterion) pairs across candidates;
+    criteria a candidate was not assessed on are stored as None. Failures
+    never affect matching; the run just cannot be re-ranked.
+    """
+    try:
+        return _save_batch(candidates)
+    except Exception as e:
+        logger.error(f"Failed to save score matrix: {str(e)}")
+        return None
+
+def _save_batch(candidates: List[models.CandidateResult]) -> str:
+    columns = {}
+    for candidate in candidates:
+        for criterion in candidate.criteria:
+            columns.setdefault((criterion.category, criterion.criterion), criterion.importance)
+
+    positions = {column: position for position, column in enumerate(columns)}
+    scores = []
+    for candidate in candidates:
+        row = [None] * len(columns)
+        for criterion in candidate.criteria:
+            row[positions[(criterion.category, criterion.criterion)]] = criterion.score
+        scores.append(row)
+
+    batch_id = uuid.uuid4().hex
+    _batch_store().set(batch_id, {
+        "categories": [category for category, _ in columns],
+        "criteria": [name for _, name in columns],
+        "importance": list(columns.values()),
+        # Full results, so the batch can also be paged through and exported
+        "candidates": [candidate.model_dump(mode="json") for candidate in candidates],
+        "scores": scores
+    })
+    logger.info(f"Saved score matrix for batch {batch_id}: {len(candidates)} candidates x {len(columns)} criteria")
+    return batch_id
+
+def load_batch(batch_id: str) -> Optional[dict]:
+    """A saved batch, or None if it is unknown or expired"""
+    return _batch_store().get(batch_id)
+
+def sort_key(sort: str, index: int, score: float) -> Tuple[float, ...]:
+    """Ascending key for a candidate at upload position `index` in the given order"""
+    return (-score, index) if sort == "score" else (index,)
+
+class TopK:
+    """The first `k` candidates in `sort` order, kept in a bounded heap as results arrive"""
+
+    def __init__(self, k: int, sort: str = "upload"):
+        self.k = k
+        self.sort = sort
+        self.seen = 0
+        # Max-heap on the sort key (stored negated), so the worst kept candidate is on top
+        self._heap: List[Tuple[Tuple[float, ...], int, Any]] = []
+
+    def push(self, index: int, score: float, item: Any) -> None:
+        self.seen += 1
+        entry = (tuple(-part for part in sort_key(self.sort, index, score)), index, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Any]:
+        return [item for _, _, item in sorted(self._heap, reverse=True)]
+
+    def last_key(self) -> Optional[Tuple[float, ...]]:
+        """Sort key of the last kept candidate, the position a cursor resumes after"""
+        if not self._heap:
+            return None
+        return tuple(-part for part in self._heap[0][0])
+
+    @property
+    def truncated(self) -> bool:
+        return self.seen > len(self._heap)
+
+def encode_cursor(sort: str, after: Tuple[float, ...]) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"sort": sort, "after": list(after)}).encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[str, Tuple[float, ...]]:
+    """Sort order and position of a cursor; raises ValueError if it is malformed"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        sort, after = data["sort"], tuple(float(part) for part in data["after"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if sort not in ("upload", "score") or len(after) != len(sort_key(sort, 0, 0.0)):
+        raise ValueError("Invalid cursor")
+    return sort, after
+
+def select_page(
+    candidates: Iterable[Tuple[int, float, Any]],
+    limit: int,
+    sort: str = "upload",
+    after: Optional[Tuple[float, ...]] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """The next `limit` of (index, score, item) in `sort` order after a cursor position.
+
+    Uses a bounded heap, so a page costs O(n log limit) rather than a full
+    sort. Returns the items and the cursor for the page after, if any.
+    """
+    top = TopK(limit, sort)
+    for index, score, item in candidates:
+        if after is None or sort_key(sort, index, score) > after:
+            top.push(index, score, item)
+    next_cursor = encode_cursor(sort, top.last_key()) if top.truncated else None
+    return top.items(), next_cursor
+
+def candidate_page(
+    batch_id: str,
+    limit: int,
+    sort: str = "upload",
+    cursor: Optional[str] = None
+) -> Optional[models.CandidatePage]:
+    """A page of a stored batch's candidates; None if the batch is unknown or expired.
+
+    With a cursor, the sort order is the one the cursor was issued for.
+    """
+    batch = load_batch(batch_id)
+    if batch is None:
+        return None
+    after = None
+    if cursor:
+        sort, after = decode_cursor(cursor)
+
+    page, next_cursor = select_page(
+        ((index, candidate["score"], candidate) for index, candidate in enumerate(batch["candidates"])),
+        limit,
+        sort,
+        after
+    )
+    return models.CandidatePage(
+        batch_id=batch_id,
+        candidates=page,
+        total_candidates=len(batch["candidates"]),
+        next_cursor=next_cursor
+    )
+
+def rerank(batch_id: str, request: models.RerankRequest) -> Optional[models.RerankResponse]:
+    """Re-score a stored batch with new weights; None if the batch is unknown or expired.
+
+    Each candidate's score is the weighted mean of the criteria they were
+    assessed on, scaled to 0-100 as in `calculate_weighted_score`.
+    Candidates without criterion scores (cascade pre-screen, errors) keep
+    their original score.
+    """
+    batch = load_batch(batch_id)
+    if batch is None:
+        return None
+
+    import numpy as np  # imported lazily to keep startup fast
+
+    start = time.perf_counter()
+    importance_weights = {**scoring.IMPORTANCE_WEIGHTS, **request.importance_weights}
+    weights = np.array([
+        importance_weights.get((importance or "medium").lower(), importance_weights["low"])
+        * request.category_weights.get(category, 1.0)
+        * request.criterion_weights.get(criterion, 1.0)
+        for category, criterion, importance in zip(batch["categories"], batch["criteria"], batch["importance"])
+    ], dtype=float)
+
+    original = np.array([candidate["score"] for candidate in batch["candidates"]], dtype=float)
+    scores = np.array(batch["scores"], dtype=float).reshape(len(original), len(weights))
+    assessed = ~np.isnan(scores)
+
+    weighted = np.where(assessed, scores, 0.0) @ weights
+    totals = assessed @ weights
+    new_scores = np.where(
+        totals > 0,
+        np.clip(weighted / np.where(totals > 0, totals, 1.0) * 10, 0, 100),
+        original
+    )
+    order = np.argsort(-new_scores, kind="stable")
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    logger.info(f"Re-ranked batch {batch_id} ({len(original)} candidates) in {duration_ms:.2f} ms")
+    return models.RerankResponse(
+        batch_id=batch_id,
+        criteria=batch["criteria"],
+        candidates=[
+            models.RankedCandidate(
+                rank=rank,
+                index=int(index),
+                filename=batch["candidates"][index]["filename"],
+                name=batch["candidates"][index]["name"],
+                score=round(float(new_scores[index]), 2),
+                original_score=float(original[index])
+            )
+            for rank, index in enumerate(order, 1)
+        ],
+        duration_ms=round(duration_ms, 3)
+    )
@@ -0,0 +1,97 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import models
+from config import settings
+from logger import logger
+
+_current_decisions: ContextVar[Optional[List[models.RoutingDecision]]] = ContextVar("routing_decisions", default=None)
+
+TASKS = ("jd_analysis", "jd_generation", "evaluation", "triage", "finalist", "email")
+
+_stats: Dict[str, Dict[str, Any]] = {}
+_stats_lock = threading.Lock()
+
+def model_for(task: str) -> str:
+    """Model configured for a task, falling back to MODEL_NAME"""
+    configured = {
+        "jd_analysis": settings.JD_ANALYSIS_MODEL,
+        "jd_generation": settings.JD_GENERATION_MODEL,
+        "evaluation": settings.EVALUATION_MODEL,
+        "triage": settings.TRIAGE_MODEL or settings.EVALUATION_MODEL,
+        "finalist": settings.FINALIST_MODEL,
+        "email": settings.EMAIL_MODEL
+    }.get(task)
+    return configured or settings.MODEL_NAME
+
+def _record(decision: models.RoutingDecision) -> None:
+    decisions = _current_decisions.get()
+    if decisions is not None:
+        decisions.append(decision)
+    with _stats_lock:
+        stats = _stats.setdefault(f"{decision.task}:{decision.model}", {
+            "task": decision.task,
+            "model": decision.model,
+            "calls": 0,
+            "errors": 0,
+            "total_latency_ms": 0.0
+        })
+        stats["calls"] += 1
+        stats["errors"] += 0 if decision.succeeded else 1
+        stats["total_latency_ms"] += decision.latency_ms
+
+@contextmanager
+def route(task: str, reason: str = "default", model: Optional[str] = None):
+    """Pick the model for a task and record the decision with the call's latency.
+
+    Yields the model name; use it for the API call made inside the block.
+    """
+    chosen = model or model_for(task)
+    start = time.perf_counter()
+    succeeded = True
+    try:
+        yield chosen
+    except Exception:
+        succeeded = False
+        raise
+    finally:
+        latency_ms = (time.perf_counter() - start) * 1000
+        logger.debug(f"Routed {task} to {chosen} ({reason}) in {latency_ms:.0f} ms")
+        _record(models.RoutingDecision(
+            task=task,
+            model=chosen,
+            reason=reason,
+            latency_ms=round(latency_ms, 2),
+            succeeded=succeeded
+        ))
+
+@contextmanager
+def collect():
+    """Collect the routing decisions made inside the block.
+
+    A nested collect() captures its own decisions; they are not repeated in
+    the enclosing list.
+    """
+    decisions: List[models.RoutingDecision] = []
+    token = _current_decisions.set(decisions)
+    try:
+        yield decisions
+    finally:
+        _current_decisions.reset(token)
+
+def routing_metrics() -> List[Dict[str, Any]]:
+    """Calls, errors and average latency per task and model in this process"""
+    with _stats_lock:
+        return [
+            {
+                "task": stats["task"],
+                "model": stats["model"],
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "avg_latency_ms": round(stats["total_latency_ms"] / stats["calls"], 2)
+            }
+            for stats in _stats.values()
+        ]
@@ -0,0 +1,78 @@
+import re
+from typing import Any, Dict, List, Set, Tuple
+
+import skills
+
+IMPORTANCE_WEIGHTS = {"high": 1.5, "medium": 1.0, "low": 0.5}
+CRITERIA_CATEGORIES = ("hard_skills", "soft_skills", "experience_requirements")
+QUALIFYING_SCORE = 70  # candidates at or above this are invited to interview
+
+def importance_weight(importance: str) -> float:
+    return IMPORTANCE_WEIGHTS.get((importance or "medium").lower(), IMPORTANCE_WEIGHTS["low"])
+
+def criteria_importance(jd_analysis: Dict[str, Any]) -> Dict[str, Tuple[str, str]]:
+    """Criterion name -> (category, importance) for every criterion in a JD analysis"""
+    criteria = {}
+    for category in CRITERIA_CATEGORIES:
+        for item in jd_analysis.get(category, []):
+            name = item.get("skill") or item.get("requirement")
+            if name:
+                criteria[name] = (category, item.get("importance", "medium"))
+    return criteria
+
+def expand_lean_evaluation(jd_analysis: Dict[str, Any], lean_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Lean {"scores", "summary"} output in the full evaluation schema.
+
+    Category and importance come from the JD analysis rather than the model;
+    criteria the analysis does not know are treated as medium-importance hard skills.
+    """
+    criteria = criteria_importance(jd_analysis)
+    evaluation_data: Dict[str, Any] = {category: {} for category in CRITERIA_CATEGORIES}
+    for name, score in (lean_data.get("scores") or {}).items():
+        category, importance = criteria.get(name, ("hard_skills", "medium"))
+        evaluation_data[category][name] = {"score": float(score), "importance": importance}
+    evaluation_data["overall_assessment"] = {"summary": lean_data.get("summary") or "Evaluation completed"}
+    return evaluation_data
+
+def _is_covered(skill_name: str, resume_skills: Set[str], resume_text: str) -> bool:
+    canonical = skills.known_skill(skill_name)
+    if canonical is not None:
+        # Taxonomy skills match only through their aliases, so "Go" is not found in "good"
+        return canonical in resume_skills
+    # Skills outside the taxonomy fall back to a whole-phrase lookup
+    phrase = r"\s+".join(re.escape(word) for word in skill_name.lower().split())
+    return bool(phrase) and re.search(rf"(?<![\w.]){phrase}(?!\w)", resume_text) is not None
+
+def local_skill_score(
+    jd_analysis: Dict[str, Any],
+    resume_skills: List[str],
+    resume_text: str,
+    jd_skills: List[str]
+) -> Tuple[float, List[str]]:
+    """Preliminary 0-100 score from importance-weighted coverage of the JD's hard skills.
+
+    Uses only lexical signals, no model calls. Returns the score and the hard
+    skills the resume does not mention. When the analysis has no hard skills,
+    coverage of the skills found in the JD text is used instead.
+    """
+    present = set(resume_skills)
+    lowered = resume_text.lower()
+    hard_skills = [item for item in jd_analysis.get("hard_skills", []) if item.get("skill")]
+
+    if not hard_skills:
+        if not jd_skills:
+            return 0.0, []
+        missing = [skill for skill in jd_skills if skill not in present]
+        return (len(jd_skills) - len(missing)) / len(jd_skills) * 100, missing
+
+    covered_weight = 0.0
+    total_weight = 0.0
+    missing = []
+    for item in hard_skills:
+        weight = importance_weight(item.get("importance", "medium"))
+        total_weight += weight
+        if _is_covered(item["skill"], present, lowered):
+            covered_weight += weight
+        else:
+            missing.append(item["skill"])
+    return covered_weight / total_weight * 100, missing
@@ -0,0 +1,113 @@
+import gzip
+import json
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from fastapi import HTTPException, status
+from fastapi.responses import Response
+
+from models import CandidatePage, CandidateResult, MatchingResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback when orjson is not installed
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed; the framing overhead is not worth it
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str] = CandidateResult.model_fields) -> Optional[List[str]]:
+    """Parse a comma-separated field list, rejecting unknown names"""
+    if not fields:
+        return None
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return selected
+
+def select_candidate_fields(
+    candidates: List[Dict[str, Any]],
+    fields: Optional[List[str]] = None,
+    include_resume_text: bool = True
+) -> List[Dict[str, Any]]:
+    """Project candidate dicts down to the requested fields"""
+    if fields is None and include_resume_text:
+        return candidates
+    if fields is None:
+        return [{key: value for key, value in candidate.items() if key != "resume_text"} for candidate in candidates]
+    if not include_resume_text:
+        fields = [field for field in fields if field != "resume_text"]
+    return [{field: candidate.get(field) for field in fields} for candidate in candidates]
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best supported content coding from an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson and compressed per Accept-Encoding"""
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, accept_encoding: Optional[str] = None, **kwargs):
+        self.accept_encoding = accept_encoding
+        super().__init__(content, **kwargs)
+        self.headers["Vary"] = "Accept-Encoding"
+        if self.content_encoding:
+            self.headers["Content-Encoding"] = self.content_encoding
+
+    def render(self, content: Any) -> bytes:
+        body = dumps(content)
+        self.content_encoding = None
+        if len(body) < MIN_COMPRESS_BYTES:
+            return body
+        encoding = negotiate_encoding(self.accept_encoding)
+        if encoding == "br":
+            body = brotli.compress(body, quality=BROTLI_QUALITY)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        self.content_encoding = encoding
+        return body
+
+def matching_response(
+    result: Union[MatchingResponse, CandidatePage],
+    accept_encoding: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    include_resume_text: bool = True
+) -> FastJSONResponse:
+    """Build the fast response for a MatchingResponse or page of candidates with optional field selection"""
+    content = result.model_dump()
+    content["candidates"] = select_candidate_fields(content["candidates"], fields, include_resume_text)
+    return FastJSONResponse(content, accept_encoding=accept_encoding)
@@ -0,0 +1,230 @@
+import json
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import settings
+from logger import logger
+
+# Canonical skill name -> lowercase surface forms that refer to it. The canonical
+# name is not matched on its own, so ambiguous names ("Go", "R") only match
+# through their unambiguous aliases.
+SKILL_TAXONOMY: Dict[str, List[str]] = {
+    # Languages
+    "Python": ["python", "python3", "cpython"],
+    "Java": ["java", "jdk", "j2ee"],
+    "JavaScript": ["javascript", "js", "ecmascript", "es6"],
+    "TypeScript": ["typescript"],
+    "Go": ["golang", "go lang"],
+    "Rust": ["rust", "rustlang"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp", "c sharp"],
+    "Ruby": ["ruby"],
+    "PHP": ["php"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "Scala": ["scala"],
+    "R": ["r programming", "rstudio", "r language"],
+    "SQL": ["sql", "t-sql", "pl/sql", "tsql"],
+    "Bash": ["bash", "shell scripting", "shell script"],
+    # Web and frameworks
+    "React": ["react", "react.js", "reactjs"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue.js": ["vue", "vue.js", "vuejs"],
+    "Node.js": ["node.js", "nodejs", "node js"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi", "fast api"],
+    "Spring": ["spring boot", "spring framework", "springboot"],
+    ".NET": ["asp.net", "dotnet", ".net core", ".net"],
+    "Ruby on Rails": ["ruby on rails", "rails"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3", "sass", "scss"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["rest api", "rest apis", "restful", "rest services"],
+    "gRPC": ["grpc"],
+    "Microservices": ["microservices", "micro-services", "microservice architecture"],
+    # Data stores
+    "PostgreSQL": ["postgresql", "postgres", "psql"],
+    "MySQL": ["mysql", "mariadb"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch", "elastic search", "opensearch"],
+    "Cassandra": ["cassandra"],
+    "DynamoDB": ["dynamodb"],
+    "Oracle Database": ["oracle database", "oracle db", "oracle sql"],
+    "SQL Server": ["sql server", "mssql", "ms sql"],
+    "Snowflake": ["snowflake"],
+    # Cloud and infrastructure
+    "AWS": ["aws", "amazon web services", "ec2", "s3", "aws lambda"],
+    "Azure": ["azure", "microsoft azure"],
+    "Google Cloud": ["gcp", "google cloud", "google cloud platform", "bigquery"],
+    "Docker": ["docker", "containerization", "docker compose"],
+    "Kubernetes": ["kubernetes", "k8s", "eks", "aks", "gke", "helm"],
+    "Terraform": ["terraform", "hcl"],
+    "Ansible": ["ansible"],
+    "Linux": ["linux", "unix", "ubuntu", "centos", "rhel"],
+    "CI/CD": ["ci/cd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Jenkins": ["jenkins"],
+    "GitHub Actions": ["github actions"],
+    "GitLab CI": ["gitlab ci", "gitlab-ci"],
+    "Git": ["git", "github", "gitlab", "bitbucket"],
+    "Kafka": ["kafka", "apache kafka"],
+    "RabbitMQ": ["rabbitmq"],
+    "Nginx": ["nginx"],
+    "Prometheus": ["prometheus"],
+    "Grafana": ["grafana"],
+    # Data and ML
+    "Machine Learning": ["machine learning", "ml models", "ml engineering"],
+    "Deep Learning": ["deep learning", "neural networks", "neural network"],
+    "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision", "image recognition"],
+    "LLMs": ["llm", "llms", "large language models", "large language model", "generative ai", "genai"],
+    "TensorFlow": ["tensorflow", "keras"],
+    "PyTorch": ["pytorch"],
+    "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Spark": ["spark", "pyspark", "apache spark"],
+    "Hadoop": ["hadoop", "hdfs", "mapreduce"],
+    "Airflow": ["airflow", "apache airflow"],
+    "dbt": ["dbt"],
+    "ETL": ["etl", "elt", "data pipelines", "data pipeline"],
+    "Data Analysis": ["data analysis", "data analytics"],
+    "Statistics": ["statistics", "statistical analysis", "statistical modeling"],
+    "Tableau": ["tableau"],
+    "Power BI": ["power bi", "powerbi"],
+    "Excel": ["microsoft excel", "ms excel", "advanced excel", "vlookup", "pivot tables"],
+    # Practices
+    "Agile": ["agile", "scrum", "kanban"],
+    "Test Automation": ["test automation", "automated testing", "selenium", "pytest", "junit", "cypress"],
+    "Unit Testing": ["unit testing", "unit tests", "tdd", "test-driven development"],
+    "System Design": ["system design", "distributed systems", "scalable systems"],
+    "Security": ["security", "cybersecurity", "owasp", "penetration testing"],
+    "DevOps": ["devops", "sre", "site reliability"],
+    "Mobile Development": ["android", "ios", "react native", "flutter"],
+    "UI/UX Design": ["ui/ux", "ux design", "ui design", "figma"],
+    # Business and soft skills
+    "Project Management": ["project management", "pmp", "project manager"],
+    "Product Management": ["product management", "product manager", "product roadmap"],
+    "Leadership": ["leadership", "team lead", "led a team", "mentoring", "mentored"],
+    "Communication": ["communication skills", "communication", "presentation skills"],
+    "Stakeholder Management": ["stakeholder management", "stakeholders"],
+    "Problem Solving": ["problem solving", "problem-solving", "analytical skills"],
+    "Sales": ["sales", "business development"],
+    "Marketing": ["marketing", "seo", "sem", "digital marketing"],
+    "Customer Service": ["customer service", "customer support", "client relations"],
+    "Accounting": ["accounting", "bookkeeping", "gaap"],
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+class SkillMatcher:
+    """Aho-Corasick automaton over every alias in a skill taxonomy.
+
+    `find` scans text once, in time linear in its length plus the number of
+    matches, and returns the canonical skills found. Matches must sit on word
+    boundaries so "java" does not match inside "javascript".
+    """
+
+    def __init__(self, taxonomy: Dict[str, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+        self._canonical = {}
+        for canonical, aliases in taxonomy.items():
+            self._canonical[canonical.lower()] = canonical
+            for alias in aliases:
+                alias = _WHITESPACE.sub(" ", alias.strip().lower())
+                if alias:
+                    self._add(alias, canonical)
+        self._build_failure_links()
+
+    def _add(self, pattern: str, canonical: str) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append((len(pattern), canonical))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> Dict[str, int]:
+        """Canonical skill -> number of mentions in text"""
+        text = _WHITESPACE.sub(" ", text.lower())
+        goto, fail, output = self._goto, self._fail, self._output
+        counts: Dict[str, int] = {}
+        state = 0
+        last = len(text) - 1
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, canonical in output[state]:
+                start = index - length + 1
+                # A preceding "." belongs to another token ("react.js" is not "js")
+                if (start == 0 or not (text[start - 1].isalnum() or text[start - 1] == ".")) and (index == last or not text[index + 1].isalnum()):
+                    counts[canonical] = counts.get(canonical, 0) + 1
+        return counts
+
+    def canonicalize(self, name: str) -> Optional[str]:
+        """Canonical skill for a free-form skill name, e.g. an LLM criterion like "K8s experience" """
+        canonical = self._canonical.get(name.strip().lower())
+        if canonical:
+            return canonical
+        found = self.find(name)
+        return max(found, key=found.get) if found else None
+
+_matcher: Optional[SkillMatcher] = None
+_matcher_lock = threading.Lock()
+
+def _load_taxonomy() -> Dict[str, List[str]]:
+    taxonomy = {canonical: list(aliases) for canonical, aliases in SKILL_TAXONOMY.items()}
+    if settings.SKILL_TAXONOMY_PATH:
+        try:
+            extra = json.loads(Path(settings.SKILL_TAXONOMY_PATH).read_text(encoding="utf-8"))
+            for canonical, aliases in extra.items():
+                taxonomy.setdefault(canonical, []).extend(aliases)
+            logger.info(f"Loaded {len(extra)} skills from {settings.SKILL_TAXONOMY_PATH}")
+        except Exception as e:
+            logger.error(f"Error loading skill taxonomy {settings.SKILL_TAXONOMY_PATH}: {str(e)}")
+    return taxonomy
+
+def get_matcher() -> SkillMatcher:
+    """Shared matcher, built on first use"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher(_load_taxonomy())
+    return _matcher
+
+def extract_skills(text: str) -> List[str]:
+    """Known skills mentioned in text, sorted by name"""
+    return sorted(get_matcher().find(text))
+
+def known_skill(name: str) -> Optional[str]:
+    """Canonical name for a skill in the taxonomy, or None when it is not in it"""
+    return get_matcher().canonicalize(name)
+
+def canonicalize(name: str) -> str:
+    """Canonical name for a skill, or the name itself when it is not in the taxonomy"""
+    return known_skill(name) or name.strip()
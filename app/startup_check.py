@@ -0,0 +1,66 @@
+"""Import-time budget check for the API.
+
+Imports `main` in a fresh interpreter with `-X importtime` and reports the
+modules that dominate startup, grouped by top-level package.
+
+Usage (from the app directory):
+    python startup_check.py --budget-ms 1000 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+def measure_imports(module: str = "main") -> List[Tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for every import made by `module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        imports.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return imports
+
+def summarize(imports: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """Self time per top-level package in microseconds"""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in imports:
+        totals[name.split(".")[0]] += self_us
+    return dict(totals)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check the import-time budget of the API")
+    parser.add_argument("--module", default="main", help="Module to import")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="Maximum total import time in milliseconds")
+    parser.add_argument("--top", type=int, default=10, help="Number of packages to report")
+    args = parser.parse_args()
+    
+    imports = measure_imports(args.module)
+    total_ms = sum(self_us for _, self_us, _ in imports) / 1000
+    packages = sorted(summarize(imports).items(), key=lambda item: item[1], reverse=True)
+    
+    print(f"Import of '{args.module}' took {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"{'package':<30}{'self ms':>10}{'share':>8}")
+    for package, self_us in packages[:args.top]:
+        print(f"{package:<30}{self_us / 1000:>10.1f}{self_us / 1000 / total_ms:>8.0%}")
+    
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time exceeds budget by {total_ms - args.budget_ms:.1f} ms")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
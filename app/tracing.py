@@ -0,0 +1,132 @@
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+
+class Span:
+    """A single timed stage with optional token usage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.duration_ms = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "duration_ms": round(self.duration_ms, 2),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens
+        }
+
+class Trace:
+    """Collects spans for one unit of work (a request or a single candidate)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.spans: List[Span] = []
+        self._elapsed = 0.0
+        self._start: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def start(self) -> None:
+        if self._start is None:
+            self._start = time.perf_counter()
+
+    def finish(self) -> None:
+        if self._start is not None:
+            self._elapsed += time.perf_counter() - self._start
+            self._start = None
+
+    @property
+    def total_ms(self) -> float:
+        """Time spent while the trace was active, across every resume"""
+        running = time.perf_counter() - self._start if self._start is not None else 0.0
+        return (self._elapsed + running) * 1000
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(span.prompt_tokens for span in self.spans)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(span.completion_tokens for span in self.spans)
+
+    def stage_totals(self) -> List[Dict[str, Any]]:
+        """Aggregate spans by stage name, keeping first-seen order"""
+        totals: Dict[str, Span] = {}
+        with self._lock:
+            for span in self.spans:
+                total = totals.setdefault(span.name, Span(span.name))
+                total.duration_ms += span.duration_ms
+                total.prompt_tokens += span.prompt_tokens
+                total.completion_tokens += span.completion_tokens
+        return [total.to_dict() for total in totals.values()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_ms": round(self.total_ms, 2),
+            "stages": self.stage_totals(),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens
+        }
+
+@contextmanager
+def _activate(current: Trace):
+    parent = _current_trace.get()
+    first_span = len(current.spans)
+    current.start()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        current.finish()
+        _current_trace.reset(token)
+        if parent is not None:
+            for recorded in current.spans[first_span:]:
+                parent.add(recorded)
+
+@contextmanager
+def trace(name: str):
+    """Start a new trace and make it current for the enclosed block.
+
+    Spans recorded inside the block are also copied to the enclosing trace,
+    so request-level stage totals include every candidate's spans.
+    """
+    with _activate(Trace(name)) as current:
+        yield current
+
+@contextmanager
+def resume(existing: Trace):
+    """Make an earlier trace current again, e.g. for a candidate's second pipeline phase"""
+    with _activate(existing) as current:
+        yield current
+
+@contextmanager
+def span(name: str):
+    """Time a stage and attach it to the current trace, if any"""
+    current = Span(name)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.duration_ms = (time.perf_counter() - start) * 1000
+        active = _current_trace.get()
+        if active is not None:
+            active.add(current)
+
+def record_usage(current: Span, response: Any) -> None:
+    """Copy token usage from an OpenAI response onto a span"""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    current.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+    current.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
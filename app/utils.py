@@ -1,52 +1,198 @@
 import os
+import shutil
 import tempfile
-from typing import IO
+import hashlib
+import zipfile
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
 from fastapi import UploadFile, HTTPException
-import PyPDF2
-import docx
 import io
 from pathlib import Path
+from config import settings
 from logger import logger
+import cache
+import extraction
+
+def _extraction_cache():
+    return cache.get_cache(
+        "extracted_text",
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        default_ttl=settings.CACHE_TTL_SECONDS
+    )
 
 def extract_text_from_file(file: UploadFile) -> str:
     """Extract text from PDF or DOC/DOCX file"""
-    logger.info(f"Extracting text from file: {file.filename}")
+    return extract_text_from_bytes(file.filename, file.file.read())
+
+def extract_text_from_bytes(filename: str, content: bytes) -> str:
+    """Extract text from the raw bytes of a PDF or DOC/DOCX file.
+
+    Results are cached by content hash, so re-uploading the same resume
+    (from any worker) skips parsing.
+    """
+    logger.info(f"Extracting text from file: {filename}")
+    
+    extension = Path(filename).suffix.lower()
+    key = cache.make_key("extracted_text", extension, hashlib.sha256(content).hexdigest())
+    cached = _extraction_cache().get(key)
+    if cached is not None:
+        logger.info(f"Using cached text for {filename}")
+        return cached
     
+    text = _parse_document(filename, content)
+    _extraction_cache().set(key, text)
+    return text
+
+def _parse_document(filename: str, content: bytes) -> str:
     try:
-        content = file.file.read()
-        
-        if file.filename.lower().endswith('.pdf'):
+        if filename.lower().endswith('.pdf'):
             try:
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                logger.info(f"Successfully extracted text from PDF: {file.filename}")
+                text = extraction.extract_pdf_text(content, filename)
+                logger.info(f"Successfully extracted text from PDF: {filename}")
                 return text
             except Exception as e:
-                logger.error(f"Error reading PDF {file.filename}: {str(e)}")
+                logger.error(f"Error reading PDF {filename}: {str(e)}")
                 raise HTTPException(status_code=400, detail=f"Error reading PDF: {str(e)}")
         
-        elif file.filename.lower().endswith(('.doc', '.docx')):
+        elif filename.lower().endswith(('.doc', '.docx')):
             try:
+                text = extraction.extract_docx_text(content)
+                logger.info(f"Successfully extracted text from Word document: {filename}")
+                return text
+            except Exception as e:
+                logger.warning(f"Streaming DOCX parser failed on {filename}, falling back to python-docx: {str(e)}")
+            
+            try:
+                import docx  # imported lazily to keep startup fast
+                
                 doc = docx.Document(io.BytesIO(content))
                 text = ""
                 for paragraph in doc.paragraphs:
                     text += paragraph.text + "\n"
-                logger.info(f"Successfully extracted text from Word document: {file.filename}")
+                logger.info(f"Successfully extracted text from Word document: {filename}")
                 return text
             except Exception as e:
-                logger.error(f"Error reading Word document {file.filename}: {str(e)}")
+                logger.error(f"Error reading Word document {filename}: {str(e)}")
                 raise HTTPException(status_code=400, detail=f"Error reading Word document: {str(e)}")
         
         else:
-            logger.error(f"Unsupported file format: {file.filename}")
+            logger.error(f"Unsupported file format: {filename}")
             raise HTTPException(status_code=400, detail="Unsupported file format. Please upload PDF or DOC/DOCX files.")
     
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Unexpected error processing file {file.filename}: {str(e)}")
+        logger.error(f"Unexpected error processing file {filename}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
+def is_zip_archive(filename: str) -> bool:
+    return Path(filename or "").suffix.lower() == ".zip"
+
+def _resume_members(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    return [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and not Path(info.filename).name.startswith(".")
+    ]
+
+def validate_zip_archives(archives: Iterable[Tuple[str, IO[bytes]]]) -> None:
+    """Reject archives that are unreadable or together exceed the member count or size limits.
+
+    The limits apply to the whole upload, not to each archive. Only the
+    central directories are read; nothing is decompressed.
+    """
+    member_count = 0
+    declared_size = 0
+    for filename, file in archives:
+        try:
+            with zipfile.ZipFile(file) as archive:
+                members = _resume_members(archive)
+        except zipfile.BadZipFile as e:
+            raise HTTPException(status_code=400, detail=f"Error reading ZIP archive {filename}: {str(e)}")
+        finally:
+            file.seek(0)
+        member_count += len(members)
+        declared_size += sum(info.file_size for info in members)
+    
+    if member_count > settings.ZIP_MAX_MEMBERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"ZIP archives contain {member_count} files (max: {settings.ZIP_MAX_MEMBERS})"
+        )
+    if declared_size > settings.ZIP_MAX_TOTAL_BYTES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"ZIP archives expand to {declared_size} bytes (max: {settings.ZIP_MAX_TOTAL_BYTES})"
+        )
+
+class ZipBudget:
+    """Members and uncompressed bytes still allowed across every archive in an upload"""
+
+    def __init__(self):
+        self.members = settings.ZIP_MAX_MEMBERS
+        self.bytes = settings.ZIP_MAX_TOTAL_BYTES
+
+def iter_zip_documents(file: IO[bytes], filename: str, budget: Optional[ZipBudget] = None) -> Iterator[Tuple[str, bytes]]:
+    """Resume files in a ZIP archive as (member path, bytes), decompressed one at a time.
+
+    Members with unsupported extensions, or larger than ZIP_MAX_MEMBER_BYTES,
+    are skipped. Reads are capped so a member whose header understates its
+    size cannot exceed the limit either. Pass one `budget` to several calls
+    to share the member and total size limits between archives.
+    """
+    budget = budget or ZipBudget()
+    limit = settings.ZIP_MAX_MEMBER_BYTES
+    with zipfile.ZipFile(file) as archive:
+        for info in _resume_members(archive):
+            if budget.members <= 0:
+                logger.warning(f"Stopping at {info.filename} in {filename}: more than {settings.ZIP_MAX_MEMBERS} files uploaded")
+                return
+            budget.members -= 1
+            if not validate_file_extension(info.filename):
+                logger.warning(f"Skipping unsupported file in {filename}: {info.filename}")
+                continue
+            if info.file_size > limit:
+                logger.warning(f"Skipping {info.filename} in {filename}: {info.file_size} bytes (max: {limit})")
+                continue
+            
+            try:
+                with archive.open(info) as member:
+                    content = member.read(limit + 1)
+            except (zipfile.BadZipFile, OSError, RuntimeError) as e:
+                logger.warning(f"Skipping unreadable {info.filename} in {filename}: {str(e)}")
+                continue
+            if len(content) > limit:
+                logger.warning(f"Skipping {info.filename} in {filename}: larger than {limit} bytes")
+                continue
+            
+            budget.bytes -= len(content)
+            if budget.bytes < 0:
+                logger.warning(f"Stopping at {info.filename} in {filename}: uploads exceed {settings.ZIP_MAX_TOTAL_BYTES} bytes")
+                return
+            yield info.filename, content
+
+def spool_to_temp_file(file: IO[bytes]) -> IO[bytes]:
+    """Copy an upload to an anonymous temporary file that outlives the request"""
+    spooled = tempfile.TemporaryFile()
+    shutil.copyfileobj(file, spooled)
+    spooled.seek(0)
+    return spooled
+
+def iter_resume_documents(
+    documents: Iterable[Tuple[str, bytes]],
+    archives: Iterable[Tuple[str, IO[bytes]]]
+) -> Iterator[Tuple[str, bytes]]:
+    """Individual uploads followed by the members of each archive; archives are closed when done"""
+    archives = list(archives)
+    budget = ZipBudget()
+    try:
+        yield from documents
+        for filename, file in archives:
+            yield from iter_zip_documents(file, filename, budget)
+    finally:
+        for _, file in archives:
+            file.close()
+
 def validate_file_extension(filename: str) -> bool:
     """Validate file extension"""
     allowed_extensions = ['.pdf', '.doc', '.docx']
@@ -12,6 +12,10 @@ import numpy as np
 import io
 import base64
 import re
+import os
+import hashlib
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 st.set_page_config(
     page_title="Recruitment AI Agent",
@@ -20,7 +24,14 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-API_BASE_URL = "http://localhost:8000"
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "5"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "120"))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+CANDIDATES_PER_PAGE = 20
+LARGE_BATCH_THRESHOLD = 200  # above this, charts are only drawn when requested
 
 st.markdown("""
 <style>
@@ -132,27 +143,159 @@ def show_status(message, status_type="info"):
     else:
         st.info(f"ℹ️ {message}")
 
-def make_api_request(url, method="POST", json_data=None, files=None, data=None):
+@st.cache_resource
+def get_http_session():
+    """Shared HTTP session with connection pooling and retries, reused across reruns"""
+    retry = Retry(
+        total=API_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"])
+    )
+    adapter = HTTPAdapter(pool_connections=API_POOL_SIZE, pool_maxsize=API_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def make_api_request(url, method="POST", json_data=None, files=None, data=None, timeout=None, headers=None):
     """Make API request with error handling"""
+    session = get_http_session()
+    timeout = timeout or (API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
     try:
         if method == "POST":
             if files:
-                response = requests.post(url, files=files, data=data)
+                response = session.post(url, files=files, data=data, timeout=timeout)
             else:
-                response = requests.post(url, json=json_data)
+                response = session.post(url, json=json_data, timeout=timeout)
+        elif method == "DELETE":
+            response = session.delete(url, headers=headers, timeout=timeout)
         else:
-            response = requests.get(url)
+            response = session.get(url, timeout=timeout)
         
-        if response.status_code == 200:
+        if response.status_code in (200, 202):
             return response.json(), True
         else:
             return {"error": f"API Error: {response.status_code} - {response.text}"}, False
             
+    except requests.exceptions.Timeout:
+        return {"error": "The server took too long to respond. Please try again."}, False
     except requests.exceptions.ConnectionError:
         return {"error": "Cannot connect to the server. Please make sure the backend is running."}, False
     except Exception as e:
         return {"error": f"Unexpected error: {str(e)}"}, False
 
+def stream_api_request(url, json_data=None):
+    """Stream server-sent events from the API, yielding text fragments as they arrive"""
+    with get_http_session().post(
+        url,
+        json=json_data,
+        stream=True,
+        headers={"Accept": "text/event-stream"},
+        timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+    ) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"API Error: {response.status_code} - {response.text}")
+        
+        event = "message"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                event = "message"
+                continue
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                payload = json.loads(line[len("data:"):].strip())
+                if event == "error":
+                    raise RuntimeError(payload)
+                if event == "done":
+                    return
+                yield payload
+
+def hash_results(results):
+    """Stable hash of a matching result, used to key memoized frames and charts"""
+    return hashlib.sha256(json.dumps(results, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def get_results_key(results):
+    """Hash of the current results, computed once when they are stored"""
+    key = st.session_state.get("matching_results_key")
+    if key is None:
+        key = st.session_state.matching_results_key = hash_results(results)
+    return key
+
+# Arguments prefixed with "_" are not hashed by st.cache_data; results_key identifies them
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_candidate_frame(results_key, _candidates, _candidate_names):
+    """One row per candidate with the columns used by the charts, tables and exports"""
+    return pd.DataFrame({
+        "Name": [_candidate_names.get(c["filename"], c["filename"]) for c in _candidates],
+        "Filename": [c["filename"] for c in _candidates],
+        "Score": [c["score"] for c in _candidates],
+        "Missing Skills Count": [len(c["missing_skills"]) for c in _candidates],
+        "Qualified": [c["score"] >= 70 for c in _candidates],
+        "Remark Words": [len(c["remarks"].split()) for c in _candidates],
+        "Email": [c.get("email") for c in _candidates],
+        "Phone": [c.get("phone") for c in _candidates],
+        "Location": [c.get("location") for c in _candidates],
+        "Years of Experience": [c.get("years_of_experience") for c in _candidates]
+    })
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_skill_counts(results_key, _candidates):
+    """How often each skill is missing across all candidates, most frequent first"""
+    skill_counts = pd.Series(
+        [skill for c in _candidates for skill in c["missing_skills"]],
+        dtype="object"
+    ).value_counts().reset_index()
+    skill_counts.columns = ['Skill', 'Count']
+    return skill_counts
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_matching_figures(results_key, _df, _candidates):
+    """Charts for the matching results page"""
+    histogram = px.histogram(_df, x="Score", nbins=10, title="Candidate Score Distribution",
+                             color_discrete_sequence=['#1f77b4'])
+    histogram.update_layout(bargap=0.1, font=dict(color="#333333"))
+    
+    top = _df.nlargest(50, "Score")
+    comparison = px.bar(top, x="Name", y="Score",
+                        title="Candidate Score Comparison" if len(top) == len(_df) else "Candidate Score Comparison (Top 50)",
+                        color="Score",
+                        color_continuous_scale="Viridis",
+                        labels={"Name": "Candidate"})
+    comparison.update_layout(font=dict(color="#333333"))
+    
+    radar = None
+    if len(_candidates) >= 3:
+        radar = create_radar_chart(sorted(_candidates, key=lambda c: c["score"], reverse=True))
+    
+    return {"histogram": histogram, "comparison": comparison, "radar": radar}
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_analysis_figures(results_key, _df, _skill_counts):
+    """Charts for the results analysis page"""
+    pie = px.pie(_df, names="Qualified", title="Qualification Ratio",
+                 color="Qualified", color_discrete_map={True: '#28a745', False: '#dc3545'})
+    box = px.box(_df, y="Score", title="Score Distribution", color_discrete_sequence=['#1f77b4'])
+    scatter = px.scatter(_df, x="Missing Skills Count", y="Score", title="Skills vs Score",
+                         hover_data=["Name"], color="Qualified",
+                         color_discrete_map={True: '#28a745', False: '#dc3545'})
+    remarks = px.histogram(_df, x="Remark Words", nbins=10,
+                           title="Distribution of Remark Lengths (Words)",
+                           color_discrete_sequence=['#1f77b4'])
+    
+    skills = None
+    if not _skill_counts.empty:
+        skills = px.bar(_skill_counts.head(10), x='Skill', y='Count',
+                        title="Top 10 Most Frequently Missing Skills",
+                        color='Count', color_continuous_scale='Viridis')
+    
+    figures = {"pie": pie, "box": box, "scatter": scatter, "remarks": remarks, "skills": skills}
+    for fig in figures.values():
+        if fig is not None:
+            fig.update_layout(font=dict(color="#333333"))
+    return figures
+
 def create_radar_chart(candidates_data):
     """Create radar chart for skills comparison"""
     categories = ['Technical Skills', 'Experience', 'Education', 'Cultural Fit', 'Communication']
@@ -219,51 +362,23 @@ def create_score_gauge(score, candidate_name, index):
     fig.update_layout(height=300, width=300)
     return fig
 
-def update_processing_history(jobs_processed=0, candidates_evaluated=0):
-    """Track processing history for analytics"""
-    if 'processing_history' not in st.session_state:
-        st.session_state.processing_history = pd.DataFrame({
-            'Date': [],
-            'Jobs Processed': [],
-            'Candidates Evaluated': []
-        })
-    
-    today = date.today()
-    
-    if not st.session_state.processing_history.empty and today in st.session_state.processing_history['Date'].values:
-        mask = st.session_state.processing_history['Date'] == today
-        st.session_state.processing_history.loc[mask, 'Jobs Processed'] += jobs_processed
-        st.session_state.processing_history.loc[mask, 'Candidates Evaluated'] += candidates_evaluated
-    else:
-        new_row = pd.DataFrame({
-            'Date': [today],
-            'Jobs Processed': [jobs_processed],
-            'Candidates Evaluated': [candidates_evaluated]
-        })
-        st.session_state.processing_history = pd.concat([st.session_state.processing_history, new_row], ignore_index=True)
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_analytics():
+    """Precomputed rollups from the backend; cleared whenever a matching run completes"""
+    result, success = make_api_request(f"{API_BASE_URL}/analytics", method="GET")
+    return result if success else None
 
-def extract_candidate_name(resume_text, filename):
-    """Extract candidate name from resume text"""
-    patterns = [
-        r"(?:^|\n)[A-Z][a-z]+ [A-Z][a-z]+(?:\n|$)", 
-        r"(?:^|\n)[A-Z][a-z]+, [A-Z][a-z]+(?:\n|$)",
-        r"Name:\s*([A-Z][a-z]+ [A-Z][a-z]+)", 
-        r"Full Name:\s*([A-Z][a-z]+ [A-Z][a-z]+)",
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, resume_text)
-        if match:
-            name = match.group(1) if len(match.groups()) > 0 else match.group(0)
-            
-            name = re.sub(r'[^a-zA-Z\s,]', '', name).strip()
-            if ',' in name:
-                
-                parts = name.split(',')
-                name = f"{parts[1].strip()} {parts[0].strip()}"
-            return name
-    
-    return filename.split('.')[0]
+def activity_frame(analytics):
+    """Daily activity rollups as a DataFrame for the activity charts"""
+    return pd.DataFrame({
+        "Date": [day["date"] for day in analytics["daily"]],
+        "Jobs Processed": [day["jobs_processed"] for day in analytics["daily"]],
+        "Candidates Evaluated": [day["candidates_evaluated"] for day in analytics["daily"]]
+    })
+
+def candidate_display_name(candidate):
+    """Name extracted by the backend at ingest, falling back to the filename"""
+    return candidate.get("name") or candidate["filename"].rsplit(".", 1)[0]
 
 
 def generate_email_for_candidate(candidate, email_type, position):
@@ -274,7 +389,7 @@ def generate_email_for_candidate(candidate, email_type, position):
     if candidate['filename'] in st.session_state.candidate_names:
         candidate_name = st.session_state.candidate_names[candidate['filename']]
     else:
-        candidate_name = extract_candidate_name(candidate.get('resume_text', ''), candidate['filename'])
+        candidate_name = candidate_display_name(candidate)
         st.session_state.candidate_names[candidate['filename']] = candidate_name
     
     with st.spinner(f"Generating {email_type} email for {candidate_name}..."):
@@ -336,37 +451,46 @@ def dashboard_page():
     
     col1, col2, col3, col4 = st.columns(4)
     
-    total_jobs = 0
-    total_candidates = 0
-    matched_candidates = 0
-    avg_processing_time = 0
-    
-    if hasattr(st.session_state, 'matching_results'):
-        results = st.session_state.matching_results
-        total_candidates = len(results.get("candidates", []))
-        matched_candidates = len([c for c in results.get("candidates", []) if c.get("score", 0) >= 70])
-        avg_processing_time = results.get("processing_time", 0)
-        total_jobs = 1  
+    analytics = fetch_analytics()
+    if analytics is None:
+        show_status("Could not load analytics from the server.", "warning")
+        analytics = {"total_jobs": 0, "total_candidates": 0, "qualified_candidates": 0,
+                     "average_processing_time": 0, "daily": [], "score_histogram": [], "top_missing_skills": []}
     
     with col1:
-        st.markdown(f'<div class="metric-card"><h3>📋 Total Jobs</h3><h2>{total_jobs}</h2></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><h3>📋 Total Jobs</h3><h2>{analytics["total_jobs"]}</h2></div>', unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f'<div class="metric-card"><h3>👥 Candidates</h3><h2>{total_candidates}</h2></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><h3>👥 Candidates</h3><h2>{analytics["total_candidates"]}</h2></div>', unsafe_allow_html=True)
     
     with col3:
-        st.markdown(f'<div class="metric-card"><h3>✅ Matched</h3><h2>{matched_candidates}</h2></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><h3>✅ Matched</h3><h2>{analytics["qualified_candidates"]}</h2></div>', unsafe_allow_html=True)
     
     with col4:
-        st.markdown(f'<div class="metric-card"><h3>⏱️ Avg Time</h3><h2>{avg_processing_time:.1f}s</h2></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><h3>⏱️ Avg Time</h3><h2>{analytics["average_processing_time"]:.1f}s</h2></div>', unsafe_allow_html=True)
     
     st.subheader("📈 Recent Activity")
     
-    if hasattr(st.session_state, 'processing_history') and not st.session_state.processing_history.empty:
-        activity_data = st.session_state.processing_history
-        fig = px.line(activity_data, x='Date', y=['Jobs Processed', 'Candidates Evaluated'],
+    if analytics["daily"]:
+        fig = px.line(activity_frame(analytics), x='Date', y=['Jobs Processed', 'Candidates Evaluated'],
                      title='Processing Activity', markers=True)
         st.plotly_chart(fig, use_container_width=True)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig = px.bar(x=[f"{i * 10}-{i * 10 + 9}" for i in range(10)], y=analytics["score_histogram"],
+                         labels={"x": "Score", "y": "Candidates"}, title="Score Distribution (All Runs)",
+                         color_discrete_sequence=['#1f77b4'])
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            if analytics["top_missing_skills"]:
+                fig = px.bar(pd.DataFrame(analytics["top_missing_skills"]), x="skill", y="count",
+                             labels={"skill": "Skill", "count": "Candidates"},
+                             title="Most Frequently Missing Skills (All Runs)",
+                             color="count", color_continuous_scale="Viridis")
+                st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No processing activity yet. Run a job matching to see analytics.")
     
@@ -389,6 +513,32 @@ def dashboard_page():
         if st.button("📊 View Analytics", use_container_width=True):
             st.session_state.page = "📈 Results Analysis"
 
+def generate_job_description_stream(jd_request, regenerate=False):
+    """Stream a generated job description into the page as it is produced"""
+    preview = st.empty()
+    generated = ""
+    url = f"{API_BASE_URL}/generate-job-description?stream=true"
+    if regenerate:
+        url += "&regenerate=true"
+    
+    try:
+        with st.spinner("Generating job description using AI..."):
+            for fragment in stream_api_request(url, json_data=jd_request):
+                generated += fragment
+                preview.markdown(generated + "▌")
+        
+        preview.empty()
+        st.session_state.job_description = generated.strip()
+        st.session_state.job_title = jd_request["job_title"]
+        st.session_state.jd_request = jd_request
+        show_status("Job description generated successfully!", "success")
+    except requests.exceptions.ConnectionError:
+        preview.empty()
+        show_status("Cannot connect to the server. Please make sure the backend is running.", "error")
+    except Exception as e:
+        preview.empty()
+        show_status(f"Error generating job description: {str(e)}", "error")
+
 def job_description_page():
     st.header("📋 Job Description Input")
     
@@ -417,35 +567,32 @@ def job_description_page():
             location = st.text_input("Location*", placeholder="e.g., New York, Remote, Hybrid")
             salary_range = st.text_input("Salary Range", placeholder="e.g., $100,000 - $150,000")
         
-        if st.button("✨ Generate Job Description", type="primary", use_container_width=True):
+        jd_request = {
+            "job_title": job_title,
+            "years_of_experience": f"{years_experience}+",
+            "must_have_skills": must_have_skills,
+            "nice_to_have_skills": nice_to_have_skills,
+            "company_name": company_name,
+            "employment_type": employment_type,
+            "industry": industry,
+            "location": location,
+            "salary_range": salary_range
+        }
+        
+        gen_col, regen_col = st.columns([3, 1])
+        with gen_col:
+            generate_clicked = st.button("✨ Generate Job Description", type="primary", use_container_width=True)
+        with regen_col:
+            regenerate_clicked = st.button(
+                "🔄 Regenerate",
+                use_container_width=True,
+                disabled=st.session_state.get("jd_request") != jd_request,
+                help="Get a different version of the last generated job description"
+            )
+        
+        if generate_clicked or regenerate_clicked:
             if all([job_title, must_have_skills, company_name, industry, location]):
-                with st.spinner("Generating job description using AI..."):
-                    progress_bar = st.progress(0)
-                    for i in range(100):
-                        time.sleep(0.01)
-                        progress_bar.progress(i + 1)
-                    
-                    result, success = make_api_request(
-                        f"{API_BASE_URL}/generate-job-description",
-                        json_data={
-                            "job_title": job_title,
-                            "years_of_experience": f"{years_experience}+",
-                            "must_have_skills": must_have_skills,
-                            "nice_to_have_skills": nice_to_have_skills,
-                            "company_name": company_name,
-                            "employment_type": employment_type,
-                            "industry": industry,
-                            "location": location,
-                            "salary_range": salary_range
-                        }
-                    )
-                    
-                    if success:
-                        st.session_state.job_description = result["job_description"]
-                        st.session_state.job_title = job_title
-                        show_status("Job description generated successfully!", "success")
-                    else:
-                        show_status(result["error"], "error")
+                generate_job_description_stream(jd_request, regenerate=regenerate_clicked)
             else:
                 show_status("Please fill in all required fields marked with *", "warning")
     
@@ -542,14 +689,14 @@ def resume_matching_page():
     
     uploaded_resumes = st.file_uploader(
         "Drag and drop or select resume files",
-        type=['pdf', 'docx', 'doc'],
+        type=['pdf', 'docx', 'doc', 'zip'],
         accept_multiple_files=True,
-        help="You can upload multiple files at once. Maximum 10 files."
+        help="You can upload multiple files at once. Maximum 10 files, or ZIP archives of resumes."
     )
     
     if uploaded_resumes:
-        if len(uploaded_resumes) > 10:
-            show_status("Maximum 10 resumes allowed. Please select fewer files.", "error")
+        if len([file for file in uploaded_resumes if not file.name.lower().endswith(".zip")]) > 10:
+            show_status("Maximum 10 resumes allowed. Please select fewer files or upload a ZIP archive.", "error")
         else:
 
             st.success(f"📁 {len(uploaded_resumes)} resume(s) uploaded successfully!")
@@ -566,57 +713,105 @@ def resume_matching_page():
                 total_size = sum(file.size for file in uploaded_resumes) / 1024
                 st.metric("Total Size", f"{total_size:.1f} KB")
             
+            cascade = st.checkbox(
+                "⚡ Fast pre-screen (cascade)",
+                help="Score every resume by skill coverage first and run the full AI evaluation only for the strongest candidates"
+            )
+            tiered = st.checkbox(
+                "🎯 Two-tier evaluation",
+                help="Evaluate with a smaller model first and re-evaluate only the top and close-call candidates with the finalist model"
+            )
+            lean = st.checkbox(
+                "📝 Lean scoring",
+                help="Ask only for per-criterion scores and a summary; reasons and evidence are fetched when you open a candidate"
+            )
+            
             if st.button("🔍 Analyze Candidates", type="primary", use_container_width=True):
-                progress_container = st.container()
-                progress_bar = progress_container.progress(0)
-                status_text = progress_container.empty()
+                files = [("resumes", (resume.name, resume.getvalue(), resume.type)) for resume in uploaded_resumes]
+                data = {
+                    "job_description": st.session_state.job_description,
+                    "cascade": str(cascade).lower(),
+                    "tiered": str(tiered).lower(),
+                    "lean": str(lean).lower(),
+                    "sort": "score"
+                }
                 
-                try:
-                    files = []
-                    for i, resume in enumerate(uploaded_resumes):
-                        files.append(("resumes", (resume.name, resume.getvalue(), resume.type)))
-                        progress = (i + 1) / len(uploaded_resumes) * 100
-                        progress_bar.progress(int(progress))
-                        status_text.text(f"Processing {i + 1}/{len(uploaded_resumes)}: {resume.name}")
-                    
-                    data = {"job_description": st.session_state.job_description}
-                    
-                    result, success = make_api_request(
-                        f"{API_BASE_URL}/match-candidates",
-                        files=files,
-                        data=data
-                    )
-                    
-                    if success:
-                        st.session_state.matching_results = result
+                result, success = make_api_request(
+                    f"{API_BASE_URL}/match-candidates/jobs",
+                    files=files,
+                    data=data
+                )
+                
+                if success:
+                    st.session_state.matching_job_id = result["job_id"]
+                    st.session_state.matching_job_rows = []
+                    # Kept so a candidate's evidence can be fetched on demand
+                    st.session_state.matching_resume_files = {
+                        resume.name: (resume.getvalue(), resume.type) for resume in uploaded_resumes
+                    }
+                    st.session_state.matching_job_description = st.session_state.job_description
+                    st.session_state.candidate_evidence = {}
+                else:
+                    show_status(result["error"], "error")
+    
+    if st.session_state.get("matching_job_id"):
+        poll_matching_job()
+    elif st.session_state.get("matching_results"):
+        display_matching_results(st.session_state.matching_results)
 
-                        if 'candidate_names' not in st.session_state:
-                            st.session_state.candidate_names = {}
-                        
-                        for candidate in result.get("candidates", []):
-                            if candidate['filename'] not in st.session_state.candidate_names:
-                                candidate_name = extract_candidate_name(candidate.get('resume_text', ''), candidate['filename'])
-                                st.session_state.candidate_names[candidate['filename']] = candidate_name
-                        
-                        update_processing_history(
-                            jobs_processed=1,
-                            candidates_evaluated=len(uploaded_resumes)
-                        )
-                        progress_bar.progress(100)
-                        status_text.text("Analysis completed!")
-                        time.sleep(0.5)
-                        progress_container.empty()
-                        
-                        show_status("Analysis completed successfully!", "success")
-                        
-                        display_matching_results(result)
-                    else:
-                        progress_container.empty()
-                        show_status(result["error"], "error")
-                        
-                except Exception as e:
-                    progress_container.empty()
-                    show_status(f"Error during processing: {str(e)}", "error")
+def poll_matching_job():
+    """Check the background matching job once per rerun and show its progress without blocking the UI"""
+    job_id = st.session_state.matching_job_id
+    rows = st.session_state.setdefault("matching_job_rows", [])
+    job, success = make_api_request(f"{API_BASE_URL}/jobs/{job_id}?since={len(rows)}", method="GET")
+    
+    if not success:
+        del st.session_state.matching_job_id
+        show_status(job["error"], "error")
+        return
+    
+    if job["status"] == "completed":
+        del st.session_state.matching_job_id
+        result = job["result"]
+        st.session_state.matching_results = result
+        st.session_state.matching_results_key = hash_results(result)
+        
+        if 'candidate_names' not in st.session_state:
+            st.session_state.candidate_names = {}
+        
+        for candidate in result.get("candidates", []):
+            if candidate['filename'] not in st.session_state.candidate_names:
+                candidate_name = candidate_display_name(candidate)
+                st.session_state.candidate_names[candidate['filename']] = candidate_name
+        
+        fetch_analytics.clear()
+        show_status("Analysis completed successfully!", "success")
+        display_matching_results(result)
+        return
+    
+    if job["status"] == "failed":
+        del st.session_state.matching_job_id
+        show_status(f"Error during processing: {job['error']}", "error")
+        return
+    
+    rows.extend(job["candidates"])
+    total = job["total"] or 1
+    st.progress(job["processed"] / total)
+    st.text(f"Evaluated {job['processed']}/{job['total']} resumes ({job['status']})...")
+    
+    if rows:
+        st.dataframe(
+            pd.DataFrame({
+                "Filename": [c["filename"] for c in rows],
+                "Score": [c["score"] for c in rows],
+                "Missing Skills": [len(c["missing_skills"]) for c in rows],
+                "Remarks": [c["remarks"] for c in rows]
+            }).sort_values("Score", ascending=False),
+            use_container_width=True,
+            hide_index=True
+        )
+    time.sleep(JOB_POLL_INTERVAL)
+    st.rerun()
 
 def display_matching_results(results):
     """Display the matching results with enhanced visualizations"""
@@ -630,6 +825,9 @@ def display_matching_results(results):
         show_status("No candidates found or processed.", "warning")
         return
     
+    results_key = get_results_key(results)
+    df = build_candidate_frame(results_key, candidates, st.session_state.get("candidate_names", {}))
+    
     st.subheader("📈 Performance Metrics")
     
     col1, col2, col3, col4 = st.columns(4)
@@ -641,66 +839,56 @@ def display_matching_results(results):
         st.markdown(f'<div class="metric-card"><h3>👥 Total Candidates</h3><h2>{len(candidates)}</h2></div>', unsafe_allow_html=True)
     
     with col3:
-        qualified = len([c for c in candidates if c.get("score", 0) >= 70])
+        qualified = int(df["Qualified"].sum())
         st.markdown(f'<div class="metric-card"><h3>✅ Qualified</h3><h2>{qualified}</h2></div>', unsafe_allow_html=True)
     
     with col4:
-        avg_score = sum(c.get("score", 0) for c in candidates) / len(candidates)
+        avg_score = df["Score"].mean()
         st.markdown(f'<div class="metric-card"><h3>📊 Avg Score</h3><h2>{avg_score:.1f}</h2></div>', unsafe_allow_html=True)
     
-    df_data = []
-    for candidate in candidates:
-        candidate_name = st.session_state.candidate_names.get(candidate['filename'], candidate['filename'])
-        df_data.append({
-            "Candidate": candidate_name,
-            "Filename": candidate["filename"],
-            "Score": candidate["score"],
-            "Missing Skills": len(candidate["missing_skills"]),
-            "Status": "Qualified" if candidate["score"] >= 70 else "Needs Review"
-        })
-    
-    df = pd.DataFrame(df_data)
-    
-    tab1, tab2, tab3 = st.tabs(["📊 Score Distribution", "📋 Candidate Comparison", "🎯 Skills Analysis"])
-    
-    with tab1:
-        fig = px.histogram(df, x="Score", nbins=10, title="Candidate Score Distribution",
-                          color_discrete_sequence=['#1f77b4'])
-        fig.update_layout(bargap=0.1, font=dict(color="#333333"))
-    
-    with tab2:
-        fig = px.bar(df.sort_values("Score", ascending=False), 
-                    x="Candidate", y="Score", 
-                    title="Candidate Score Comparison",
-                    color="Score",
-                    color_continuous_scale="Viridis")
-        fig.update_layout(font=dict(color="#333333"))
+    if st.toggle("📊 Show charts", value=len(candidates) <= LARGE_BATCH_THRESHOLD, key="show_matching_charts"):
+        figures = build_matching_figures(results_key, df, candidates)
+        
+        tab1, tab2, tab3 = st.tabs(["📊 Score Distribution", "📋 Candidate Comparison", "🎯 Skills Analysis"])
+        
+        with tab1:
+            st.plotly_chart(figures["histogram"], use_container_width=True)
+        
+        with tab2:
+            st.plotly_chart(figures["comparison"], use_container_width=True)
+        
+        with tab3:
+            if figures["radar"] is not None:
+                st.plotly_chart(figures["radar"], use_container_width=True)
+            else:
+                st.info("Need at least 3 candidates for skills radar chart")
     
-    with tab3:
-
-        if len(candidates) >= 3:
-            radar_fig = create_radar_chart(candidates)
-            st.plotly_chart(radar_fig, use_container_width=True)
-        else:
-            st.info("Need at least 3 candidates for skills radar chart")
+    if results.get("batch_id"):
+        show_rerank_panel(results["batch_id"])
     
     st.subheader("👥 Detailed Candidate Analysis")
     
     sort_option = st.selectbox("Sort by:", ["Score (High to Low)", "Score (Low to High)", "Name"])
     filter_score = st.slider("Filter by minimum score:", 0, 100, 0)
     
-    filtered_candidates = [c for c in candidates if c["score"] >= filter_score]
-    
-    if sort_option == "Score (High to Low)":
-        filtered_candidates.sort(key=lambda x: x["score"], reverse=True)
-    elif sort_option == "Score (Low to High)":
-        filtered_candidates.sort(key=lambda x: x["score"])
-    else:
-        filtered_candidates.sort(key=lambda x: st.session_state.candidate_names.get(x['filename'], x['filename']))
-    
-    for i, candidate in enumerate(filtered_candidates):
+    # Candidates arrive ordered by score (highest first) from the API
+    filtered = df[df["Score"] >= filter_score]
+    if sort_option == "Score (Low to High)":
+        filtered = filtered.sort_values("Score", kind="stable")
+    elif sort_option == "Name":
+        filtered = filtered.sort_values("Name", kind="stable")
+    
+    # Only the visible page of candidate cards (and their gauges) is rendered
+    page_count = max(1, -(-len(filtered) // CANDIDATES_PER_PAGE))
+    page = 1
+    if page_count > 1:
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+    start = (page - 1) * CANDIDATES_PER_PAGE
+    
+    for i in filtered.index[start:start + CANDIDATES_PER_PAGE]:
+        candidate = candidates[i]
         is_best = candidate["filename"] == best_candidate
-        candidate_name = st.session_state.candidate_names.get(candidate['filename'], candidate['filename'])
+        candidate_name = df.at[i, "Name"]
         
         score = candidate["score"]
         if score >= 80:
@@ -722,6 +910,10 @@ def display_matching_results(results):
                 st.markdown(f"**{title}**")
                 st.markdown(f'<span class="{score_class}">{score}/100</span>', unsafe_allow_html=True)
                 st.caption(f"File: {candidate['filename']}")
+                if candidate.get("scoring") == "local":
+                    st.caption("⚡ Pre-screened by skill coverage only")
+                elif candidate.get("triage_score") is not None and candidate["triage_score"] != candidate.get("score"):
+                    st.caption(f"🎯 Triage score: {candidate['triage_score']:.1f}/100")
             
             with col2:
                 gauge_fig = create_score_gauge(score, candidate_name, i)
@@ -738,17 +930,121 @@ def display_matching_results(results):
                     st.session_state.email_candidate_name = candidate_name
             
             with st.expander("View Details", expanded=is_best):
+                contact = [
+                    f"{label}: {candidate[field]}"
+                    for label, field in (("📧 Email", "email"), ("📞 Phone", "phone"), ("📍 Location", "location"))
+                    if candidate.get(field)
+                ]
+                if candidate.get("years_of_experience") is not None:
+                    contact.append(f"🗓️ Experience: {candidate['years_of_experience']:g} years")
+                if contact:
+                    st.caption(" | ".join(contact))
+                
                 st.write("**Remarks:**", candidate["remarks"])
                 
+                if candidate.get("matched_skills") or candidate.get("unmatched_skills"):
+                    st.write("**Job Skills Found in Resume:**", ", ".join(candidate.get("matched_skills", [])) or "None")
+                    if candidate.get("unmatched_skills"):
+                        st.write("**Job Skills Not Mentioned:**", ", ".join(candidate["unmatched_skills"]))
+                
                 if candidate["missing_skills"]:
                     st.write("**Missing Skills:**")
                     for skill in candidate["missing_skills"]:
                         st.markdown(f'• <span style="color: #dc3545;">{skill}</span>', unsafe_allow_html=True)
                 else:
                     st.markdown('• <span style="color: #28a745;">No critical skills missing!</span>', unsafe_allow_html=True)
+                
+                show_candidate_evidence(candidate, i)
             
             st.markdown('</div>', unsafe_allow_html=True)
 
+def show_rerank_panel(batch_id):
+    """Re-order the batch with custom category weights from the stored criterion scores"""
+    with st.expander("⚖️ Re-rank with Custom Weights"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            hard_weight = st.slider("Hard Skills", 0.0, 3.0, 1.0, 0.1, key="rerank_hard_skills")
+        with col2:
+            soft_weight = st.slider("Soft Skills", 0.0, 3.0, 1.0, 0.1, key="rerank_soft_skills")
+        with col3:
+            experience_weight = st.slider("Experience", 0.0, 3.0, 1.0, 0.1, key="rerank_experience")
+        
+        if st.button("⚖️ Re-rank", key="rerank_button"):
+            result, success = make_api_request(
+                f"{API_BASE_URL}/batches/{batch_id}/rerank",
+                json_data={
+                    "category_weights": {
+                        "hard_skills": hard_weight,
+                        "soft_skills": soft_weight,
+                        "experience_requirements": experience_weight
+                    }
+                }
+            )
+            if success:
+                st.session_state.rerank_result = result
+            else:
+                show_status(result["error"], "error")
+        
+        result = st.session_state.get("rerank_result")
+        if result and result["batch_id"] == batch_id:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Rank": item["rank"],
+                        "Name": item["name"] or item["filename"],
+                        "Score": item["score"],
+                        "Original Score": round(item["original_score"], 2)
+                    }
+                    for item in result["candidates"]
+                ]),
+                use_container_width=True,
+                hide_index=True
+            )
+            st.caption(f"Re-scored in {result['duration_ms']:.1f} ms without new model calls")
+
+def show_candidate_evidence(candidate, index):
+    """Per-criterion reasons and resume quotes, requested only when the recruiter asks for them"""
+    resume_files = st.session_state.get("matching_resume_files", {})
+    if candidate.get("scoring") == "local" or candidate["filename"] not in resume_files:
+        return
+    
+    evidence = st.session_state.setdefault("candidate_evidence", {})
+    if candidate["filename"] not in evidence:
+        if not st.button("🔎 Show Evidence", key=f"evidence_{candidate['filename']}_{index}"):
+            return
+        content, content_type = resume_files[candidate["filename"]]
+        with st.spinner("Fetching evaluation details..."):
+            result, success = make_api_request(
+                f"{API_BASE_URL}/match-candidates/evidence",
+                files=[("resume", (candidate["filename"], content, content_type))],
+                data={"job_description": st.session_state.get("matching_job_description", "")}
+            )
+        if not success:
+            show_status(result["error"], "error")
+            return
+        evidence[candidate["filename"]] = result
+    
+    details = evidence[candidate["filename"]]
+    st.write("**Evidence by Criterion:**")
+    st.dataframe(
+        pd.DataFrame([
+            {
+                "Criterion": item["criterion"],
+                "Importance": item["importance"],
+                "Score": item["score"],
+                "Reason": item["reason"],
+                "Evidence": item["evidence"]
+            }
+            for item in details["criteria"]
+        ]),
+        use_container_width=True,
+        hide_index=True
+    )
+    if details.get("strengths"):
+        st.write("**Strengths:**", ", ".join(details["strengths"]))
+    if details.get("concerns"):
+        st.write("**Concerns:**", ", ".join(details["concerns"]))
+
 def email_generation_page():
     st.header("📧 Email Generation")
     
@@ -875,76 +1171,43 @@ def results_analysis_page():
     
     st.subheader("📊 Comprehensive Analysis Dashboard")
     
-    df_data = []
-    for candidate in candidates:
-        candidate_name = st.session_state.candidate_names.get(candidate['filename'], candidate['filename'])
-        df_data.append({
-            "Name": candidate_name,
-            "Score": candidate["score"],
-            "Missing Skills Count": len(candidate["missing_skills"]),
-            "Qualified": candidate["score"] >= 70,
-            "Filename": candidate["filename"]
-        })
+    results_key = get_results_key(results)
+    df = build_candidate_frame(results_key, candidates, st.session_state.get("candidate_names", {}))
+    skill_counts = build_skill_counts(results_key, candidates)
     
-    df = pd.DataFrame(df_data)
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        fig = px.pie(df, names="Qualified", title="Qualification Ratio",
-                    color="Qualified", color_discrete_map={True: '#28a745', False: '#dc3545'})
-        fig.update_layout(font=dict(color="#333333"))
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        fig = px.box(df, y="Score", title="Score Distribution", color_discrete_sequence=['#1f77b4'])
-        fig.update_layout(font=dict(color="#333333"))
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col3:
-        fig = px.scatter(df, x="Missing Skills Count", y="Score", title="Skills vs Score",
-                        hover_data=["Name"], color="Qualified",
-                        color_discrete_map={True: '#28a745', False: '#dc3545'})
-        fig.update_layout(font=dict(color="#333333"))
-        st.plotly_chart(fig, use_container_width=True)
+    show_charts = st.toggle("📊 Show charts", value=len(candidates) <= LARGE_BATCH_THRESHOLD, key="show_analysis_charts")
+    if show_charts:
+        figures = build_analysis_figures(results_key, df, skill_counts)
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.plotly_chart(figures["pie"], use_container_width=True)
+        
+        with col2:
+            st.plotly_chart(figures["box"], use_container_width=True)
+        
+        with col3:
+            st.plotly_chart(figures["scatter"], use_container_width=True)
     
     st.subheader("📋 Missing Skills Analysis")
     
-    all_missing_skills = []
-    for candidate in candidates:
-        all_missing_skills.extend(candidate["missing_skills"])
-    
-    if all_missing_skills:
-        skill_counts = pd.Series(all_missing_skills).value_counts().reset_index()
-        skill_counts.columns = ['Skill', 'Count']
-        
-        fig = px.bar(skill_counts.head(10), x='Skill', y='Count', 
-                    title="Top 10 Most Frequently Missing Skills",
-                    color='Count', color_continuous_scale='Viridis')
-        fig.update_layout(font=dict(color="#333333"))
-        st.plotly_chart(fig, use_container_width=True)
-    else:
+    if skill_counts.empty:
         st.info("No missing skills found across all candidates!")
+    elif show_charts:
+        st.plotly_chart(figures["skills"], use_container_width=True)
+    else:
+        st.dataframe(skill_counts.head(10), use_container_width=True, hide_index=True)
     
-    st.subheader("📝 Candidate Remarks Analysis")
-    
-    remarks = [candidate["remarks"] for candidate in candidates]
-    
-    if remarks:
-        remark_lengths = [len(remark.split()) for remark in remarks]
-        
-        fig = px.histogram(x=remark_lengths, nbins=10, 
-                          title="Distribution of Remark Lengths (Words)",
-                          color_discrete_sequence=['#1f77b4'])
-        fig.update_layout(font=dict(color="#333333"))
-        st.plotly_chart(fig, use_container_width=True)
+    if show_charts:
+        st.subheader("📝 Candidate Remarks Analysis")
+        st.plotly_chart(figures["remarks"], use_container_width=True)
     
     st.subheader("📈 Performance Over Time")
     
-    if 'processing_history' in st.session_state and not st.session_state.processing_history.empty:
-        history_df = st.session_state.processing_history
-        
-        fig = px.line(history_df, x='Date', y=['Jobs Processed', 'Candidates Evaluated'],
+    analytics = fetch_analytics()
+    if analytics and analytics["daily"]:
+        fig = px.line(activity_frame(analytics), x='Date', y=['Jobs Processed', 'Candidates Evaluated'],
                      title='Processing Activity Over Time', markers=True)
         fig.update_layout(font=dict(color="#333333"))
         st.plotly_chart(fig, use_container_width=True)
@@ -956,7 +1219,7 @@ def results_analysis_page():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        csv = df.to_csv(index=False)
+        csv = df[["Name", "Score", "Missing Skills Count", "Qualified", "Filename", "Email", "Phone", "Location", "Years of Experience"]].to_csv(index=False)
         st.download_button(
             "📥 Download Candidate Data (CSV)",
             csv,
@@ -981,8 +1244,8 @@ def results_analysis_page():
         ============================
         Date: {date.today()}
         Total Candidates: {len(candidates)}
-        Qualified Candidates: {len([c for c in candidates if c['score'] >= 70])}
-        Average Score: {sum(c['score'] for c in candidates) / len(candidates):.1f}
+        Qualified Candidates: {int(df["Qualified"].sum())}
+        Average Score: {df["Score"].mean():.1f}
         Best Candidate: {st.session_state.candidate_names.get(results.get('best_candidate', ''), 'N/A')}
         """
         st.download_button(
@@ -1079,21 +1342,29 @@ The Hiring Team""",
     
     with col1:
         if st.button("🧹 Clear All Data", type="secondary"):
-            keys_to_keep = ['processing_history']
             for key in list(st.session_state.keys()):
-                if key not in keys_to_keep:
-                    del st.session_state[key]
+                del st.session_state[key]
             st.success("All data cleared successfully!")
             time.sleep(1)
             st.rerun()
     
     with col2:
-        if st.button("📊 Reset Analytics", type="secondary"):
-            if 'processing_history' in st.session_state:
-                del st.session_state.processing_history
-            st.success("Analytics data reset successfully!")
-            time.sleep(1)
-            st.rerun()
+        # Analytics are shared by every user of the backend, so resetting them needs an explicit confirmation
+        confirm_reset = st.checkbox("I am an administrator and want to clear analytics for all users")
+        admin_token = st.text_input("Admin token", type="password", help="ADMIN_TOKEN configured on the backend")
+        if st.button("📊 Reset Analytics", type="secondary", disabled=not (confirm_reset and admin_token)):
+            result, success = make_api_request(
+                f"{API_BASE_URL}/analytics",
+                method="DELETE",
+                headers={"X-Admin-Token": admin_token}
+            )
+            if success:
+                fetch_analytics.clear()
+                st.success("Analytics data reset for all users!")
+                time.sleep(1)
+                st.rerun()
+            else:
+                show_status(result["error"], "error")
     
     st.subheader("ℹ️ System Information")
     
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# The app uses flat imports (`import models`), as when run from app/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+# Keep log files written during the run out of the repository
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="recruitment_ai_logs_"))
@@ -0,0 +1,60 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import analytics
+import cache
+import main
+import models
+from config import settings
+
+@pytest.fixture
+def store(monkeypatch):
+    store = cache.MemoryCache("analytics")
+    monkeypatch.setattr(analytics, "_store", lambda: store)
+    return store
+
+def candidate(score, scoring="llm", missing=()):
+    return models.CandidateResult(
+        filename="cv.pdf", score=score, scoring=scoring, missing_skills=list(missing), remarks="", resume_text=""
+    )
+
+def test_local_scores_have_their_own_histogram(store):
+    analytics.record_matching_run([candidate(85), candidate(42, scoring="local")], 1.0)
+    summary = analytics.get_summary()
+    assert summary.score_histogram[8] == 1 and sum(summary.score_histogram) == 1
+    assert summary.local_score_histogram[4] == 1 and sum(summary.local_score_histogram) == 1
+
+def test_new_skills_can_build_up_counts(store, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYTICS_MAX_TRACKED_SKILLS", 2)
+    analytics.record_matching_run([candidate(50, missing=["Alpha"]) for _ in range(3)], 1.0)
+    analytics.record_matching_run([candidate(50, missing=["Beta"]) for _ in range(2)], 1.0)
+    for _ in range(3):
+        analytics.record_matching_run([candidate(50, missing=["Gamma"])], 1.0)
+    counts = {skill.skill: skill.count for skill in analytics.get_summary().top_missing_skills}
+    assert counts == {"Alpha": 3, "Beta": 2, "Gamma": 3}
+
+def test_skill_table_is_trimmed_past_twice_the_limit(store, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYTICS_MAX_TRACKED_SKILLS", 2)
+    analytics.record_matching_run([candidate(50, missing=["Alpha"]) for _ in range(3)], 1.0)
+    analytics.record_matching_run([candidate(50, missing=["Beta", "Gamma", "Delta", "Epsilon"])], 1.0)
+    assert len(store.get(analytics.ROLLUP_KEY)["missing_skills"]) == 2
+
+@pytest.fixture
+def client(store):
+    analytics.record_matching_run([candidate(80)], 1.0)
+    return TestClient(main.app)
+
+def test_reset_is_disabled_without_admin_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    assert client.delete("/analytics", headers={"X-Admin-Token": "anything"}).status_code == 403
+    assert analytics.get_summary().total_jobs == 1
+
+def test_reset_requires_matching_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    assert client.delete("/analytics").status_code == 403
+    assert client.delete("/analytics", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert analytics.get_summary().total_jobs == 1
+
+    response = client.delete("/analytics", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["total_jobs"] == 0
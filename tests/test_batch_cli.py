@@ -0,0 +1,94 @@
+import argparse
+import csv
+import json
+import threading
+import time
+
+import pytest
+
+import ai_services
+import batch_cli
+import models
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    for i in range(6):
+        (resumes / f"cv{i}.pdf").write_bytes(b"%PDF")
+    (tmp_path / "jd.txt").write_text("Python developer", encoding="utf-8")
+    monkeypatch.setattr(ai_services, "init_client", lambda: None)
+    monkeypatch.setattr(ai_services, "analyze_job_description", lambda text: {})
+    return tmp_path
+
+@pytest.fixture
+def scored(monkeypatch):
+    """Paths scored by the fake evaluator; names starting with `fail` raise"""
+    calls = []
+    lock = threading.Lock()
+
+    def score_resume(path, job_description, lean):
+        with lock:
+            calls.append(path.name)
+        time.sleep(0.05)
+        if path.name.startswith("fail"):
+            raise RuntimeError("unreadable")
+        return models.CandidateResult(filename=path.name, score=50, missing_skills=[], remarks="ok", resume_text="")
+
+    monkeypatch.setattr(batch_cli, "score_resume", score_resume)
+    return calls
+
+def run(workspace, concurrency=2, **overrides):
+    args = {"job_description": str(workspace / "jd.txt"), "directory": str(workspace / "resumes"),
+            "output": str(workspace / "out.csv"), "format": None, "row_group_size": 1000,
+            "concurrency": concurrency, "state": None, "restart": False, "retry_errors": False,
+            "no_recursive": False, "lean": None}
+    args.update(overrides)
+    return batch_cli.run(argparse.Namespace(**args))
+
+def output_rows(workspace):
+    with open(workspace / "out.csv", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+def test_resume_skips_checkpointed_resumes(workspace, scored):
+    (workspace / "resumes" / "fail.pdf").write_bytes(b"%PDF")
+    assert run(workspace) == 1
+    assert len(scored) == 7
+    scored.clear()
+
+    assert run(workspace) == 0
+    assert scored == []
+
+def test_retry_errors_replaces_error_rows(workspace, scored):
+    (workspace / "resumes" / "fail.pdf").write_bytes(b"%PDF")
+    run(workspace)
+    scored.clear()
+
+    assert run(workspace, retry_errors=True) == 1
+    assert scored == ["fail.pdf"]
+    paths = [row["path"] for row in output_rows(workspace)]
+    assert sorted(paths) == sorted(set(paths))
+
+def test_interrupt_saves_evaluations_in_progress(workspace, scored, monkeypatch):
+    real_wait = batch_cli.wait
+    waits = []
+
+    def interrupt_once(futures, return_when):
+        waits.append(1)
+        if len(waits) == 1:
+            raise KeyboardInterrupt
+        return real_wait(futures, return_when=return_when)
+
+    monkeypatch.setattr(batch_cli, "wait", interrupt_once)
+    assert run(workspace, concurrency=2) == 130
+    # Two evaluations were running and are kept; the two queued ones were cancelled
+    assert len(scored) == 2
+    saved = [row["path"] for row in output_rows(workspace)]
+    assert sorted(saved) == sorted(scored)
+    state = [json.loads(line) for line in (workspace / "out.csv.state").read_text().splitlines()[1:]]
+    assert sorted(entry["path"] for entry in state) == sorted(scored)
+
+    scored_before = list(scored)
+    scored.clear()
+    assert run(workspace) == 0
+    assert sorted(scored + scored_before) == [f"cv{i}.pdf" for i in range(6)]
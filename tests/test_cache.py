@@ -0,0 +1,124 @@
+import sqlite3
+
+import pytest
+
+import cache
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    return clock
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path, clock):
+    def make(max_entries=2, default_ttl=None):
+        if request.param == "memory":
+            return cache.MemoryCache("test", max_entries=max_entries, default_ttl=default_ttl)
+        return cache.SQLiteCache("test", str(tmp_path / "cache.sqlite3"), max_entries=max_entries, default_ttl=default_ttl)
+    return make
+
+def test_least_recently_used_entry_is_evicted(make_cache, clock):
+    store = make_cache()
+    store.set("a", 1)
+    clock.now += 1
+    store.set("b", 2)
+    clock.now += cache.SQLiteCache.ACCESS_UPDATE_INTERVAL
+    assert store.get("a") == 1
+    clock.now += 1
+    store.set("c", 3)
+    assert (store.get("a"), store.get("b"), store.get("c")) == (1, None, 3)
+
+def test_sqlite_reads_write_access_time_only_after_interval(tmp_path, clock):
+    store = cache.SQLiteCache("test", str(tmp_path / "cache.sqlite3"))
+    store.set("a", 1)
+    conn = store._connect()
+    accessed_at = lambda: conn.execute("SELECT accessed_at FROM cache_entries WHERE key = 'a'").fetchone()[0]
+    written, changes = accessed_at(), conn.total_changes
+    clock.now += 1
+    assert store.get("a") == 1
+    assert conn.total_changes == changes and accessed_at() == written
+    clock.now += store.ACCESS_UPDATE_INTERVAL
+    assert store.get("a") == 1
+    assert accessed_at() == clock.now
+
+def test_entries_expire(make_cache, clock):
+    store = make_cache(default_ttl=10)
+    store.set("a", {"value": 1})
+    clock.now += 5
+    assert store.get("a") == {"value": 1}
+    clock.now += 6
+    assert store.get("a") is None
+
+def test_update_applies_function_to_current_value(make_cache):
+    store = make_cache()
+    assert store.update("count", lambda current: (current or 0) + 1) == 1
+    assert store.update("count", lambda current: (current or 0) + 1) == 2
+    assert store.get("count") == 2
+
+def test_pool_is_first_in_first_out(make_cache):
+    store = make_cache()
+    for value in ("a", "b", "c"):
+        store.push("key", value)
+    assert store.pool_size("key") == 3
+    assert store.pool_items("key", 1) == ["b", "c"]
+    assert store.pop("key") == "a"
+    assert store.pool_items("key") == ["b", "c"]
+    store.delete("key")
+    assert store.pop("key") is None
+
+def test_pool_is_dropped_with_its_evicted_entry(make_cache, clock):
+    store = make_cache()
+    store.set("a", "description")
+    store.push("a", "variant")
+    for key in ("b", "c"):
+        clock.now += 1
+        store.set(key, key)
+    assert store.get("a") is None
+    assert store.pool_size("a") == 0
+
+def test_pool_is_dropped_with_its_expired_entry(make_cache, clock):
+    store = make_cache(default_ttl=10)
+    store.set("a", "description")
+    clock.now += 1
+    store.push("a", "variant")
+    clock.now += 9.5
+    assert store.get("a") is None
+    assert store.pop("a") is None
+
+def test_pools_expire(make_cache, clock):
+    store = make_cache(default_ttl=10)
+    store.push("key", "first")
+    clock.now += 8
+    store.push("key", "second")
+    clock.now += 8
+    assert store.pool_items("key") == ["first", "second"]
+    clock.now += 3
+    assert store.pool_size("key") == 0
+
+def test_pools_are_limited_to_max_entries(make_cache, clock):
+    store = make_cache(max_entries=2)
+    for key in ("a", "b", "c"):
+        store.push(key, key)
+        clock.now += 1
+    assert [store.pool_size(key) for key in ("a", "b", "c")] == [0, 1, 1]
+
+def test_sqlite_adds_pool_expiry_to_existing_database(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE cache_pools (id INTEGER PRIMARY KEY AUTOINCREMENT, namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL)")
+    conn.execute("INSERT INTO cache_pools (namespace, key, value) VALUES ('test', 'key', '\"old\"')")
+    conn.commit()
+    conn.close()
+
+    store = cache.SQLiteCache("test", path, default_ttl=10)
+    assert store.pool_items("key") == ["old"]
+    store.push("key", "new")
+    assert store.pool_items("key") == ["old", "new"]
@@ -0,0 +1,102 @@
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import ai_services
+import coalescing
+import main
+from config import settings
+
+def test_concurrent_callers_share_one_call():
+    flight = coalescing.SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, "key", slow)
+        started.wait()
+        followers = [executor.submit(flight.do, "key", slow) for _ in range(3)]
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert len(calls) == 1
+    assert results == [("result", True)] + [("result", False)] * 3
+    assert flight.metrics()["coalesced"] == 3
+    assert flight.metrics()["in_flight"] == 0
+
+def test_followers_receive_the_leaders_error():
+    flight = coalescing.SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.2)
+        raise ValueError("upstream failed")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", failing)
+        started.wait()
+        follower = executor.submit(flight.do, "key", failing)
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+
+def test_finished_calls_are_not_reused():
+    flight = coalescing.SingleFlight()
+    assert flight.do("key", lambda: 1) == (1, True)
+    assert flight.do("key", lambda: 2) == (2, True)
+
+class SlowCompletions:
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def create(self, **params):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.3)
+        message = types.SimpleNamespace(content="Generated text")
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=message)],
+            usage=types.SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+        )
+
+@pytest.fixture
+def completions(monkeypatch):
+    completions = SlowCompletions()
+    monkeypatch.setattr(ai_services, "client", types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(ai_services, "init_client", lambda: None)
+    monkeypatch.setattr(settings, "JD_VARIANT_POOL_SIZE", 0)
+    monkeypatch.setattr(settings, "LLM_COALESCING_ENABLED", True)
+    return completions
+
+def post_concurrently(path, payload, count=3):
+    # One client, so all requests share the app's event loop as under uvicorn
+    with TestClient(main.app) as client:
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [executor.submit(client.post, path, json=payload) for _ in range(count)]
+            return [future.result() for future in futures]
+
+def test_identical_job_description_requests_make_one_call(completions):
+    payload = {"job_title": "Coalesced Engineer", "years_of_experience": "3", "must_have_skills": "Python"}
+    coalesced = ai_services.coalescing_metrics()["coalesced"]
+    responses = post_concurrently("/generate-job-description", payload)
+    assert [response.status_code for response in responses] == [200] * 3
+    assert completions.calls == 1
+    # Served by sharing the in-flight call, not by the cache after a serialized first request
+    assert ai_services.coalescing_metrics()["coalesced"] - coalesced == 2
+
+def test_identical_email_requests_make_one_call(completions):
+    payload = {"candidate_name": "Coalesced Candidate", "position": "Engineer", "email_type": "interview", "evaluation": {"score": 80}}
+    responses = post_concurrently("/generate-email", payload)
+    assert [response.status_code for response in responses] == [200] * 3
+    assert completions.calls == 1
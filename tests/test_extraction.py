@@ -0,0 +1,129 @@
+import io
+
+import docx
+import pytest
+
+import extraction
+
+class FakeExtractor(extraction.PdfExtractor):
+    def __init__(self, name, text="resume text", error=None):
+        self.name = name
+        self.text = text
+        self.error = error
+        self.calls = 0
+
+    def available(self):
+        return True
+
+    def extract(self, content):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.text
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(extraction, "_stats", {})
+
+def use(monkeypatch, *extractors):
+    monkeypatch.setattr(extraction, "_enabled", list(extractors))
+
+def names(extractors):
+    return [extractor.name for extractor in extractors]
+
+def test_fast_failures_do_not_count_as_fast(monkeypatch):
+    use(monkeypatch, FakeExtractor("pypdfium2"), FakeExtractor("pypdf"))
+    size = 50_000
+    extraction._record("pypdfium2", 0.0001, size, False)
+    stats = extraction._stats[("pypdfium2", 0)]
+    assert stats == {"attempts": 1, "succeeded": 0, "seconds_per_mb": None}
+
+    # The benchmark figure is kept, inflated by the failure
+    benchmark = extraction.BENCHMARK_OVERHEAD_SECONDS["pypdfium2"] + extraction.BENCHMARK_SECONDS_PER_MB["pypdfium2"] * 0.05
+    assert extraction._expected_cost("pypdfium2", size) == pytest.approx(benchmark / 0.1)
+    assert names(extraction.ranked_extractors(size)) == ["pypdf", "pypdfium2"]
+
+    extraction._record("pypdfium2", 0.001, size, True)
+    assert stats["seconds_per_mb"] == pytest.approx(0.02)
+    assert stats["succeeded"] == 1 and stats["attempts"] == 2
+
+def test_ranking_depends_on_document_size(monkeypatch):
+    use(monkeypatch, FakeExtractor("pypdfium2"), FakeExtractor("pypdf"))
+    # pypdf measured fast on small files but slow on large ones
+    extraction._record("pypdf", 0.001, 50_000, True)
+    extraction._record("pypdf", 10.0, 5_000_000, True)
+
+    assert names(extraction.ranked_extractors(50_000)) == ["pypdf", "pypdfium2"]
+    assert names(extraction.ranked_extractors(5_000_000)) == ["pypdfium2", "pypdf"]
+
+def test_falls_back_when_a_backend_raises_or_finds_no_text(monkeypatch):
+    broken = FakeExtractor("pypdfium2", error=ValueError("bad xref"))
+    empty = FakeExtractor("pypdf", text="  \n")
+    working = FakeExtractor("pdfminer", text="Jane Doe")
+    use(monkeypatch, broken, empty, working)
+
+    assert extraction.extract_pdf_text(b"%PDF" * 1000, "cv.pdf") == "Jane Doe"
+    assert (broken.calls, empty.calls, working.calls) == (1, 1, 1)
+    assert extraction._stats[("pypdfium2", 0)]["seconds_per_mb"] is None
+    assert extraction._stats[("pdfminer", 0)]["succeeded"] == 1
+
+def test_raises_when_no_backend_opens_the_file(monkeypatch):
+    use(monkeypatch, FakeExtractor("pypdf", error=ValueError("not a PDF")))
+    with pytest.raises(ValueError, match="not a PDF"):
+        extraction.extract_pdf_text(b"garbage", "cv.pdf")
+
+def test_metrics_rank_each_size_range(monkeypatch):
+    use(monkeypatch, FakeExtractor("pypdfium2"), FakeExtractor("pypdf"))
+    extraction._record("pypdf", 0.0001, 50_000, True)
+
+    metrics = extraction.extraction_metrics()
+    assert [(bucket["min_mb"], bucket["max_mb"]) for bucket in metrics] == [(0.0, 0.1), (0.1, 1.0), (1.0, None)]
+    assert [entry["extractor"] for entry in metrics[0]["extractors"]] == ["pypdf", "pypdfium2"]
+    assert metrics[0]["extractors"][0]["measured"] is True
+    assert [entry["extractor"] for entry in metrics[2]["extractors"]] == ["pypdfium2", "pypdf"]
+
+def docx_bytes(build):
+    document = docx.Document()
+    build(document)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def test_docx_lines_in_reading_order():
+    def build(document):
+        section = document.sections[0]
+        section.header.paragraphs[0].text = "Jane Doe | jane@example.com"
+        section.footer.paragraphs[0].text = "Page footer"
+        document.add_paragraph("Summary")
+        run = document.add_paragraph("Python\tSQL").add_run()
+        run.add_break()
+        run.add_text("Kubernetes")
+        table = document.add_table(rows=2, cols=2)
+        table.cell(0, 0).text = "Company"
+        table.cell(0, 1).text = "Years"
+        table.cell(1, 0).text = "Acme"
+        table.cell(1, 1).text = " "
+        document.add_paragraph("References available")
+
+    lines = list(extraction.iter_docx_lines(docx_bytes(build)))
+    assert lines == [
+        "Jane Doe | jane@example.com",
+        "Summary",
+        "Python\tSQL\nKubernetes",
+        "Company | Years",
+        "Acme",
+        "References available",
+        "Page footer"
+    ]
+
+def test_repeated_headers_are_emitted_once():
+    def build(document):
+        document.sections[0].header.paragraphs[0].text = "Jane Doe"
+        document.add_paragraph("First section")
+        section = document.add_section()
+        section.header.is_linked_to_previous = False
+        section.header.paragraphs[0].text = "Jane Doe"
+        document.add_paragraph("Second section")
+
+    text = extraction.extract_docx_text(docx_bytes(build))
+    assert text == "Jane Doe\nFirst section\n\nSecond section\n"
@@ -0,0 +1,38 @@
+import types
+
+import pytest
+
+import ai_services
+
+class FakeStream:
+    def __init__(self, words):
+        self.words = words
+        self.response = types.SimpleNamespace(closed=False)
+        self.response.close = lambda: setattr(self.response, "closed", True)
+
+    def __iter__(self):
+        for word in self.words:
+            delta = types.SimpleNamespace(content=word)
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+@pytest.fixture
+def stream(monkeypatch):
+    stream = FakeStream(["Senior ", "Python ", "Engineer"])
+    completions = types.SimpleNamespace(create=lambda **params: stream)
+    monkeypatch.setattr(ai_services, "client", types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions)))
+    return stream
+
+def request(title):
+    return {"job_title": title, "years_of_experience": "5", "must_have_skills": "Python"}
+
+def test_stream_yields_fragments_and_releases_connection(stream):
+    fragments = list(ai_services.stream_job_description(request("Streamed Engineer")))
+    assert fragments == ["Senior ", "Python ", "Engineer"]
+    assert stream.response.closed
+
+def test_closing_stream_early_releases_connection(stream):
+    fragments = ai_services.stream_job_description(request("Abandoned Engineer"))
+    assert next(fragments) == "Senior "
+    assert not stream.response.closed
+    fragments.close()
+    assert stream.response.closed
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import cache
+import jobs
+from config import settings
+
+@pytest.fixture
+def store(monkeypatch):
+    store = cache.MemoryCache("jobs")
+    monkeypatch.setattr(jobs, "_job_store", lambda: store)
+    return store
+
+def running_job(store, **fields):
+    job = {"job_id": "job", "status": "running", "total": 2, "processed": 1, "result": None, "error": None,
+           "created_at": "2026-01-01T00:00:00", "updated_at": "2026-01-01T00:00:00",
+           "owner_pid": os.getpid(), "heartbeat_at": time.time()}
+    job.update(fields)
+    store.set("job", job)
+    store.push(jobs._candidates_key("job"), {"filename": "a.pdf"})
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    return process.pid
+
+def test_running_job_lists_candidates(store):
+    running_job(store)
+    job = jobs.get_job("job")
+    assert job["status"] == "running"
+    assert job["candidates"] == [{"filename": "a.pdf"}]
+    assert jobs.get_job("job", since=1)["candidates"] == []
+
+@pytest.mark.skipif(os.name != "posix", reason="owner liveness is checked with signals")
+def test_job_of_exited_worker_is_failed(store):
+    running_job(store, owner_pid=dead_pid())
+    job = jobs.get_job("job")
+    assert job["status"] == "failed"
+    assert job["error"] == jobs.ORPHANED_ERROR
+    assert job["candidates"] == []
+    assert store.get("job")["status"] == "failed"
+
+def test_job_without_heartbeats_is_failed(store):
+    running_job(store, heartbeat_at=time.time() - 4 * settings.JOB_HEARTBEAT_SECONDS)
+    assert jobs.get_job("job")["status"] == "failed"
+
+def test_finished_jobs_are_left_alone(store):
+    running_job(store, status="completed", heartbeat_at=0)
+    assert jobs.get_job("job")["status"] == "completed"
+
+def test_submitted_job_records_owner_and_completes(store, monkeypatch):
+    monkeypatch.setattr(jobs.matching, "run_matching", lambda *args, **kwargs: (_ for _ in ()).throw(ValueError("boom")))
+    job = jobs.submit_matching_job("JD", [])
+    assert job["owner_pid"] == os.getpid()
+    for _ in range(100):
+        if jobs.get_job(job["job_id"])["status"] == "failed":
+            break
+        time.sleep(0.01)
+    assert jobs.get_job(job["job_id"])["error"] == "boom"
+    assert job["job_id"] not in jobs._active_jobs
@@ -0,0 +1,34 @@
+import pytest
+
+import profiles
+
+@pytest.mark.parametrize("header, location", [
+    ("Jane Doe\nSeattle, WA", "Seattle, WA"),
+    ("Jane Doe\nAustin, Texas", "Austin, Texas"),
+    ("Jane Doe\nBoston, MA\njane@example.com", "Boston, MA"),
+    ("Jane Doe\nNew York, NY", "New York, NY"),
+    ("Doe, Jane\nBoston, MA", "Boston, MA"),
+    ("Location: Denver, CO\nJane Doe", "Denver, CO"),
+])
+def test_location_from_header(header, location):
+    assert profiles.extract_location(header) == location
+
+def test_region_line_is_not_a_reversed_name():
+    assert profiles.extract_name("Seattle, WA\nJane Doe") == "Jane Doe"
+
+def test_reversed_name():
+    text = "Doe, Jane\nPortland, OR"
+    assert profiles.extract_name(text) == "Jane Doe"
+    assert profiles.extract_location(text) == "Portland, OR"
+
+@pytest.mark.parametrize("text, phone", [
+    ("Phone: (555) 123-4567\n2015 - 2020", "(555) 123-4567"),
+    ("Tel: +1 555 123 4567", "+1 555 123 4567"),
+    ("Mobile: 555.123.4567", "555.123.4567"),
+    ("Call 555-123-4567\nEngineer 2019-2021", "555-123-4567"),
+])
+def test_phone(text, phone):
+    assert profiles.extract_phone(text) == phone
+
+def test_phone_does_not_span_lines():
+    assert profiles.extract_phone("Experience\n2015 - 2020\n2020 - 2023") is None
@@ -0,0 +1,110 @@
+import pytest
+
+import cache
+import models
+import ranking
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch):
+    store = cache.MemoryCache("batches")
+    monkeypatch.setattr(ranking, "_batch_store", lambda: store)
+    return store
+
+def candidate(filename, score, *criteria):
+    return models.CandidateResult(
+        filename=filename,
+        score=score,
+        missing_skills=[],
+        remarks="",
+        resume_text="",
+        criteria=[
+            models.CriterionScore(category=category, criterion=name, score=value, importance=importance)
+            for category, name, value, importance in criteria
+        ]
+    )
+
+@pytest.fixture
+def batch_id():
+    return ranking.save_batch([
+        candidate("a.pdf", 60, ("hard_skills", "Python", 9, "high"), ("soft_skills", "Communication", 3, "low")),
+        candidate("b.pdf", 70, ("hard_skills", "Python", 5, "high"), ("soft_skills", "Communication", 9, "low")),
+        # Pre-screened out: no criterion scores
+        candidate("c.pdf", 40)
+    ])
+
+def test_saved_matrix_marks_unassessed_criteria(batch_id):
+    batch = ranking.load_batch(batch_id)
+    assert batch["criteria"] == ["Python", "Communication"]
+    assert batch["importance"] == ["high", "low"]
+    assert batch["scores"] == [[9, 3], [5, 9], [None, None]]
+
+def test_rerank_uses_default_importance_weights(batch_id):
+    response = ranking.rerank(batch_id, models.RerankRequest())
+    scores = {candidate.filename: candidate.score for candidate in response.candidates}
+    assert scores["a.pdf"] == pytest.approx((9 * 1.5 + 3 * 0.5) / 2.0 * 10)
+    assert scores["b.pdf"] == pytest.approx((5 * 1.5 + 9 * 0.5) / 2.0 * 10)
+    assert scores["c.pdf"] == 40
+    assert [candidate.rank for candidate in response.candidates] == [1, 2, 3]
+    assert response.candidates[0].filename == "a.pdf"
+    assert response.candidates[0].original_score == 60
+
+def test_rerank_applies_category_and_criterion_weights(batch_id):
+    request = models.RerankRequest(category_weights={"hard_skills": 0}, criterion_weights={"Communication": 2})
+    response = ranking.rerank(batch_id, request)
+    assert [candidate.filename for candidate in response.candidates] == ["b.pdf", "c.pdf", "a.pdf"]
+    assert response.candidates[0].score == 90
+
+def test_rerank_keeps_original_score_when_all_weights_are_zero(batch_id):
+    response = ranking.rerank(batch_id, models.RerankRequest(importance_weights={"high": 0, "low": 0}))
+    assert {candidate.filename: candidate.score for candidate in response.candidates} == {"a.pdf": 60, "b.pdf": 70, "c.pdf": 40}
+
+def test_rerank_unknown_batch():
+    assert ranking.rerank("missing", models.RerankRequest()) is None
+
+@pytest.mark.parametrize("sort, expected", [
+    ("upload", [0, 1, 2]),
+    ("score", [3, 1, 4]),
+])
+def test_top_k_keeps_the_first_k_in_sort_order(sort, expected):
+    scores = [50, 80, 20, 90, 80]
+    top = ranking.TopK(3, sort)
+    for index, score in enumerate(scores):
+        top.push(index, score, index)
+    assert top.items() == expected
+    assert top.truncated
+    assert top.last_key() == ranking.sort_key(sort, expected[-1], scores[expected[-1]])
+
+def test_top_k_not_truncated_when_everything_fits():
+    top = ranking.TopK(5, "score")
+    top.push(0, 10, "a")
+    top.push(1, 30, "b")
+    assert top.items() == ["b", "a"]
+    assert not top.truncated
+
+@pytest.mark.parametrize("sort, after", [("upload", (3.0,)), ("score", (-72.5, 4.0))])
+def test_cursor_round_trip(sort, after):
+    assert ranking.decode_cursor(ranking.encode_cursor(sort, after)) == (sort, after)
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    ranking.encode_cursor("name", (1.0,)),
+    ranking.encode_cursor("score", (1.0,)),
+    ranking.encode_cursor("upload", ("x",)),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        ranking.decode_cursor(cursor)
+
+@pytest.mark.parametrize("sort", ["upload", "score"])
+def test_pages_cover_every_candidate_once(sort):
+    scores = [50, 80, 20, 90, 80, 50, 10]
+    candidates = [(index, score, index) for index, score in enumerate(scores)]
+    seen, after = [], None
+    while True:
+        page, cursor = ranking.select_page(candidates, 3, sort, after)
+        seen.extend(page)
+        if cursor is None:
+            break
+        after = ranking.decode_cursor(cursor)[1]
+    expected = sorted(range(len(scores)), key=lambda index: ranking.sort_key(sort, index, scores[index]))
+    assert seen == expected
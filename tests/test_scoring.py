@@ -0,0 +1,62 @@
+import pytest
+
+import scoring
+import skills
+
+def analysis(*names):
+    return {"hard_skills": [{"skill": name, "importance": "medium"} for name in names]}
+
+def score(jd_analysis, resume_text):
+    return scoring.local_skill_score(jd_analysis, skills.extract_skills(resume_text), resume_text, [])
+
+def test_short_skill_names_do_not_match_inside_words():
+    resume = "Good JavaScript developer with great rapport and a strong record."
+    value, missing = score(analysis("Java", "Go", "R", "SQL"), resume)
+    assert value == 0
+    assert missing == ["Java", "Go", "R", "SQL"]
+
+def test_taxonomy_skills_match_through_aliases():
+    resume = "Backend work in Golang and Java 17, reporting with RStudio and PostgreSQL via SQL."
+    value, missing = score(analysis("Java", "Go", "R", "SQL"), resume)
+    assert value == 100
+    assert missing == []
+
+@pytest.mark.parametrize("resume, covered", [
+    ("Led a data mesh migration", True),
+    ("Led a data\nmesh migration", True),
+    ("Led a data meshing effort", False),
+    ("Worked on metadata mesh", False),
+])
+def test_unknown_skills_match_whole_phrases(resume, covered):
+    value, _ = score(analysis("Data Mesh"), resume)
+    assert value == (100 if covered else 0)
+
+def test_importance_weights_coverage():
+    jd_analysis = {"hard_skills": [
+        {"skill": "Python", "importance": "high"},
+        {"skill": "Rust", "importance": "low"}
+    ]}
+    value, missing = score(jd_analysis, "Python services")
+    assert value == pytest.approx(1.5 / 2.0 * 100)
+    assert missing == ["Rust"]
+
+def test_expand_lean_evaluation_uses_analysis_importance():
+    jd_analysis = {
+        "hard_skills": [{"skill": "Python", "importance": "high"}],
+        "soft_skills": [{"skill": "Communication", "importance": "low"}],
+        "experience_requirements": [{"requirement": "5 years", "importance": "medium"}]
+    }
+    lean = {"scores": {"Python": 8, "Communication": "6", "5 years": 4, "Unlisted": 7}, "summary": "Solid."}
+    expanded = scoring.expand_lean_evaluation(jd_analysis, lean)
+    assert expanded["hard_skills"] == {
+        "Python": {"score": 8.0, "importance": "high"},
+        "Unlisted": {"score": 7.0, "importance": "medium"}
+    }
+    assert expanded["soft_skills"] == {"Communication": {"score": 6.0, "importance": "low"}}
+    assert expanded["experience_requirements"] == {"5 years": {"score": 4.0, "importance": "medium"}}
+    assert expanded["overall_assessment"] == {"summary": "Solid."}
+
+def test_expand_lean_evaluation_without_scores_or_summary():
+    expanded = scoring.expand_lean_evaluation({}, {"scores": None})
+    assert all(expanded[category] == {} for category in scoring.CRITERIA_CATEGORIES)
+    assert expanded["overall_assessment"]["summary"] == "Evaluation completed"
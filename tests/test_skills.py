@@ -0,0 +1,33 @@
+import skills
+
+def test_matcher_respects_word_boundaries():
+    matcher = skills.SkillMatcher({"Java": ["java"], "JavaScript": ["javascript", "js"], "Go": ["golang"]})
+    assert matcher.find("JavaScript, java and react.js; golang, Golang") == {"JavaScript": 1, "Java": 1, "Go": 2}
+
+def test_matcher_finds_overlapping_and_suffix_aliases():
+    matcher = skills.SkillMatcher({
+        "Machine Learning": ["machine learning", "ml"],
+        "Learning": ["learning"],
+        "SQL": ["sql"],
+        "PostgreSQL": ["postgresql"]
+    })
+    assert matcher.find("Machine \n  learning with PostgreSQL and SQL") == {
+        "Machine Learning": 1,
+        "Learning": 1,
+        "PostgreSQL": 1,
+        "SQL": 1
+    }
+
+def test_matcher_counts_mentions():
+    matcher = skills.SkillMatcher({"Python": ["python", "py3"]})
+    assert matcher.find("Python, python3 and py3") == {"Python": 2}
+    assert matcher.find("") == {}
+
+def test_canonicalize_free_form_criteria():
+    assert skills.canonicalize("K8s experience") == "Kubernetes"
+    assert skills.canonicalize("go") == "Go"
+    assert skills.canonicalize(" Underwater basket weaving ") == "Underwater basket weaving"
+    assert skills.known_skill("Underwater basket weaving") is None
+
+def test_extract_skills_uses_taxonomy_aliases():
+    assert skills.extract_skills("Deployed on k8s with Golang services") == ["Go", "Kubernetes"]
@@ -0,0 +1,43 @@
+import io
+import zipfile
+
+import pytest
+from fastapi import HTTPException
+
+import utils
+from config import settings
+
+def make_zip(count, size=10):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for i in range(count):
+            archive.writestr(f"resume{i}.pdf", b"x" * size)
+    buffer.seek(0)
+    return buffer
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "ZIP_MAX_MEMBERS", 5)
+    monkeypatch.setattr(settings, "ZIP_MAX_TOTAL_BYTES", 100)
+
+def test_member_limit_spans_archives(limits):
+    archives = [("a.zip", make_zip(3)), ("b.zip", make_zip(3))]
+    with pytest.raises(HTTPException) as error:
+        utils.validate_zip_archives(archives)
+    assert "6 files" in error.value.detail
+
+def test_size_limit_spans_archives(limits):
+    archives = [("a.zip", make_zip(1, 60)), ("b.zip", make_zip(1, 60))]
+    with pytest.raises(HTTPException) as error:
+        utils.validate_zip_archives(archives)
+    assert "120 bytes" in error.value.detail
+
+def test_archives_within_limits(limits):
+    archives = [("a.zip", make_zip(2)), ("b.zip", make_zip(3))]
+    utils.validate_zip_archives(archives)
+    assert all(file.tell() == 0 for _, file in archives)
+
+def test_streaming_shares_budget_between_archives(limits):
+    archives = [("a.zip", make_zip(3)), ("b.zip", make_zip(3))]
+    documents = list(utils.iter_resume_documents([("cv.pdf", b"x")], archives))
+    assert len(documents) == 1 + 5